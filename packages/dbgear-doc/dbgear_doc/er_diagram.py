@@ -10,6 +10,7 @@ from pathlib import Path
 from in4viz import Table as In4vizTable, Column as In4vizColumn, LineType, Cardinality
 from in4viz.backends.svg import SVGERDiagram
 from in4viz.backends.drawio import DrawioERDiagram
+from dbgear.models.graph import RelationGraph
 from dbgear.models.schema import SchemaManager
 from dbgear.models.table import Table
 from dbgear.models.column import Column
@@ -22,10 +23,11 @@ def collect_related_tables(
     start_qkey: str,
     direction: str,
     level: int,
-    visited: set[str] | None = None
+    visited: set[str] | None = None,
+    graph: RelationGraph | None = None
 ) -> set[str]:
     """
-    Recursively collect related tables across schemas.
+    Collect related tables across schemas up to the given level.
 
     Args:
         all_tables: Dictionary of tables keyed by ``"schema.table"``
@@ -33,6 +35,7 @@ def collect_related_tables(
         direction: 'referenced_by' (tables that reference this) or 'references' (tables this references)
         level: How many levels deep to search
         visited: Set of already visited qualified keys
+        graph: RelationGraph built from ``all_tables`` (built on demand if omitted)
 
     Returns:
         Set of qualified keys including the start table
@@ -43,38 +46,11 @@ def collect_related_tables(
     if level < 0 or start_qkey in visited:
         return visited
 
-    visited.add(start_qkey)
-
-    if level == 0:
-        return visited
-
-    start_table = all_tables.get(start_qkey)
-    if not start_table:
-        return visited
-
-    if direction == 'references':
-        # Collect tables that this table references (via foreign keys)
-        for relation in start_table.relations:
-            target_qkey = f"{relation.target.schema_name}.{relation.target.table_name}"
-            if target_qkey in all_tables:
-                collect_related_tables(
-                    all_tables, target_qkey, direction, level - 1, visited
-                )
-
-    elif direction == 'referenced_by':
-        start_schema, start_table_name = start_qkey.split('.', 1)
-        # Collect tables that reference this table
-        for qkey, table in all_tables.items():
-            if qkey in visited:
-                continue
-            for relation in table.relations:
-                if (relation.target.schema_name == start_schema
-                        and relation.target.table_name == start_table_name):
-                    collect_related_tables(
-                        all_tables, qkey, direction, level - 1, visited
-                    )
-                    break
+    if graph is None:
+        graph = RelationGraph.from_tables(all_tables)
 
+    include = {qkey for qkey in all_tables if qkey not in visited}
+    visited.update(graph.walk(start_qkey, direction, level, include=include))
     return visited
 
 
@@ -129,19 +105,12 @@ def dbgear_to_in4viz_table(
     """
     columns = [dbgear_to_in4viz_column(col) for col in table.columns]
 
-    # Mark foreign key columns
-    for relation in table.relations:
-        for bind in relation.bind_columns:
-            for col in columns:
-                if col.name == bind.source_column:
-                    col.foreign_key = True
-
-    # Mark indexed columns
-    for index in table.indexes:
-        for index_col in index.columns:
-            for col in columns:
-                if col.name == index_col:
-                    col.index = True
+    # Mark foreign key and indexed columns
+    for col in columns:
+        if table.relations_for(col.name):
+            col.foreign_key = True
+        if table.indexes_for(col.name):
+            col.index = True
 
     return In4vizTable(
         name=table_name,
@@ -222,14 +191,15 @@ def _create_diagram(
         if len(resolved) == 1:
             center = resolved[0]
             tables_to_include: set[str] = {center}
+            graph = RelationGraph.from_tables(all_tables)
             if referenced_by_level > 0:
                 ref_tables = collect_related_tables(
-                    all_tables, center, 'referenced_by', referenced_by_level, set()
+                    all_tables, center, 'referenced_by', referenced_by_level, set(), graph
                 )
                 tables_to_include.update(ref_tables)
             if references_level > 0:
                 fk_tables = collect_related_tables(
-                    all_tables, center, 'references', references_level, set()
+                    all_tables, center, 'references', references_level, set(), graph
                 )
                 tables_to_include.update(fk_tables)
         else:
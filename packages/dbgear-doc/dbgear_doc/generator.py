@@ -125,7 +125,8 @@ def generate_docs(
     Returns:
         List of generated file paths.
     """
-    schema_manager = SchemaManager.load(schema_path)
+    # Entities are validated only when a scope actually renders them
+    schema_manager = SchemaManager.load(schema_path, lazy=True)
     template_path = Path(template)
     output_path = Path(output_dir)
 
@@ -138,6 +139,7 @@ def generate_docs(
         # Output to specified file path
         output_file = output_path
         output_file.parent.mkdir(parents=True, exist_ok=True)
+        schema_manager.materialize()
         content = template_obj.render(
             schemas=schema_manager.schemas,
             registry=schema_manager.registry,
@@ -0,0 +1,155 @@
+"""
+Synthetic inputs shared by the benchmarks.
+
+Every generator is deterministic for a given seed, so results of two runs
+(e.g. a baseline and a branch) are comparable.
+"""
+
+import os
+import random
+import sys
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from dbgear.models.datamodel import DataModel  # noqa: E402
+from dbgear.models.relation import BindColumn  # noqa: E402
+from dbgear.models.relation import EntityInfo  # noqa: E402
+from dbgear.models.relation import Relation  # noqa: E402
+from dbgear.models.schema import Schema  # noqa: E402
+from dbgear.models.table import Table  # noqa: E402
+
+# 生成する列の型（列番号の順に繰り返す。先頭の列は主キー）
+COLUMN_TYPES = (
+    {'columnType': 'VARCHAR(64)', 'baseType': 'VARCHAR', 'length': 64},
+    {'columnType': 'INT', 'baseType': 'INT'},
+    {'columnType': 'DATETIME', 'baseType': 'DATETIME'},
+    {'columnType': 'DECIMAL(10,2)', 'baseType': 'DECIMAL', 'precision': 10, 'scale': 2},
+)
+
+
+def build_schema_data(schemas: int, tables: int, columns: int, relations: float = 1.0, seed: int = 1) -> dict:
+    """
+    schema.yaml の内容（schemas 個のスキーマ × tables 個のテーブル × columns 個の列）
+
+    relations はテーブルあたりの外部キーの平均数。参照先は同じスキーマか、
+    それより前のスキーマの、より前のテーブルから選ぶ（循環しない）。
+    """
+    rng = random.Random(seed)
+    data = {'schemas': {}}
+    for s in range(schemas):
+        schema_tables = {}
+        for t in range(tables):
+            table_relations = []
+            for _ in range(_count(rng, relations) if s > 0 or t > 0 else 0):
+                target_schema = rng.randrange(s + 1) if t > 0 else rng.randrange(s)
+                target_table = rng.randrange(t) if target_schema == s else rng.randrange(tables)
+                table_relations.append({
+                    'target': {'schemaName': f'schema_{target_schema}', 'tableName': f'table_{target_table}'},
+                    'bindColumns': [{'sourceColumn': f'col_{1 + len(table_relations) % max(columns - 1, 1)}',
+                                     'targetColumn': 'col_0'}],
+                })
+            schema_tables[f'table_{t}'] = {
+                'displayName': f'Table {t}',
+                'columns': [
+                    {
+                        'columnName': f'col_{c}',
+                        'displayName': f'Column {c}',
+                        'columnType': COLUMN_TYPES[0] if c == 0 else COLUMN_TYPES[c % len(COLUMN_TYPES)],
+                        'nullable': c != 0,
+                        **({'primaryKey': 1} if c == 0 else {}),
+                    }
+                    for c in range(columns)
+                ],
+                'indexes': [{'indexName': f'ix_{t}', 'columns': ['col_1']}] if columns > 1 else [],
+                'relations': table_relations,
+            }
+        data['schemas'][f'schema_{s}'] = {'tables': schema_tables}
+    return data
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    # 平均が mean になる 0..2*mean の整数
+    whole = int(mean * 2)
+    return rng.randint(0, whole) if whole else int(rng.random() < mean)
+
+
+def write_schema(folder: str, data: dict) -> str:
+    filename = os.path.join(folder, 'schema.yaml')
+    with open(filename, 'w', encoding='utf-8') as f:
+        yaml.dump(data, f, allow_unicode=True)
+    return filename
+
+
+def build_graph(tables: int, fks: int, back_ratio: float, seed: int):
+    """
+    DependencyResolver 用のデータモデルとスキーマ
+
+    テーブルは主に前のテーブルを参照し、back_ratio の割合の外部キーは後ろのテーブルも参照する（循環し得る）。
+    """
+    rng = random.Random(seed)
+    schema = Schema(name='main')
+    datamodels = []
+    for t in range(tables):
+        relations = []
+        for _ in range(rng.randint(0, fks) if t > 0 else 0):
+            if rng.random() < back_ratio:
+                target = rng.randrange(tables)
+            else:
+                target = rng.randrange(t)
+            relations.append(Relation(
+                target=EntityInfo(schema_name='main', table_name=f'table_{target}'),
+                bind_columns=[BindColumn(source_column=f'ref_{target}', target_column='id')],
+            ))
+        schema.tables.append(Table(table_name=f'table_{t}', display_name=f'Table {t}', relations_=relations))
+        dependencies = [f'main@table_{rng.randrange(t)}'] if t > 0 and rng.random() < 0.05 else []
+        datamodels.append(DataModel(
+            folder='.', environ='bench', map_name='main', schema_name='main',
+            table_name=f'table_{t}', description='', sync_mode='drop_create', data_type='yaml',
+            dependencies=dependencies,
+        ))
+    rng.shuffle(datamodels)
+    return datamodels, schema
+
+
+def build_rows(rows: int, columns: int, variable_ratio: float = 0.0, seed: int = 1) -> list[dict]:
+    """
+    build_schema_data のテーブルに投入できる行
+
+    variable_ratio の割合の文字列の値は $base_url を含む。
+    """
+    rng = random.Random(seed)
+    data = []
+    for r in range(rows):
+        row = {'col_0': f'id-{r:08d}'}
+        for c in range(1, columns):
+            kind = c % len(COLUMN_TYPES)
+            if kind == 0:
+                row[f'col_{c}'] = f'$base_url/items/{r}' if rng.random() < variable_ratio else f'value {r}-{c}'
+            elif kind == 1:
+                row[f'col_{c}'] = r * c
+            elif kind == 2:
+                row[f'col_{c}'] = f'2024-01-{1 + r % 28:02d} 12:00:00'
+            else:
+                row[f'col_{c}'] = f'{r % 10000}.{c % 100:02d}'
+        data.append(row)
+    return data
+
+
+def write_yaml_data(path: str, rows: list[dict]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(rows, f, indent=2, allow_unicode=True, default_flow_style=False, sort_keys=False)
+
+
+def write_xlsx_data(path: str, sheet: str, rows: list[dict]) -> None:
+    """1行目をヘッダー、2行目以降をデータとするブック"""
+    import openpyxl
+
+    book = openpyxl.Workbook(write_only=True)
+    worksheet = book.create_sheet(sheet)
+    names = list(rows[0]) if rows else []
+    worksheet.append(names)
+    for row in rows:
+        worksheet.append([row.get(name) for name in names])
+    book.save(path)
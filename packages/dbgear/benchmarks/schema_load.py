@@ -0,0 +1,62 @@
+"""
+Microbenchmark: schema load from YAML vs. the validated schema cache.
+
+    python benchmarks/schema_load.py --tables 500 --columns 30
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import yaml
+
+from generators import build_schema_data
+from generators import write_schema
+
+from dbgear.models.schema import SchemaManager
+
+
+def measure(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--schemas', type=int, default=1)
+    parser.add_argument('--tables', type=int, default=300)
+    parser.add_argument('--columns', type=int, default=20)
+    parser.add_argument('--relations', type=float, default=1.0, help='average FKs per table')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filename = write_schema(temp_dir, build_schema_data(args.schemas, args.tables, args.columns, args.relations))
+        cache_dir = os.path.join(temp_dir, 'cache')
+        SchemaManager.load(filename, cache_dir=cache_dir)
+
+        with open(filename, 'r', encoding='utf-8') as f:
+            populated = SchemaManager._populate(yaml.safe_load(f))
+
+        results = [
+            ('load (YAML + validation)', measure(lambda: SchemaManager.load(filename), args.repeat)),
+            ('load (schema cache)', measure(lambda: SchemaManager.load(filename, cache_dir=cache_dir), args.repeat)),
+            ('model_validate', measure(lambda: SchemaManager.model_validate(populated), args.repeat)),
+        ]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print(f'{args.schemas} schema(s) x {args.tables} tables x {args.columns} columns (best of {args.repeat})')
+    for name, elapsed in results:
+        print(f'  {name:<28} {elapsed * 1000:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+asyncio版の適用処理（pip install dbgear[async]）
+
+非同期ドライバー（aiomysql / asyncmy）のAsyncEngineで接続し、1つのプロセスで
+複数のデータベース（テナント等）への適用を並行して実行する。
+SQLの組み立てと実行は同期版の Operation の処理を AsyncConnection.run_sync で
+非同期ドライバーの接続上で実行するため、結果は同期版と同じになる。
+データ投入では、次のバッチの解析を別スレッドで進めながら投入の完了を待つ。
+セグメント分割されたデータソースは、同期版と同じく spawn で起動したプロセスプールで
+解析する（apply_async では全データベースで1つのプールを共有する）。
+"""
+
+import asyncio
+from logging import getLogger
+from datetime import datetime
+
+from .dbio import engine
+from .models.datasources.loader import create_pool
+from .models.project import Project
+from .models.mapping import Mapping
+from .models.schema import Schema
+from .operations import Operation
+from .operations import validate_data
+from .operations import execution_report
+from .operations import progress_report
+from .utils import progress as progress_module
+
+logger = getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+
+def _next_checked(op: Operation, map: Mapping, tbl, checker, batches):
+    """次のバッチを読み込んでテーブル定義と照合する（別スレッドで実行する）。残りがなければ None"""
+    item = next(batches, None)
+    if item is not None:
+        op._check_batch(map, tbl, checker, *item)
+    return item
+
+
+class AsyncOperation:
+    """
+    1つの非同期接続で適用処理を行う。各処理は同期版 Operation の同名メソッドの非同期版
+
+    async with AsyncOperation(project, env, database, deploy) as op:
+        await op.create_database(map, 'drop')
+    """
+
+    def __init__(self, project: Project, env: str, database: str, deploy: str, backup_key: str = None, dryrun: bool = False,
+                 load_workers: int | None = None, ordered_load: bool = True, async_engine=None,
+                 progress: progress_module.Progress | None = None, check_batches: bool = True, loader_pool=None):
+        self.project = project
+        self.env = env
+        self.environ = project.envs[env]
+        self.database = database
+        self.deploy = deploy
+        self.dryrun = dryrun
+        self.load_workers = load_workers
+        self.ordered_load = ordered_load
+        self.progress = progress
+        self.check_batches = check_batches
+        self.ymd = backup_key if backup_key else datetime.strftime(datetime.now(), '%Y%m%d%H%M%S')
+
+        # async_engineを指定した場合は共有し、破棄は呼び出し元に任せる
+        self._owns_engine = async_engine is None
+        self.engine = engine.get_async_engine(self.environ.deployments[deploy]) if async_engine is None else async_engine
+        self.conn = None
+        self.operation: Operation | None = None
+        # loader_poolを指定した場合はデータソースの読み込みで共有し、終了は呼び出し元に任せる
+        self.loader_pool = loader_pool
+
+    async def __aenter__(self):
+        self.conn = await self.engine.connect()
+        # 非同期接続の同期版ファサードを使う Operation を生成する（run_sync の中でのみSQLを実行できる）
+        self.operation = await self.conn.run_sync(lambda conn: Operation(
+            self.project, self.env, self.database, self.deploy, self.ymd, dryrun=self.dryrun,
+            load_workers=self.load_workers, ordered_load=self.ordered_load, conn=conn, progress=self.progress,
+            check_batches=self.check_batches))
+        self.operation._pool = self.loader_pool
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.conn.close()
+        if self._owns_engine:
+            await self.engine.dispose()
+
+    async def _run(self, func, *args):
+        """Operation のメソッドを非同期接続上で実行する"""
+        return await self.conn.run_sync(lambda _: func(*args))
+
+    async def validate_data(self, map: Mapping, schema: Schema, all: bool, target: str, max_workers: int | None = None):
+        # 検証はDBに接続しないため、別スレッドで実行する
+        await asyncio.to_thread(validate_data, self.environ, map, schema, all, target, max_workers, self.dryrun)
+
+    async def create_database(self, map: Mapping, all: str):
+        await self._run(self.operation.create_database, map, all)
+
+    async def create_table(self, map: Mapping, schema: Schema, all: str, target: str, restore_only: bool = False):
+        await self._run(self.operation.create_table, map, schema, all, target, restore_only)
+
+    async def recreate_indexes_only(self, map: Mapping, schema: Schema, target: str):
+        await self._run(self.operation.recreate_indexes_only, map, schema, target)
+
+    async def insert_data(self, map: Mapping, schema: Schema, all: bool, target: str, no_restore: bool = False,
+                          patch_file: str = None, restore_backup: bool = False):
+        if no_restore:
+            return
+
+        op = self.operation
+        processed_tables = set()
+        with op._loader_pool():
+            for dm, tbl, datasources, rows in await self._run(op._insert_plan, map, schema, all, target, patch_file):
+                processed_tables.add(dm.table_name)
+
+                batches = op._load_batches(datasources)
+                checker = op._batch_checker(dm, tbl)
+                with op._track('insert', map.instance_name, tbl.table_name, rows):
+                    # 投入の完了を待つ間に、次のバッチの解析と照合を別スレッドで進めておく
+                    # （イベントループで照合すると、並行して適用中の他のデータベースが止まる）
+                    pending = asyncio.ensure_future(asyncio.to_thread(_next_checked, op, map, tbl, checker, batches))
+                    try:
+                        while (item := await pending) is not None:
+                            pending = asyncio.ensure_future(asyncio.to_thread(_next_checked, op, map, tbl, checker, batches))
+                            ds, batch = item
+                            await self._run(op._insert_batch, map, tbl, ds, batch)
+                    finally:
+                        await asyncio.gather(pending, return_exceptions=True)
+                await self._run(op._restore_datamodel, map, dm, tbl, target, patch_file)
+
+        await self._run(op._restore_target, map, schema, target, processed_tables, patch_file, restore_backup)
+
+
+async def apply_async(
+        project, env: str, database: str, target: str, all: str, deploy: str,
+        no_restore: bool = False, restore_only: bool = False, patch: str = None, backup_key: str = None,
+        index_only: bool = False, restore_backup: bool = False, dryrun: bool = False,
+        validate: str = 'full', validate_workers: int | None = None,
+        load_workers: int | None = None, ordered_load: bool = True,
+        concurrency: int = DEFAULT_CONCURRENCY, report_top: int = 10, report_file: str | None = None,
+        progress: str = 'auto', progress_interval: float = progress_module.DEFAULT_INTERVAL):
+    """
+    apply の非同期版。データベースごとに接続し、最大 concurrency 個のデータベースへ並行して適用する
+
+    いずれかのデータベースで失敗しても他のデータベースの適用は最後まで行い、最初の例外を送出する。
+    validate は apply と同じ（full / batch / off）。
+    """
+    if dryrun:
+        logger.info("=== DRYRUN MODE: SQL statements will be printed but not executed ===")
+
+    environ = project.envs[env]
+    targets = []
+    for map in environ.databases:
+        if database is not None and map.instance_name != database:
+            continue
+        targets.append((map, map.build_schema(project.schemas, environ.schemas)))
+
+    # テーブルを削除・再作成する前に、接続を開かずに全データベースの投入データを検証する
+    if validate == 'full' and not index_only and not no_restore:
+        for map, schema in targets:
+            await asyncio.to_thread(validate_data, environ, map, schema, all, target, validate_workers, dryrun)
+
+    # 全データベースで同じバックアップのキーを使う
+    ymd = backup_key if backup_key else datetime.strftime(datetime.now(), '%Y%m%d%H%M%S')
+    async_engine = engine.get_async_engine(environ.deployments[deploy], pool_size=concurrency, max_overflow=0)
+
+    reporter = None
+    # データソースの並列読み込みは、全データベースで1つのプロセスプールを共有する
+    loader_pool = create_pool(load_workers)
+
+    def operation():
+        return AsyncOperation(project, env, database, deploy, ymd, dryrun=dryrun,
+                              load_workers=load_workers, ordered_load=ordered_load, async_engine=async_engine,
+                              progress=reporter, check_batches=validate != 'off', loader_pool=loader_pool)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def apply_database(map, schema):
+        async with semaphore, operation() as op:
+            if index_only:
+                await op.recreate_indexes_only(map, schema, target)
+            else:
+                await op.create_database(map, all)
+                await op.create_table(map, schema, all, target, restore_only)
+                await op.insert_data(map, schema, all, target, no_restore, patch, restore_backup)
+
+    try:
+        with execution_report(dryrun, report_top, report_file), \
+                progress_report(dryrun, progress, progress_interval) as reporter:
+            results = await asyncio.gather(*(apply_database(map, schema) for map, schema in targets), return_exceptions=True)
+            errors = []
+            for (map, _), result in zip(targets, results):
+                if isinstance(result, BaseException):
+                    logger.error(f'failed to apply {map.instance_name}: {result}')
+                    errors.append(result)
+            if errors:
+                raise errors[0]
+    finally:
+        loader_pool.shutdown(cancel_futures=True)
+        await async_engine.dispose()
@@ -0,0 +1,165 @@
+"""
+SQLの実行時間の計測
+
+engine.add_hook() で登録した関数に、実行したSQLごとの Statement を渡す。
+ExecutionReport はフックとして登録し、フェーズ・テンプレート・対象ごとに集計する。
+"""
+
+import json
+from typing import Any
+from typing import NamedTuple
+
+# 投入時間の内訳を示すフェーズ（テンプレート名から判定する）
+PHASES = ('backup', 'create', 'insert', 'restore', 'index', 'check', 'other')
+
+_PHASE_BY_TEMPLATE = {
+    'mysql_backup_table': 'backup',
+    'mysql_insert_into': 'insert',
+    'mysql_restore_table': 'restore',
+    'mysql_restore_table_update': 'restore',
+    'mysql_create_index': 'index',
+    'mysql_drop_index': 'index',
+    'mysql_get_view_definition': 'check',
+    'mysql_get_table_stats': 'check',
+}
+
+# 対象の名前を表す値のキー（テンプレートの引数・SQLのパラメータ）
+_NAME_KEYS = ('table_name', 'view_name', 'trigger_name', 'procedure_name', 'backup_table_name', 'dependency_name')
+_OBJECT_KEYS = (('table', 'table_name'), ('view', 'view_name'), ('trigger', 'trigger_name'), ('procedure', 'procedure_name'))
+
+# パラメータのバイト数を見積もる際に調べる行数
+_SAMPLE_ROWS = 1000
+
+
+class Statement(NamedTuple):
+    category: str        # テンプレート名（テンプレートを使わないSQLは 'sql'）
+    phase: str
+    target: str | None   # 対象のオブジェクト（'データベース.テーブル' 等）
+    rows: int            # 影響を受けた行数（取得できない場合は -1）
+    bytes: int           # 送信したSQLとパラメータのおおよそのバイト数
+    seconds: float
+
+
+def phase_of(category: str) -> str:
+    phase = _PHASE_BY_TEMPLATE.get(category)
+    if phase is not None:
+        return phase
+    if category.startswith('mysql_check_'):
+        return 'check'
+    if category.startswith(('mysql_create_', 'mysql_drop_', 'mysql_add_')):
+        return 'create'
+    if category == 'patch':
+        return 'restore'
+    return 'other'
+
+
+def target_of(values: dict[str, Any]) -> str | None:
+    """テンプレートの引数やパラメータから、対象のオブジェクト名を求める"""
+    env = values.get('env') or values.get('database_name')
+    name = next((values[key] for key in _NAME_KEYS if values.get(key)), None)
+    if name is None:
+        for key, attr in _OBJECT_KEYS:
+            if values.get(key) is not None:
+                name = getattr(values[key], attr, None)
+                break
+    if name is None:
+        return env
+    return f'{env}.{name}' if env else name
+
+
+def _value_bytes(value) -> int:
+    if value is None:
+        return 4
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(str(value))
+
+
+def param_bytes(params) -> int:
+    """パラメータのおおよそのバイト数（行が多い場合は先頭の行から推定する）"""
+    if not params:
+        return 0
+    if isinstance(params, dict):
+        return sum(_value_bytes(v) for v in params.values())
+    sample = params[:_SAMPLE_ROWS]
+    size = sum(_value_bytes(v) for row in sample for v in row.values())
+    return size * len(params) // len(sample)
+
+
+class _Total:
+    __slots__ = ('count', 'rows', 'bytes', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def add(self, statement: Statement):
+        self.count += 1
+        self.rows += max(statement.rows, 0)
+        self.bytes += statement.bytes
+        self.seconds += statement.seconds
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'rows': self.rows, 'bytes': self.bytes, 'seconds': round(self.seconds, 6)}
+
+
+class ExecutionReport:
+    """
+    実行したSQLをフェーズ・テンプレート・対象ごとに集計する
+
+    engine.add_hook(report) で登録する。個々のSQLは保持せず、合計のみを持つ。
+    """
+
+    def __init__(self):
+        self.total = _Total()
+        self.phases: dict[str, _Total] = {}
+        self.categories: dict[str, _Total] = {}
+        self.targets: dict[str, _Total] = {}
+
+    def __call__(self, statement: Statement) -> None:
+        self.total.add(statement)
+        self._total(self.phases, statement.phase).add(statement)
+        self._total(self.categories, statement.category).add(statement)
+        if statement.target is not None:
+            self._total(self.targets, statement.target).add(statement)
+
+    @staticmethod
+    def _total(totals: dict[str, _Total], key: str) -> _Total:
+        total = totals.get(key)
+        if total is None:
+            total = totals[key] = _Total()
+        return total
+
+    def slowest(self, top: int = 10) -> list[tuple[str, _Total]]:
+        """実行時間の合計が長い対象（テーブル等）"""
+        return sorted(self.targets.items(), key=lambda item: item[1].seconds, reverse=True)[:top]
+
+    def to_dict(self, top: int = 10) -> dict:
+        return {
+            'total': self.total.to_dict(),
+            'phases': {phase: self.phases[phase].to_dict() for phase in PHASES if phase in self.phases},
+            'categories': {name: total.to_dict() for name, total in
+                           sorted(self.categories.items(), key=lambda item: item[1].seconds, reverse=True)},
+            'slowest': [{'target': target, **total.to_dict()} for target, total in self.slowest(top)],
+        }
+
+    def to_json(self, top: int = 10) -> str:
+        return json.dumps(self.to_dict(top), indent=2, ensure_ascii=False)
+
+    def format(self, top: int = 10) -> str:
+        lines = [f'SQL: {self.total.count} statements, {self.total.rows} rows, '
+                 f'{self.total.bytes / 1024 / 1024:.1f} MB, {self.total.seconds:.3f} s']
+        for phase in PHASES:
+            total = self.phases.get(phase)
+            if total is None:
+                continue
+            share = total.seconds / self.total.seconds * 100 if self.total.seconds else 0.0
+            lines.append(f'  {phase:<8} {total.seconds:10.3f} s ({share:5.1f}%)  {total.count} statements, {total.rows} rows')
+        slowest = self.slowest(top)
+        if slowest:
+            lines.append(f'  slowest {len(slowest)} targets:')
+            for target, total in slowest:
+                lines.append(f'    {target:<40} {total.seconds:10.3f} s  {total.count} statements, {total.rows} rows')
+        return '\n'.join(lines)
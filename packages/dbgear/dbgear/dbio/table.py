@@ -1,4 +1,3 @@
-import json
 from logging import getLogger
 
 from . import engine
@@ -6,9 +5,13 @@ from .templates.mysql import template_engine
 
 from ..models.schema import Table
 from ..models.column import Column
+from ..models.datasources.batch import ColumnBatch
 
 logger = getLogger(__name__)
 
+# 1回のINSERTで送信する行数の上限（大きなバッチでも、進捗が途中で進むようにする）
+INSERT_CHUNK_ROWS = 10000
+
 
 def is_exist(conn, env: str, table: Table):
     sql = template_engine.render('mysql_check_table_exists')
@@ -39,44 +42,62 @@ def create(conn, env: str, table: Table, dryrun=False):
         engine.execute(conn, sql, dryrun=dryrun)
 
 
-def _col_value(item: dict, column: Column):
-    if column.column_name in item:
-        if item[column.column_name] is not None and type(item[column.column_name]) is str:
-            # 関数定義されている場合には、SQLに関数を埋め込む。
-            if '(' in item[column.column_name]:
-                return item[column.column_name]
-        return f':{column.column_name}'
-    # FIXME データ整備ミスとなるので、例外を投げるが、事前チェックが望ましいと思う。
-    raise ValueError(f"Column '{column.column_name}' not found in item.")
-
-
-def _col_conv(values: dict):
-    return {
-        k: v if not isinstance(v, dict) else json.dumps(v, ensure_ascii=True)
-        for k, v in values.items()
-    }
-
-
-def insert(conn, env: str, table: Table, items: list[dict], dryrun=False):
-    if len(items) == 0:
+def _row_shapes(batch: ColumnBatch, columns: list[Column]) -> list[tuple[tuple, list[int] | None]]:
+    """
+    行を埋め込む関数定義の組み合わせ（shape）ごとに分ける
+
+    shapeは列ごとの関数定義（バインドする列はNone）のタプル。
+    関数定義を含まない場合は、全行（None）を1つのshapeとして返す。
+    """
+    functions = {}
+    for idx, column in enumerate(columns):
+        if column.column_name not in batch:
+            # 通常は適用前の検証（utils.validation）で検出される。
+            raise ValueError(f"Column '{column.column_name}' not found in item.")
+        if column.column_name in batch.missing:
+            raise ValueError(f"Column '{column.column_name}' not found in item {batch.missing[column.column_name][0] + 1}.")
+        for row, value in batch.sql_functions(column.column_name).items():
+            functions.setdefault(row, {})[idx] = value
+    bound = (None,) * len(columns)
+    if not functions:
+        return [(bound, None)]
+    shapes = {}
+    for row in range(len(batch)):
+        embedded = functions.get(row)
+        shape = bound if embedded is None else tuple(embedded.get(idx) for idx in range(len(columns)))
+        shapes.setdefault(shape, []).append(row)
+    return list(shapes.items())
+
+
+def insert(conn, env: str, table: Table, items: list[dict] | ColumnBatch, dryrun=False):
+    """Insert rows given as a list of dicts or a ColumnBatch (dict columns of the batch are JSON-encoded in place).
+
+    Rows are grouped by which columns hold SQL functions (e.g. NOW()); one INSERT is rendered
+    per group and executed with the rows of the group, up to INSERT_CHUNK_ROWS rows at a time.
+    """
+    batch = items if isinstance(items, ColumnBatch) else ColumnBatch.from_rows(items)
+    if len(batch) == 0:
         logger.warning(f'No items to insert into {env}.{table.table_name}')
         return
     # Filter out generated columns (expression fields) from INSERT
     insertable_columns = [c for c in table.columns if c.expression is None]
-
-    # Prepare column names and value placeholders
     column_names = [c.column_name for c in insertable_columns]
-    value_placeholders = [_col_value(items[0], c) for c in insertable_columns]
-    params = [_col_conv(item) for item in items]
 
-    sql = template_engine.render(
-        'mysql_insert_into',
-        env=env,
-        table_name=table.table_name,
-        column_names=column_names,
-        value_placeholders=value_placeholders
-    )
-    engine.execute(conn, sql, params, dryrun=dryrun)
+    shapes = _row_shapes(batch, insertable_columns)
+    batch.encode_json()
+    for shape, indices in shapes:
+        # 関数定義の列はSQLに埋め込み、それ以外の列をバインドする
+        value_placeholders = [f':{name}' if func is None else func for name, func in zip(column_names, shape)]
+        params = batch.rows([name for name, func in zip(column_names, shape) if func is None], indices)
+        sql = template_engine.render(
+            'mysql_insert_into',
+            env=env,
+            table_name=table.table_name,
+            column_names=column_names,
+            value_placeholders=value_placeholders
+        )
+        for start in range(0, len(params), INSERT_CHUNK_ROWS):
+            engine.execute(conn, sql, params[start:start + INSERT_CHUNK_ROWS], dryrun=dryrun)
     if not dryrun:
         conn.commit()
 
@@ -114,11 +135,27 @@ def restore_update(conn, env: str, table: Table, ymd: str, dryrun=False):
 
 def is_exist_backup(conn, env: str, table: Table, ymd: str):
     sql = template_engine.render('mysql_check_backup_exists')
-    backup_table_name = f'bak_{table.table_name}_{ymd}'
-    result = engine.select_one(conn, sql, {'env': env, 'backup_table_name': backup_table_name})
+    result = engine.select_one(conn, sql, {'env': env, 'backup_table_name': backup_table_name(table, ymd)})
     return result is not None
 
 
+def get_stats(conn, env: str) -> dict[str, tuple[int, int]]:
+    """
+    データベースの各テーブルの行数とデータサイズ（バイト）を返す
+
+    information_schema.tables の値のため、InnoDBでは行数は概算になる。
+    """
+    sql = template_engine.render('mysql_get_table_stats')
+    return {
+        row['table_name']: (row['table_rows'] or 0, row['data_length'] or 0)
+        for row in engine.select_all(conn, sql, {'env': env})
+    }
+
+
+def backup_table_name(table: Table, ymd: str) -> str:
+    return f'bak_{table.table_name}_{ymd}'
+
+
 def drop_indexes(conn, env: str, table: Table, dryrun=False):
     """Drop all secondary indexes on a table (excluding primary key)."""
     for idx, index in enumerate(table.indexes):
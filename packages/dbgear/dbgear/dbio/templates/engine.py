@@ -3,6 +3,19 @@
 from jinja2 import Environment, DictLoader  # type: ignore
 
 
+class RenderedSQL(str):
+    """SQL rendered from a template; keeps the template name and context for instrumentation."""
+
+    template: str
+    context: dict
+
+    def __new__(cls, sql: str, template: str, context: dict):
+        obj = super().__new__(cls, sql)
+        obj.template = template
+        obj.context = context
+        return obj
+
+
 class SQLTemplateEngine:
     """SQL template engine using Jinja2."""
 
@@ -58,10 +71,10 @@ class SQLTemplateEngine:
         self.env.filters['escape_identifier'] = self._escape_identifier_filter
         self.env.filters['escape_string'] = self._escape_string_filter
 
-    def render(self, template_name: str, **kwargs) -> str:
+    def render(self, template_name: str, **kwargs) -> RenderedSQL:
         """Render a template with the given context."""
         template = self.env.get_template(template_name)
-        return template.render(**kwargs)
+        return RenderedSQL(template.render(**kwargs), template_name, kwargs)
 
 
 # Global template engine instance
@@ -108,6 +108,13 @@ SELECT TABLE_NAME FROM information_schema.tables
 WHERE table_schema = :env AND table_name = :table_name
 """
 
+# GET TABLE STATS template (estimated rows and data size of each table)
+GET_TABLE_STATS_TEMPLATE = """
+SELECT TABLE_NAME AS table_name, TABLE_ROWS AS table_rows, DATA_LENGTH AS data_length
+FROM information_schema.tables
+WHERE table_schema = :env AND table_type = 'BASE TABLE'
+"""
+
 # DROP TABLE template
 DROP_TABLE_TEMPLATE = """
 DROP TABLE {{ env }}.{{ table_name }}
@@ -272,6 +279,7 @@ template_engine.add_template('mysql_backup_table', BACKUP_TABLE_TEMPLATE)
 template_engine.add_template('mysql_restore_table', RESTORE_TABLE_TEMPLATE)
 template_engine.add_template('mysql_restore_table_update', RESTORE_TABLE_UPDATE_TEMPLATE)
 template_engine.add_template('mysql_check_backup_exists', CHECK_BACKUP_EXISTS_TEMPLATE)
+template_engine.add_template('mysql_get_table_stats', GET_TABLE_STATS_TEMPLATE)
 template_engine.add_template('mysql_check_database_exists', CHECK_DATABASE_EXISTS_TEMPLATE)
 template_engine.add_template('mysql_check_view_exists', CHECK_VIEW_EXISTS_TEMPLATE)
 template_engine.add_template('mysql_drop_view', DROP_VIEW_TEMPLATE)
@@ -1,4 +1,5 @@
 import logging
+import os
 from argparse import ArgumentParser
 from importlib.metadata import entry_points
 
@@ -12,6 +13,27 @@ def execute():
         '--project',
         default='database',
         help='please specify the folder for the project.')
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='print wall/CPU time spent in each phase (project load, validation, parsing, SQL, ...) at the end.')
+    parser.add_argument(
+        '--profile-json',
+        help='write the phase profile to this file as JSON (implies --profile).')
+    parser.add_argument(
+        '--profile-speedscope',
+        help='write the phase timeline to this file in speedscope format (implies --profile).')
+    parser.add_argument(
+        '--profile-cprofile',
+        help='also run cProfile and write its stats to this file in pstats format (implies --profile).')
+    parser.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='also record peak memory of each phase with tracemalloc (implies --profile; slows the run down).')
+    parser.add_argument(
+        '--schema-cache',
+        default=os.environ.get('DBGEAR_SCHEMA_CACHE'),
+        help='directory for caching validated schema definitions (default: $DBGEAR_SCHEMA_CACHE).')
 
     sub = parser.add_subparsers(dest='command', help='sub-command help')
 
@@ -67,6 +89,103 @@ def execute():
         action='store_true',
         help='print SQL statements without executing them'
     )
+    validate_group = apply_parser.add_mutually_exclusive_group()
+    validate_group.add_argument(
+        '--validate',
+        choices=['full', 'batch', 'off'],
+        default='full',
+        help='how to check data against table definitions: "full" parses every data source before any DDL runs '
+             'and checks each batch again before it is inserted, "batch" only checks batches while inserting, '
+             '"off" skips checking (default: full)'
+    )
+    validate_group.add_argument(
+        '--no-validate',
+        action='store_const',
+        const='off',
+        dest='validate',
+        help='skip checking data against table definitions (same as --validate off)'
+    )
+    apply_parser.add_argument(
+        '--validate-workers',
+        type=int,
+        help='number of processes used to validate data sources (default: number of CPUs)'
+    )
+    apply_parser.add_argument(
+        '--load-workers',
+        type=int,
+        help='number of processes used to parse segmented data sources (default: number of CPUs)'
+    )
+    apply_parser.add_argument(
+        '--load-order',
+        choices=['file', 'completion'],
+        default='file',
+        help='insert segments in file name order (default) or as soon as each one is parsed'
+    )
+    apply_parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='apply up to this many databases concurrently with the asyncio backend (requires dbgear[async])'
+    )
+    apply_parser.add_argument(
+        '--report-top',
+        type=int,
+        default=10,
+        help='number of slowest tables shown in the SQL timing report printed at the end (default: 10)'
+    )
+    apply_parser.add_argument(
+        '--report-json',
+        help='also write the SQL timing report to this file as JSON'
+    )
+    apply_parser.add_argument(
+        '--progress',
+        choices=['auto', 'bar', 'log', 'off'],
+        default='auto',
+        help='show rows/s, bytes/s and ETA of backup, insert and restore: a live bar on a terminal, '
+             'periodic log lines otherwise (default: auto)'
+    )
+    apply_parser.add_argument(
+        '--progress-interval',
+        type=float,
+        default=30.0,
+        help='seconds between progress log lines when not writing to a terminal (default: 30)'
+    )
+
+    # Core subcommand: plan
+    plan_parser = sub.add_parser('plan', help='show the data insertion plan')
+    plan_parser.add_argument(
+        'env',
+        help='target environment.')
+    plan_parser.add_argument(
+        '--database',
+        help='target database.')
+    plan_parser.add_argument(
+        '--no-rows',
+        action='store_true',
+        help='weight every table as 1 instead of counting rows in its data sources')
+    plan_parser.add_argument(
+        '--exact',
+        action='store_true',
+        help='count rows by parsing every data source instead of estimating them from the files')
+    plan_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='print the plan as JSON')
+
+    # Core subcommand: data
+    data_parser = sub.add_parser('data', help='data file operations')
+    data_sub = data_parser.add_subparsers(dest='data_command')
+    compile_parser = data_sub.add_parser(
+        'compile',
+        help='compile YAML data files (.dat) into binary files (.datc) that apply reads instead while they are fresh')
+    compile_parser.add_argument(
+        'env',
+        help='target environment.')
+    compile_parser.add_argument(
+        '--database',
+        help='target database.')
+    compile_parser.add_argument(
+        '--target',
+        help='target table.')
 
     # Load plugin commands dynamically
     plugin_commands = {}
@@ -89,12 +208,40 @@ def execute():
     if args.command is None:
         parser.print_help()
         return
+    if args.command == 'data' and args.data_command is None:
+        data_parser.print_help()
+        return
+
+    profile = args.profile or args.profile_json or args.profile_speedscope or args.profile_cprofile or args.profile_memory
+    if not profile:
+        _run(args, plugin_commands)
+        return
 
+    from .utils.profiling import phase
+    from .utils.profiling import profiler
+    profiler.start(cprofile=bool(args.profile_cprofile), memory=args.profile_memory)
+    try:
+        with phase(args.command):
+            _run(args, plugin_commands)
+    finally:
+        report = profiler.stop()
+        print(report.format())
+        if args.profile_json:
+            report.write_json(args.profile_json)
+        if args.profile_speedscope:
+            report.write_speedscope(args.profile_speedscope)
+        if args.profile_cprofile:
+            report.write_pstats(args.profile_cprofile)
+
+
+def _run(args, plugin_commands):
     # For other commands, load project and required modules
     from .models.project import Project
     from . import operations
 
-    project = Project.load(args.project)
+    # --target指定のapplyでは、対象テーブルの定義のみを検証する
+    lazy = args.command == 'apply' and not args.all
+    project = Project.load(args.project, lazy=lazy, cache_dir=args.schema_cache)
 
     if args.command == 'apply':
         if not args.all and args.target is None:
@@ -131,6 +278,35 @@ def execute():
                 logging.error('--restore-backup requires --target to specify a table')
                 return
 
+        if args.concurrency:
+            import asyncio
+            from .async_operations import apply_async
+            asyncio.run(apply_async(
+                project,
+                args.env,
+                args.database,
+                args.target,
+                args.all,
+                args.deploy,
+                args.no_restore,
+                args.restore_only,
+                args.patch,
+                args.backup_key,
+                args.index_only,
+                args.restore_backup,
+                args.dryrun,
+                args.validate,
+                args.validate_workers,
+                args.load_workers,
+                args.load_order == 'file',
+                args.concurrency,
+                args.report_top,
+                args.report_json,
+                args.progress,
+                args.progress_interval
+            ))
+            return
+
         operations.apply(
             project,
             args.env,
@@ -144,9 +320,23 @@ def execute():
             args.backup_key,
             args.index_only,
             args.restore_backup,
-            args.dryrun
+            args.dryrun,
+            args.validate,
+            args.validate_workers,
+            args.load_workers,
+            args.load_order == 'file',
+            args.report_top,
+            args.report_json,
+            args.progress,
+            args.progress_interval
         )
 
+    elif args.command == 'plan':
+        operations.plan(project, args.env, args.database, not args.no_rows, args.json, args.exact)
+
+    elif args.command == 'data':
+        operations.compile_data(project, args.env, args.database, args.target)
+
     elif args.command in plugin_commands:
         # Execute plugin command
         plugin = plugin_commands[args.command]
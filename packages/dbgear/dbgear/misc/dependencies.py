@@ -9,6 +9,9 @@ import pathlib
 import re
 import yaml
 
+from ..models.graph import RelationGraph
+from ..models.graph import qualified_name
+from ..models.graph import view_references_table
 from ..models.schema import SchemaManager
 
 
@@ -50,6 +53,13 @@ class TableDependencyAnalyzer:
     def __init__(self, schema_manager: SchemaManager, project_folder: Optional[str] = None):
         self.schema_manager = schema_manager
         self.project_folder = project_folder
+        self._graph = None
+
+    @property
+    def graph(self) -> RelationGraph:
+        if self._graph is None:
+            self._graph = self.schema_manager.relation_graph()
+        return self._graph
 
     def analyze(self, schema_name: str, table_name: str,
                 left_level: int = 3, right_level: int = 3) -> Dict[str, Any]:
@@ -175,66 +185,61 @@ class TableDependencyAnalyzer:
         """Get objects that directly reference the target table"""
         items = []
 
+        target_key = qualified_name(target_schema, target_table)
+
         # 1. Foreign key references from other tables
-        for schema in self.schema_manager:
-            for table in schema.tables:
-                for relation in table.relations:
-                    if (relation.target.schema_name == target_schema and relation.target.table_name == target_table):
-                        items.append(DependencyItem(
-                            dep_type="relation",
-                            schema_name=schema.name,
-                            table_name=table.table_name,
-                            object_name=relation.constraint_name or f"fk_{table.table_name}_{target_table}",
-                            details={
-                                "constraint_name": relation.constraint_name,
-                                "bind_columns": [
-                                    {
-                                        "source_column": bc.source_column,
-                                        "target_column": bc.target_column
-                                    } for bc in relation.bind_columns
-                                ],
-                                "on_delete": relation.on_delete,
-                                "on_update": relation.on_update,
-                                "cardinarity_source": relation.cardinarity_source,
-                                "cardinarity_target": relation.cardinarity_target
-                            }
-                        ))
+        for edge in self.graph.referenced_by(target_key):
+            schema_name, table_name = edge.source.split('.', 1)
+            relation = edge.relation
+            items.append(DependencyItem(
+                dep_type="relation",
+                schema_name=schema_name,
+                table_name=table_name,
+                object_name=relation.constraint_name or f"fk_{table_name}_{target_table}",
+                details={
+                    "constraint_name": relation.constraint_name,
+                    "bind_columns": [
+                        {
+                            "source_column": bc.source_column,
+                            "target_column": bc.target_column
+                        } for bc in relation.bind_columns
+                    ],
+                    "on_delete": relation.on_delete,
+                    "on_update": relation.on_update,
+                    "cardinarity_source": relation.cardinarity_source,
+                    "cardinarity_target": relation.cardinarity_target
+                }
+            ))
 
         # 2. Views that reference the target table
-        for schema in self.schema_manager:
-            for view in schema.views:
-                if self._view_references_table(view.select_statement, target_schema, target_table):
-                    items.append(DependencyItem(
-                        dep_type="view",
-                        schema_name=schema.name,
-                        table_name=None,
-                        object_name=view.view_name,
-                        details={
-                            "select_statement": view.select_statement,
-                            "referenced_columns": self._extract_columns_from_view(view.select_statement, target_table),
-                            "dependencies": view._dependencies
-                        }
-                    ))
+        for schema_name, view in self.graph.views(target_key):
+            items.append(DependencyItem(
+                dep_type="view",
+                schema_name=schema_name,
+                table_name=None,
+                object_name=view.view_name,
+                details={
+                    "select_statement": view.select_statement,
+                    "referenced_columns": self._extract_columns_from_view(view.select_statement, target_table),
+                    "dependencies": view._dependencies
+                }
+            ))
 
         # 3. Triggers on the target table
-        target_schema_obj = self.schema_manager[target_schema]
-        if target_table in target_schema_obj.tables:
-            # table_obj = target_schema_obj.tables[target_table]
-            if hasattr(target_schema_obj, 'triggers'):
-                for trigger in target_schema_obj.triggers:
-                    if trigger.table_name == target_table:
-                        items.append(DependencyItem(
-                            dep_type="trigger",
-                            schema_name=target_schema,
-                            table_name=target_table,
-                            object_name=trigger.trigger_name,
-                            details={
-                                "timing": trigger.timing,
-                                "event": trigger.event,
-                                "condition": trigger.condition,
-                                "body": trigger.body
-                            }
-                        ))
+        if target_key in self.graph:
+            for trigger in self.graph.triggers(target_key):
+                items.append(DependencyItem(
+                    dep_type="trigger",
+                    schema_name=target_schema,
+                    table_name=target_table,
+                    object_name=trigger.trigger_name,
+                    details={
+                        "timing": trigger.timing,
+                        "event": trigger.event,
+                        "condition": trigger.condition,
+                        "body": trigger.body
+                    }
+                ))
 
         return items
 
@@ -293,22 +298,7 @@ class TableDependencyAnalyzer:
 
     def _view_references_table(self, select_statement: str, schema_name: str, table_name: str) -> bool:
         """Simple check if view references the specified table"""
-        # This is a simple implementation - in practice, you might want proper SQL parsing
-        statement_lower = select_statement.lower()
-
-        # Check for table name references
-        possible_refs = [
-            f" {table_name} ",
-            f" {table_name}.",
-            f" {schema_name}.{table_name} ",
-            f" {schema_name}.{table_name}.",
-            f"\t{table_name}\t",
-            f"\n{table_name}\n",
-            f"from {table_name}",
-            f"join {table_name}",
-        ]
-
-        return any(ref in statement_lower for ref in possible_refs)
+        return view_references_table(select_statement, schema_name, table_name)
 
     def _extract_columns_from_view(self, select_statement: str, table_name: str) -> List[str]:
         """Extract column names referenced from the specified table in the view"""
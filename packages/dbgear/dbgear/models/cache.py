@@ -0,0 +1,50 @@
+"""
+Identity-mapped model cache keyed by YAML file.
+
+Entries are validated against the file's mtime and size, so a file that
+is saved again is reloaded on the next access.
+"""
+
+import os
+
+from typing import Any
+from typing import Callable
+
+
+class ModelCache:
+    """Cache of loaded models per source file (and an optional variant key)."""
+
+    def __init__(self):
+        self._entries: dict[tuple, tuple[tuple[int, int], Any]] = {}
+
+    @staticmethod
+    def _stamp(path: str) -> tuple[int, int]:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self, path: str, loader: Callable[[], Any], variant: Any = None) -> Any:
+        """Return the cached model for ``path`` or load it with ``loader``.
+
+        ``path`` may also be a directory; its mtime changes when files are
+        added, removed or renamed, so a cached listing is rebuilt then.
+        """
+        key = (os.path.abspath(path), variant)
+        stamp = self._stamp(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        model = loader()
+        self._entries[key] = (stamp, model)
+        return model
+
+    def invalidate(self, path: str | None = None) -> None:
+        """Drop entries for ``path`` (all entries if omitted)."""
+        if path is None:
+            self._entries.clear()
+            return
+        path = os.path.abspath(path)
+        for key in [k for k in self._entries if k[0] == path]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
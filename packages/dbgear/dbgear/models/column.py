@@ -30,12 +30,18 @@ class Column(BaseSchema):
 
 class ColumnManager:
 
-    def __init__(self, columns: list[Column]):
+    def __init__(self, columns: list[Column], table=None):
         self.columns = columns
+        self.table = table
 
     def __getitem__(self, key: int | str) -> Column:
         if isinstance(key, str):
             # Find column by name
+            if self.table is not None:
+                column = self.table.find_column(key)
+                if column is not None:
+                    return column
+                raise KeyError(f"Column '{key}' not found")
             for column in self.columns:
                 if column.column_name == key:
                     return column
@@ -51,8 +57,19 @@ class ColumnManager:
     def __len__(self) -> int:
         return len(self.columns)
 
+    def __contains__(self, key: str | Column) -> bool:
+        if isinstance(key, str):
+            if self.table is not None:
+                return self.table.find_column(key) is not None
+            return any(column.column_name == key for column in self.columns)
+        return key in self.columns
+
     def append(self, column: Column) -> None:
         self.columns.append(column)
+        if self.table is not None:
+            self.table.invalidate_index()
 
     def remove(self, column: Column) -> None:
         self.columns.remove(column)
+        if self.table is not None:
+            self.table.invalidate_index()
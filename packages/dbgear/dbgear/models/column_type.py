@@ -3,6 +3,11 @@ import re
 
 from .base import BaseSchema
 
+# 値の変換・検証で同じ扱いをする列型（base_type）の分類
+INTEGER_TYPES = {'TINYINT', 'SMALLINT', 'MEDIUMINT', 'INT', 'INTEGER', 'BIGINT', 'YEAR', 'BIT'}
+DECIMAL_TYPES = {'DECIMAL', 'NUMERIC', 'DEC'}
+FLOAT_TYPES = {'FLOAT', 'DOUBLE', 'REAL'}
+
 
 class ColumnTypeItem(BaseSchema):
     value: str
@@ -6,7 +6,9 @@ import os
 from typing import Any
 
 from .base import BaseSchema
+from .datasources import compiled
 from .datasources.factory import Factory
+from .cache import ModelCache
 from ..utils import const
 from ..utils.fileio import save_model
 from ..utils.variable import expand_value, expand_dict
@@ -59,8 +61,16 @@ class DataModel(BaseSchema):
         return os.path.join(folder, environ, map_name, DataModel._filename(schema_name, table_name))
 
     @classmethod
-    def load(cls, folder: str, environ: str, map_name: str, schema_name: str, table_name: str, tenant_name: str | None = None):
-        with open(DataModel._fullpath(folder, environ, map_name, schema_name, table_name), 'r', encoding='utf-8') as f:
+    def load(
+            cls, folder: str, environ: str, map_name: str, schema_name: str, table_name: str,
+            tenant_name: str | None = None, cache: ModelCache | None = None):
+        path = DataModel._fullpath(folder, environ, map_name, schema_name, table_name)
+        if cache is not None:
+            return cache.get(
+                path,
+                lambda: cls.load(folder, environ, map_name, schema_name, table_name, tenant_name),
+                variant=tenant_name)
+        with open(path, 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
         return cls(
             folder=folder,
@@ -85,6 +95,7 @@ class DataModel(BaseSchema):
                 path = os.path.join(self.folder, self.environ, self.map_name, ds.filename)
                 if os.path.exists(path):
                     os.remove(path)
+                compiled.remove(path)
         os.remove(path)
 
     @property
@@ -109,7 +120,14 @@ class DataModel(BaseSchema):
             context.update(settings)
         return context
 
-    def get_datasources(self, settings: dict[str, str] = None):
+    def get_datasources(self, settings: dict[str, str] = None, table=None):
+        """データソースを生成する。tableを指定すると、列型に応じて値を変換するデータソースが参照する"""
+        for ds in self._create_datasources(settings):
+            if table is not None:
+                ds.table = table
+            yield ds
+
+    def _create_datasources(self, settings: dict[str, str] = None):
         settings = self.build_settings(settings)
 
         data_path = expand_value(self.data_path, settings) if self.data_path else self.data_path
@@ -129,7 +147,8 @@ class DataModel(BaseSchema):
                 **data_args,
             )
 
-        for path in sorted(pathlib.Path(self.folder, self.environ, self.map_name).glob(f"{self.schema_name}@{self.table_name}#*.dat")):
+        extension = Factory.extension(self.data_type)
+        for path in sorted(pathlib.Path(self.folder, self.environ, self.map_name).glob(f"{self.schema_name}@{self.table_name}#*{extension}")):
             seg = path.stem.split('#', 1)[1] if '#' in path.stem else None
             yield Factory.create(
                 data_type=self.data_type,
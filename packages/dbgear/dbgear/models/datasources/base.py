@@ -1,11 +1,16 @@
 from typing import Any
+from typing import Iterator
 from abc import ABCMeta
 from abc import abstractmethod
 
+from .batch import ColumnBatch
+
 
 class BaseDataSource(metaclass=ABCMeta):
 
     settings: dict[str, str] = {}
+    # 投入先のテーブル定義（DataModel.get_datasourcesで設定される。未設定の場合はNone）
+    table = None
 
     @property
     def filename(self) -> str:
@@ -15,6 +20,24 @@ class BaseDataSource(metaclass=ABCMeta):
     def data(self) -> list[dict[str, Any]]:
         raise NotImplementedError("This method should be implemented in subclasses.")
 
+    @property
+    def batch(self) -> ColumnBatch:
+        """読み込んだデータの列単位の表現。列を直接生成できるデータソースはオーバーライドする"""
+        return ColumnBatch.from_rows(self.data)
+
+    def iter_batches(self) -> Iterator[ColumnBatch]:
+        """データを読み込み、列単位のバッチを順に返す。分割して読み込めるデータソースはオーバーライドする"""
+        self.load()
+        yield self.batch
+
+    def split(self, parts: int) -> list['BaseDataSource']:
+        """並列に読み込めるよう最大 parts 個に分割する。分割できないデータソースは自身のみを返す"""
+        return [self]
+
+    def estimate_rows(self) -> int | None:
+        """データを解析せずに求めた行数（進捗の表示に使う概算）。求められないデータソースは None を返す"""
+        return None
+
     @abstractmethod
     def load(self):
         raise NotImplementedError("This method should be implemented in subclasses.")
@@ -0,0 +1,111 @@
+import json
+import re
+from typing import Any
+from typing import Callable
+
+from ...utils.variable import VariableExpander
+
+# 関数呼び出し（例: NOW(), DATE_ADD(NOW(), INTERVAL 1 DAY)）または括弧で囲んだ式
+_SQL_FUNCTION = re.compile(r'^\s*(?:[A-Za-z_][\w.]*\(|\(.*\)\s*$)', re.DOTALL)
+
+
+def is_sql_function(value) -> bool:
+    """値をバインドせずSQLに埋め込む関数定義として扱うかどうか"""
+    return type(value) is str and '(' in value and _SQL_FUNCTION.match(value) is not None
+
+
+class ColumnBatch:
+    """
+    データソースの行を列単位で保持するバッチ
+
+    列名ごとに値のリストを持ち、全ての列は同じ行数となる。
+    行ごとにdictを組み立て直さず、列単位で変換を適用できる。
+    行によってキーが異なる場合、存在しない値はNoneとし、その行番号を missing に記録する
+    （NULLを指定した値と区別するため）。
+    """
+
+    def __init__(self, columns: dict[str, list] | None = None, missing: dict[str, list[int]] | None = None):
+        self.columns = columns if columns is not None else {}
+        # 列ごとの、その列を持たない行の番号（0始まり）
+        self.missing = missing if missing is not None else {}
+        self._nulls: dict[str, list[bool]] = {}
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, Any]] | None) -> 'ColumnBatch':
+        """行（dict）のリストから生成する。行に存在しない列はNoneとなり、missing に記録する"""
+        if not rows:
+            return cls()
+        names = dict.fromkeys(rows[0])
+        ragged = False
+        for row in rows:
+            if len(row) != len(names) or not names.keys() >= row.keys():
+                names.update(dict.fromkeys(row))
+                ragged = True
+        columns = {name: [row.get(name) for row in rows] for name in names}
+        if not ragged:
+            return cls(columns)
+        missing = {}
+        for name in names:
+            absent = [i for i, row in enumerate(rows) if name not in row]
+            if absent:
+                missing[name] = absent
+        return cls(columns, missing)
+
+    def __len__(self) -> int:
+        for values in self.columns.values():
+            return len(values)
+        return 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.columns)
+
+    def null_mask(self, name: str) -> list[bool]:
+        """列の各値がNoneかどうか"""
+        mask = self._nulls.get(name)
+        if mask is None:
+            mask = self._nulls[name] = [value is None for value in self.columns[name]]
+        return mask
+
+    def map_column(self, name: str, func: Callable[[list], list]) -> None:
+        """列の値リストを func の結果で置き換える"""
+        values = func(self.columns[name])
+        if len(values) != len(self.columns[name]):
+            raise ValueError(f"Column '{name}' length changed from {len(self.columns[name])} to {len(values)}")
+        self.columns[name] = values
+        self._nulls.pop(name, None)
+
+    def expand_variables(self, settings: dict[str, str]) -> None:
+        """$name形式の変数をsettingsの値で展開する。値が変わった列のみ置き換える"""
+        if not settings:
+            return
+        expander = VariableExpander(settings)
+        for name, values in list(self.columns.items()):
+            expanded = expander.column(values)
+            if expanded is not values:
+                self.map_column(name, lambda _: expanded)
+
+    def encode_json(self) -> None:
+        """dictの値をJSON文字列に変換する"""
+        for name, values in self.columns.items():
+            if any(isinstance(v, dict) for v in values):
+                self.map_column(name, lambda values: [
+                    json.dumps(v, ensure_ascii=True) if isinstance(v, dict) else v for v in values
+                ])
+
+    def sql_functions(self, name: str) -> dict[int, str]:
+        """列内で関数定義となっている値（行番号→値）"""
+        return {i: v for i, v in enumerate(self.columns[name]) if is_sql_function(v)}
+
+    def rows(self, names: list[str] | None = None, indices: list[int] | None = None) -> list[dict[str, Any]]:
+        """指定した列（省略時は全列）を行（dict）のリストとして返す。indicesを指定するとその行のみ返す"""
+        names = self.names if names is None else names
+        if indices is None:
+            if not names:
+                return [{} for _ in range(len(self))]
+            return [dict(zip(names, values)) for values in zip(*(self.columns[name] for name in names))]
+        columns = [self.columns[name] for name in names]
+        return [{name: values[i] for name, values in zip(names, columns)} for i in indices]
@@ -0,0 +1,159 @@
+"""
+YAML形式のデータファイル（.dat）をコンパイルしたバイナリファイル（.datc）
+
+`dbgear data compile` で .dat の隣に作成し、yamlsource が読み込み時に自動的に使用する。
+元ファイルの内容のハッシュと、検証に用いたテーブル定義の指紋を保持しており、
+元ファイルが編集された場合やテーブル定義が変わった場合は使用せずYAMLを読み込む。
+
+データは列単位で保存する。行に存在しない列の位置と、marshalで保存できない
+日付・日時の値の位置を別に保持し、読み込み時に元の行と同じ内容に戻す。
+"""
+
+import hashlib
+import marshal
+import os
+from datetime import date
+from datetime import datetime
+from logging import getLogger
+from typing import Any
+
+from .batch import ColumnBatch
+
+logger = getLogger(__name__)
+
+SUFFIX = 'c'
+
+_MAGIC = b'DBGDATC1'
+
+
+def sidecar_path(path: str) -> str:
+    return path + SUFFIX
+
+
+def source_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def table_fingerprint(table) -> str | None:
+    """テーブル定義のうち、データの検証結果に影響する部分の指紋"""
+    if table is None:
+        return None
+    digest = hashlib.sha256()
+    for column in table.columns:
+        digest.update(repr((
+            column.column_name, column.column_type.column_type, column.nullable, column.primary_key,
+            column.auto_increment, column.expression is not None,
+        )).encode())
+    return digest.hexdigest()
+
+
+class CompiledData:
+    """コンパイル済みのデータ（列単位）"""
+
+    def __init__(self, columns: dict[str, list], missing: dict[str, list[int]]):
+        self.columns = columns
+        # 列ごとの、その列を持たない行の番号
+        self.missing = missing
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, Any]]) -> 'CompiledData':
+        batch = ColumnBatch.from_rows(rows)
+        return cls(batch.columns, batch.missing)
+
+    @property
+    def batch(self) -> ColumnBatch:
+        return ColumnBatch(dict(self.columns), self.missing)
+
+    def rows(self) -> list[dict[str, Any]]:
+        rows = ColumnBatch(self.columns).rows()
+        for name, absent in self.missing.items():
+            for i in absent:
+                del rows[i][name]
+        return rows
+
+
+def _encode_dates(columns: dict[str, list]) -> tuple[dict[str, list], dict[str, tuple[list[int], list[int]]]]:
+    # marshalは日付型を保存できないため、ISO形式の文字列にして位置を記録する
+    encoded = {}
+    dates = {}
+    for name, values in columns.items():
+        date_rows = []
+        datetime_rows = []
+        for i, value in enumerate(values):
+            if type(value) is datetime:
+                datetime_rows.append(i)
+            elif type(value) is date:
+                date_rows.append(i)
+        if date_rows or datetime_rows:
+            values = list(values)
+            for i in date_rows + datetime_rows:
+                values[i] = values[i].isoformat()
+            dates[name] = (date_rows, datetime_rows)
+        encoded[name] = values
+    return encoded, dates
+
+
+def _decode_dates(columns: dict[str, list], dates: dict[str, tuple[list[int], list[int]]]) -> None:
+    for name, (date_rows, datetime_rows) in dates.items():
+        values = columns[name]
+        for i in date_rows:
+            values[i] = date.fromisoformat(values[i])
+        for i in datetime_rows:
+            values[i] = datetime.fromisoformat(values[i])
+
+
+def read(path: str, digest: str, table=None) -> CompiledData | None:
+    """
+    path（.dat）のコンパイル済みファイルを読み込む
+
+    digest（.datの内容のハッシュ）が一致しない場合や、tableを指定してテーブル定義が
+    コンパイル時と異なる場合は None を返す。
+    """
+    sidecar = sidecar_path(path)
+    if not os.path.exists(sidecar):
+        return None
+    try:
+        with open(sidecar, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                return None
+            compiled_digest, fingerprint, names, values, missing, dates = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        logger.warning(f'Ignoring broken compiled data {sidecar}: {e}')
+        return None
+    if compiled_digest != digest:
+        logger.debug(f'{sidecar} is stale')
+        return None
+    if table is not None and fingerprint != table_fingerprint(table):
+        logger.debug(f'{sidecar} was compiled for a different table definition')
+        return None
+    columns = dict(zip(names, values))
+    _decode_dates(columns, dates)
+    return CompiledData(columns, missing)
+
+
+def write(path: str, digest: str, rows: list[dict[str, Any]], table=None) -> bool:
+    """rows（内容のハッシュがdigestの.datを解析した行）をコンパイルして保存する。保存できない値を含む場合は False を返す"""
+    compiled = CompiledData.from_rows(rows)
+    columns, dates = _encode_dates(compiled.columns)
+    try:
+        payload = marshal.dumps((
+            digest, table_fingerprint(table),
+            list(columns), list(columns.values()), compiled.missing, dates,
+        ))
+    except ValueError:
+        # JSON列の中の日付などmarshal非対応の値を含む場合はコンパイルしない
+        logger.debug(f'{path} contains values that cannot be compiled')
+        return False
+    sidecar = sidecar_path(path)
+    tmp = f'{sidecar}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(payload)
+    os.replace(tmp, sidecar)
+    return True
+
+
+def remove(path: str) -> None:
+    sidecar = sidecar_path(path)
+    if os.path.exists(sidecar):
+        os.remove(sidecar)
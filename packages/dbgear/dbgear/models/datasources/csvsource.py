@@ -0,0 +1,201 @@
+import csv
+import os
+import re
+from decimal import Decimal
+from decimal import InvalidOperation
+from typing import Any
+from typing import Callable
+
+from .base import BaseDataSource
+from .batch import ColumnBatch
+from ..column_type import ColumnType
+from ..column_type import DECIMAL_TYPES
+from ..column_type import FLOAT_TYPES
+from ..column_type import INTEGER_TYPES
+from ...utils.dict_utils import dict_to_nested
+
+EXTENSION = '.csv'
+
+_INTEGER_PATTERN = re.compile(r'^\s*[+-]?\d+\s*$')
+_BOOLEANS = {'true': 1, 'false': 0}
+
+
+def converter(column_type: ColumnType | None, null_value: str = '') -> Callable[[str], Any]:
+    """
+    列型に応じて、CSVの文字列を値に変換する関数を返す
+
+    null_value と一致する値はNoneとする。変換できない値は文字列のまま返し、
+    適用前の検証で検出されるようにする。
+    """
+    base_type = column_type.base_type if column_type is not None else None
+
+    if base_type in INTEGER_TYPES:
+        def convert(value):
+            if value == null_value:
+                return None
+            if _INTEGER_PATTERN.match(value):
+                return int(value)
+            return _BOOLEANS.get(value.lower(), value)
+    elif base_type in DECIMAL_TYPES:
+        def convert(value):
+            if value == null_value:
+                return None
+            try:
+                return Decimal(value.strip())
+            except InvalidOperation:
+                return value
+    elif base_type in FLOAT_TYPES:
+        def convert(value):
+            if value == null_value:
+                return None
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    else:
+        def convert(value):
+            return None if value == null_value else value
+    return convert
+
+
+class DataSource(BaseDataSource):
+    """
+    CSV/TSV形式のデータソース
+
+    data_args:
+        delimiter: 区切り文字（既定: ','）
+        encoding: 文字コード（既定: 'utf-8'。BOM付きは 'utf-8-sig'）
+        header: 1行目をヘッダーとして扱うか（既定: True）
+        columns: headerがFalseの場合の列名
+        null_value: Noneとして扱う値（既定: 空文字）
+
+    ヘッダーの 'attrs.color' のようなドット区切りの列名は、ネストしたdictの列にまとめる。
+    テーブル定義（table）が設定されている場合は、列型に応じて数値等に変換する。
+    """
+    folder: str
+    environ: str
+    name: str
+    schema_name: str
+    table_name: str
+    segment: str | None = None
+    extension = EXTENSION
+
+    def __init__(
+            self, folder: str, environ: str, name: str, schema_name: str, table_name: str,
+            segment: str | None = None, data_path: str | None = None,
+            delimiter: str = ',', encoding: str = 'utf-8', header: bool = True,
+            columns: list[str] | None = None, null_value: str = '', **kwargs):
+        self.folder = folder
+        self.environ = environ
+        self.name = name
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.segment = segment
+        self.data_path = data_path
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.header = header
+        self.columns = columns
+        self.null_value = null_value
+        self.settings = kwargs.pop('settings', {})
+        self._columns: dict[str, list] = {}
+
+    @property
+    def filename(self) -> str:
+        if self.data_path and not self.segment:
+            return self.data_path
+        if self.segment:
+            return f"{self.schema_name}@{self.table_name}#{self.segment}{self.extension}"
+        return f"{self.schema_name}@{self.table_name}{self.extension}"
+
+    @property
+    def path(self) -> str:
+        if self.data_path and not self.segment:
+            return f'{self.folder}/{self.data_path}'
+        return os.path.join(self.folder, self.environ, self.name, self.filename)
+
+    @property
+    def data(self) -> list[dict[str, Any]]:
+        return ColumnBatch(self._columns).rows()
+
+    @property
+    def batch(self) -> ColumnBatch:
+        # 列のリストは共有し、列の置き換えが読み込んだデータに影響しないようdictのみ複製する
+        return ColumnBatch(dict(self._columns))
+
+    def iter_rows(self):
+        """ファイルを先頭から読み、変換した行を順に返す"""
+        with self._open() as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            names = self._names(reader)
+            converters = self._converters(names)
+            nested = any('.' in name for name in names)
+            for values in self._records(reader, len(names)):
+                row = {name: convert(value) for name, convert, value in zip(names, converters, values)}
+                yield dict_to_nested(row) if nested else row
+
+    def estimate_rows(self) -> int | None:
+        # 改行の数から数える（値の中の改行や空行も1行として数える）
+        if not os.path.exists(self.path):
+            return None
+        lines = 0
+        last = b'\n'
+        with open(self.path, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                lines += chunk.count(b'\n')
+                last = chunk[-1:]
+        if last != b'\n':
+            lines += 1
+        return max(lines - (1 if self.header else 0), 0)
+
+    def load(self):
+        with self._open() as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            names = self._names(reader)
+            width = len(names)
+            rows = list(self._records(reader, width))
+
+        # 行をdictにせず、列ごとにまとめて変換する
+        values_by_column = list(zip(*rows)) if rows else [()] * width
+        columns = {}
+        nested = {}
+        for name, convert, values in zip(names, self._converters(names), values_by_column):
+            values = list(map(convert, values))
+            if '.' in name:
+                top, rest = name.split('.', 1)
+                columns.setdefault(top, None)
+                nested.setdefault(top, []).append((rest, values))
+            else:
+                columns[name] = values
+        for top, parts in nested.items():
+            keys = [key for key, _ in parts]
+            columns[top] = [dict_to_nested(dict(zip(keys, row))) for row in zip(*(values for _, values in parts))]
+        self._columns = columns
+
+    def _open(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Data source file {self.path} does not exist.")
+        return open(self.path, 'r', encoding=self.encoding, newline='')
+
+    def _records(self, reader, width: int):
+        # 空行を除き、列数が足りない行は null_value で補う
+        for values in reader:
+            if not any(values):
+                continue
+            if len(values) < width:
+                values += [self.null_value] * (width - len(values))
+            yield values
+
+    def _names(self, reader) -> list[str]:
+        if self.header:
+            return [name.strip() for name in next(reader, [])]
+        if not self.columns:
+            raise ValueError(f"columns must be specified when header is false: {self.filename}")
+        return list(self.columns)
+
+    def _converters(self, names: list[str]) -> list[Callable[[str], Any]]:
+        converters = []
+        for name in names:
+            column = self.table.find_column(name) if self.table is not None else None
+            converters.append(converter(column.column_type if column is not None else None, self.null_value))
+        return converters
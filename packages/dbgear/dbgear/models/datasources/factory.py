@@ -31,3 +31,14 @@ class Factory:
                 return data_source_class(data_path=data_path, **kwargs)
             except (ModuleNotFoundError, AttributeError) as e:
                 raise ValueError(f"DataSource for '{data_type}' not found: {e}")
+
+    @staticmethod
+    def extension(data_type: str) -> str:
+        """data_typeのデータファイルの拡張子（セグメントファイルの検索に使用する）"""
+        if data_type == const.DATATYPE_PYTHON:
+            return '.dat'
+        try:
+            module = importlib.import_module(f".{data_type}source", __package__)
+        except ModuleNotFoundError:
+            return '.dat'
+        return getattr(module, 'EXTENSION', '.dat')
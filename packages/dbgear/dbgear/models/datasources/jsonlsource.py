@@ -0,0 +1,179 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+from logging import getLogger
+from typing import Any
+from typing import Iterator
+
+from .base import BaseDataSource
+from .batch import ColumnBatch
+
+logger = getLogger(__name__)
+
+EXTENSION = '.jsonl'
+INDEX_SUFFIX = '.idx'
+
+# 索引ファイルのヘッダー: 識別子, 元ファイルのサイズ, 更新日時(ns), 行数
+_INDEX_HEADER = struct.Struct('<8sQqQ')
+_INDEX_MAGIC = b'DBGJLIX1'
+
+
+def _build_index(path: str, size: int) -> array:
+    offsets = array('Q', [0])
+    if size == 0:
+        return offsets
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        find = mm.find
+        pos = find(b'\n')
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = find(b'\n', pos + 1)
+    if offsets[-1] != size:
+        # 最終行が改行で終わっていない場合
+        offsets.append(size)
+    return offsets
+
+
+def line_index(path: str) -> array:
+    """
+    各行の開始位置の配列を返す（末尾にファイルサイズを含むため、行数は len - 1）
+
+    索引は <ファイル名>.idx に保存し、元ファイルのサイズと更新日時が一致する間は再利用する。
+    """
+    stat = os.stat(path)
+    sidecar = path + INDEX_SUFFIX
+    try:
+        with open(sidecar, 'rb') as f:
+            magic, size, mtime, count = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+            if (magic, size, mtime) == (_INDEX_MAGIC, stat.st_size, stat.st_mtime_ns):
+                offsets = array('Q')
+                offsets.frombytes(f.read())
+                if len(offsets) == count + 1:
+                    return offsets
+    except (OSError, struct.error):
+        pass
+
+    offsets = _build_index(path, stat.st_size)
+    try:
+        with open(sidecar, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets) - 1))
+            f.write(offsets.tobytes())
+    except OSError as e:
+        logger.debug(f'could not write line index {sidecar}: {e}')
+    return offsets
+
+
+class DataSource(BaseDataSource):
+    """
+    JSON Lines形式（1行に1つのJSONオブジェクト）のデータソース
+
+    data_args:
+        batch_size: iter_batchesで一度に読み込む行数（既定: 50000）
+
+    ファイルはメモリマップで開き、行の開始位置の索引（<ファイル名>.idx）を使って
+    行の範囲ごとに読み込む。split() で行の範囲に分割し、別プロセスで並列に解析できる。
+    JSON列の値は、ファイル内で文字列として書かれていればそのまま投入される。
+    """
+    folder: str
+    environ: str
+    name: str
+    schema_name: str
+    table_name: str
+    segment: str | None = None
+
+    def __init__(
+            self, folder: str, environ: str, name: str, schema_name: str, table_name: str,
+            segment: str | None = None, data_path: str | None = None,
+            batch_size: int = 50000, start: int = 0, stop: int | None = None, **kwargs):
+        self.folder = folder
+        self.environ = environ
+        self.name = name
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.segment = segment
+        self.data_path = data_path
+        self.batch_size = int(batch_size)
+        self.start = start
+        self.stop = stop
+        self.settings = kwargs.pop('settings', {})
+        self._rows: list[dict[str, Any]] = []
+
+    @property
+    def _basename(self) -> str:
+        if self.data_path and not self.segment:
+            return self.data_path
+        if self.segment:
+            return f"{self.schema_name}@{self.table_name}#{self.segment}{EXTENSION}"
+        return f"{self.schema_name}@{self.table_name}{EXTENSION}"
+
+    @property
+    def filename(self) -> str:
+        if self.start or self.stop is not None:
+            return f"{self._basename}[{self.start}:{'' if self.stop is None else self.stop}]"
+        return self._basename
+
+    @property
+    def path(self) -> str:
+        if self.data_path and not self.segment:
+            return f'{self.folder}/{self.data_path}'
+        return os.path.join(self.folder, self.environ, self.name, self._basename)
+
+    @property
+    def data(self) -> list[dict[str, Any]]:
+        return self._rows
+
+    def split(self, parts: int) -> list['DataSource']:
+        """行の範囲で最大 parts 個のデータソースに分割する"""
+        offsets = line_index(self._checked_path())
+        start = self.start
+        stop = len(offsets) - 1 if self.stop is None else min(self.stop, len(offsets) - 1)
+        count = stop - start
+        if parts <= 1 or count < 2:
+            return [self]
+        step = -(-count // parts)
+        result = []
+        for begin in range(start, stop, step):
+            ds = DataSource(
+                self.folder, self.environ, self.name, self.schema_name, self.table_name,
+                segment=self.segment, data_path=self.data_path, batch_size=self.batch_size,
+                start=begin, stop=min(begin + step, stop), settings=self.settings)
+            ds.table = self.table
+            result.append(ds)
+        return result
+
+    def estimate_rows(self) -> int | None:
+        # 空行も1行として数える
+        offsets = line_index(self._checked_path())
+        stop = len(offsets) - 1 if self.stop is None else min(self.stop, len(offsets) - 1)
+        return max(stop - self.start, 0)
+
+    def load(self):
+        self._rows = [row for rows in self._iter_rows(None) for row in rows]
+
+    def iter_batches(self) -> Iterator[ColumnBatch]:
+        """batch_size 行ずつ列単位のバッチを返す。ファイル全体は読み込まない"""
+        for rows in self._iter_rows(self.batch_size):
+            yield ColumnBatch.from_rows(rows)
+
+    def _checked_path(self) -> str:
+        path = self.path
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Data source file {path} does not exist.")
+        return path
+
+    def _iter_rows(self, size: int | None) -> Iterator[list[dict[str, Any]]]:
+        path = self._checked_path()
+        offsets = line_index(path)
+        lines = len(offsets) - 1
+        stop = lines if self.stop is None else min(self.stop, lines)
+        if stop <= self.start:
+            return
+        size = size or stop - self.start
+        loads = json.loads
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for begin in range(self.start, stop, size):
+                end = min(begin + size, stop)
+                chunk = mm[offsets[begin]:offsets[end]]
+                yield [loads(line) for line in chunk.splitlines() if line.strip()]
@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from logging import getLogger
+from typing import Iterable
+from typing import Iterator
+
+from .base import BaseDataSource
+from .batch import ColumnBatch
+from ...utils.profiling import phase
+
+logger = getLogger(__name__)
+
+
+def load_batch(datasource: BaseDataSource) -> ColumnBatch:
+    """データソースを読み込み、変数を展開した列単位のバッチを返す"""
+    with phase('datasource.parse'):
+        datasource.load()
+        batch = datasource.batch
+    with phase('expand_variables'):
+        batch.expand_variables(datasource.settings)
+    return batch
+
+
+def create_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    データソースの読み込みに使うプロセスプール
+
+    データベースの接続等を子プロセスに引き継がないよう、spawn で起動する。
+    プロセスは最初の読み込み時に起動されるため、使わなければ起動の費用はかからない。
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def load_batches(
+        datasources: Iterable[BaseDataSource],
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        ordered: bool = True,
+        executor: Executor | None = None) -> Iterator[tuple[BaseDataSource, ColumnBatch]]:
+    """
+    データソースをプロセスプールで並列に読み込み、読み込めたものから順に返す
+
+    YAML等の解析はCPUで律速されるため、セグメント分割されたデータは別プロセスで解析する。
+    読み込み中・未消費のバッチは max_pending 件（省略時は max_workers の2倍）までに抑え、
+    投入が追いつかない場合でもメモリ使用量が増え続けないようにする。
+
+    Args:
+        datasources: 読み込むデータソース
+        max_workers: 並列数（省略時はCPU数。1の場合は同一プロセスで順に読み込み、
+            1つのデータソースが複数のバッチとなることがある）
+        max_pending: 読み込み中・未消費のバッチの上限
+        ordered: Trueの場合は datasources の順に、Falseの場合は読み込みが完了した順に返す
+        executor: 読み込みに使うプロセスプール（省略時は create_pool で作成し、終了時に破棄する）
+
+    Yields:
+        (データソース, バッチ) のタプル
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        # 同一プロセスでは、分割して読み込めるデータソースをバッチごとに返す
+        for ds in datasources:
+            batches = ds.iter_batches()
+            while True:
+                with phase('datasource.parse'):
+                    batch = next(batches, None)
+                if batch is None:
+                    break
+                with phase('expand_variables'):
+                    batch.expand_variables(ds.settings)
+                yield ds, batch
+        return
+
+    limit = max(1, max_pending or max_workers * 2)
+    with nullcontext(executor) if executor is not None else create_pool(max_workers) as executor:
+        source = enumerate(datasources)
+        pending = {}
+        try:
+            done = {}
+            next_index = 0
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) + len(done) < limit:
+                    item = next(source, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    pending[executor.submit(load_batch, item[1])] = item
+                if not pending and not done:
+                    return
+                if pending:
+                    with phase('datasource.wait'):
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index, ds = pending.pop(future)
+                        done[index] = (ds, _result(future, ds))
+                if ordered:
+                    while next_index in done:
+                        yield done.pop(next_index)
+                        next_index += 1
+                else:
+                    for index in list(done):
+                        yield done.pop(index)
+        finally:
+            # 途中で中断された場合は、未着手の読み込みを取り消す
+            for future in pending:
+                future.cancel()
+
+
+def _result(future, datasource: BaseDataSource) -> ColumnBatch:
+    try:
+        return future.result()
+    except Exception as e:
+        # 別プロセスに渡せないデータソース・バッチ（pickle不可）と、子プロセスの異常終了の場合のみ、
+        # このプロセスで読み込み直す。読み込み自体のエラーはそのまま送出する
+        if not _is_transfer_error(e):
+            raise
+        logger.debug(f'loading {datasource.filename} in process: {e}')
+        return load_batch(datasource)
+
+
+def _is_transfer_error(e: Exception) -> bool:
+    if isinstance(e, (pickle.PicklingError, BrokenProcessPool)):
+        return True
+    # pickle不可のオブジェクトは TypeError（"cannot pickle ..."）や AttributeError（"Can't pickle local object ..."）となる
+    return isinstance(e, (TypeError, AttributeError)) and 'pickle' in str(e).lower()
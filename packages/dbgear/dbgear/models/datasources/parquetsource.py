@@ -0,0 +1,136 @@
+import json
+import os
+from typing import Any
+from typing import Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .base import BaseDataSource
+from .batch import ColumnBatch
+from ..column import Column
+from ..column_type import INTEGER_TYPES
+
+EXTENSION = '.parquet'
+
+
+def _is_nested(data_type: pa.DataType) -> bool:
+    return pa.types.is_struct(data_type) or pa.types.is_list(data_type) \
+        or pa.types.is_large_list(data_type) or pa.types.is_map(data_type)
+
+
+def to_values(array: pa.Array | pa.ChunkedArray, column: Column | None) -> list:
+    """
+    Arrowの列を、テーブルの列型に合わせたPythonの値のリストに変換する
+
+    - JSON列の構造体・リストは、JSON文字列にしてから渡す（投入時のdict変換を省く）
+    - 整数列の真偽値は 0 / 1 にする
+    - dictionary型は値に展開する
+    それ以外は Arrow の型に対応する値（int, float, Decimal, str, date, datetime 等）となる。
+    """
+    data_type = array.type
+    if pa.types.is_dictionary(data_type):
+        array = array.cast(data_type.value_type)
+        data_type = array.type
+    base_type = column.column_type.base_type if column is not None else None
+
+    if base_type == 'JSON' and _is_nested(data_type):
+        return [None if v is None else json.dumps(v, ensure_ascii=True, default=str) for v in array.to_pylist()]
+    if base_type in INTEGER_TYPES and pa.types.is_boolean(data_type):
+        return array.cast(pa.int8()).to_pylist()
+    return array.to_pylist()
+
+
+class DataSource(BaseDataSource):
+    """
+    Parquet形式のデータソース（pyarrowが必要: pip install dbgear[parquet]）
+
+    data_args:
+        batch_size: 一度に読み込む行数（既定: 65536）
+        columns: 読み込む列（省略時はテーブル定義の列のうちファイルにある列、テーブル定義がなければ全列）
+
+    ファイルはメモリマップで開き、行グループごとに列単位で読み込む。行のdictは作成しない。
+    """
+    folder: str
+    environ: str
+    name: str
+    schema_name: str
+    table_name: str
+    segment: str | None = None
+
+    def __init__(
+            self, folder: str, environ: str, name: str, schema_name: str, table_name: str,
+            segment: str | None = None, data_path: str | None = None,
+            batch_size: int = 65536, columns: list[str] | None = None, **kwargs):
+        self.folder = folder
+        self.environ = environ
+        self.name = name
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.segment = segment
+        self.data_path = data_path
+        self.batch_size = int(batch_size)
+        self.columns = columns
+        self.settings = kwargs.pop('settings', {})
+        self._columns: dict[str, list] = {}
+
+    @property
+    def filename(self) -> str:
+        if self.data_path and not self.segment:
+            return self.data_path
+        if self.segment:
+            return f"{self.schema_name}@{self.table_name}#{self.segment}{EXTENSION}"
+        return f"{self.schema_name}@{self.table_name}{EXTENSION}"
+
+    @property
+    def path(self) -> str:
+        if self.data_path and not self.segment:
+            return f'{self.folder}/{self.data_path}'
+        return os.path.join(self.folder, self.environ, self.name, self.filename)
+
+    @property
+    def data(self) -> list[dict[str, Any]]:
+        return ColumnBatch(self._columns).rows()
+
+    @property
+    def batch(self) -> ColumnBatch:
+        return ColumnBatch(dict(self._columns))
+
+    def iter_batches(self) -> Iterator[ColumnBatch]:
+        """batch_size 行ずつ列単位のバッチを返す。ファイル全体は読み込まない"""
+        # 途中で読み込みをやめた場合も、ジェネレーターの終了時にファイルを閉じる
+        with self._open() as parquet:
+            names = self._select(parquet.schema_arrow.names)
+            lookup = self._lookup(names)
+            for record_batch in parquet.iter_batches(batch_size=self.batch_size, columns=names, use_threads=True):
+                yield ColumnBatch({
+                    name: to_values(record_batch.column(name), lookup[name])
+                    for name in record_batch.schema.names
+                })
+
+    def estimate_rows(self) -> int | None:
+        with self._open() as parquet:
+            return parquet.metadata.num_rows
+
+    def load(self):
+        with self._open() as parquet:
+            names = self._select(parquet.schema_arrow.names)
+            lookup = self._lookup(names)
+            arrow_table = parquet.read(columns=names, use_threads=True)
+        self._columns = {name: to_values(arrow_table.column(name), lookup[name]) for name in arrow_table.column_names}
+
+    def _open(self) -> pq.ParquetFile:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Data source file {self.path} does not exist.")
+        return pq.ParquetFile(self.path, memory_map=True)
+
+    def _select(self, names: list[str]) -> list[str]:
+        if self.columns:
+            return list(self.columns)
+        if self.table is None:
+            return names
+        # テーブル定義にない列は投入されないため読み込まない
+        return [name for name in names if self.table.find_column(name) is not None]
+
+    def _lookup(self, names: list[str]) -> dict[str, Column | None]:
+        return {name: self.table.find_column(name) if self.table is not None else None for name in names}
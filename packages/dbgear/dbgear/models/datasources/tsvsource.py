@@ -0,0 +1,11 @@
+from . import csvsource
+
+EXTENSION = '.tsv'
+
+
+class DataSource(csvsource.DataSource):
+    """タブ区切り（TSV）形式のデータソース。オプションは csvsource と同じ"""
+    extension = EXTENSION
+
+    def __init__(self, *args, delimiter: str = '\t', **kwargs):
+        super().__init__(*args, delimiter=delimiter, **kwargs)
@@ -0,0 +1,156 @@
+"""
+プロセス全体で共有するXLSXブックのキャッシュ
+
+1つのブックの多数のシートを別々のデータモデルが参照する場合に、ブックを
+開き直して共有文字列等を再解析しないよう、読み取り専用で開いたブックを
+(パス, 更新日時) をキーに保持する。シートの行は保持せず、読み取りのたびに
+ブックから順に読み出す。
+
+rows() で読み出している間だけブックを使用中とし、使用中でないブックは、
+開いているブックの推定サイズの合計が上限（DBGEAR_WORKBOOK_CACHE_MB）を超えるか
+ブックの数が上限を超えた場合に古いものから閉じる。ファイルが更新された場合も、
+古い版のブックは使用中でなくなりしだい閉じる。
+シートの範囲（行数の見込み）は、ブックを開かずにシートのXMLの先頭から読み取る。
+"""
+
+import os
+import posixpath
+import re
+import zipfile
+from collections import OrderedDict
+from typing import Iterator
+from xml.etree import ElementTree
+
+import openpyxl
+
+# 開いておくブックの推定サイズの上限（MB）
+DEFAULT_LIMIT_MB = int(os.environ.get('DBGEAR_WORKBOOK_CACHE_MB', '256'))
+# 同時に開いておくブックの上限
+MAX_OPEN_WORKBOOKS = 4
+
+# 読み取り専用のブックが開いている間保持する部品（共有文字列とスタイル）
+_RESIDENT_PARTS = ('xl/sharedStrings.xml', 'xl/styles.xml')
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def estimate_size(path: str) -> int:
+    """開いたブックのおおよそのメモリ使用量（展開後の共有文字列とスタイルのサイズ）"""
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        return sum(archive.getinfo(name).file_size for name in _RESIDENT_PARTS if name in names)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _sheet_part(archive: zipfile.ZipFile, sheet: str) -> str:
+    """シート名に対応するワークシートのXMLのパス"""
+    rid = None
+    for elem in ElementTree.fromstring(archive.read('xl/workbook.xml')).iter():
+        if _local(elem.tag) == 'sheet' and elem.get('name') == sheet:
+            rid = elem.get(f'{{{_REL_NS}}}id')
+            break
+    if rid is None:
+        raise KeyError(f'Worksheet {sheet} does not exist.')
+    for elem in ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels')).iter():
+        if _local(elem.tag) == 'Relationship' and elem.get('Id') == rid:
+            target = elem.get('Target')
+            if target.startswith('/'):
+                return target[1:]
+            return posixpath.normpath(posixpath.join('xl', target))
+    raise KeyError(f'Worksheet {sheet} does not exist.')
+
+
+def sheet_max_row(path: str, sheet: str) -> int | None:
+    """シートの最終行（ブックに記録された範囲。記録されていない場合は None）"""
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(_sheet_part(archive, sheet)) as f:
+            for _, elem in ElementTree.iterparse(f, events=('start',)):
+                tag = _local(elem.tag)
+                if tag == 'dimension':
+                    match = re.search(r'(\d+)$', elem.get('ref', ''))
+                    return int(match.group(1)) if match else None
+                if tag == 'sheetData':
+                    return None
+    return None
+
+
+class WorkbookCache:
+
+    def __init__(self, limit_mb: int = DEFAULT_LIMIT_MB, max_open: int = MAX_OPEN_WORKBOOKS):
+        self.limit = limit_mb * 1024 * 1024
+        self.max_open = max_open
+        self.size = 0
+        self._books: OrderedDict[tuple[str, float], openpyxl.Workbook] = OrderedDict()
+        self._sizes: dict[tuple[str, float], int] = {}
+        # ブックごとの読み出し中のシートの数
+        self._readers: dict[tuple[str, float], int] = {}
+        self._max_rows: dict[tuple[tuple[str, float], str], int | None] = {}
+
+    @staticmethod
+    def _key(path: str) -> tuple[str, float]:
+        return (os.path.abspath(path), os.path.getmtime(path))
+
+    def rows(self, path: str, sheet: str) -> Iterator[tuple]:
+        """シートの行（セルの値のタプル）を先頭から順に読み出す。読み出している間はブックを閉じない"""
+        key = self._key(path)
+        worksheet = self._book(key)[sheet]
+        self._readers[key] = self._readers.get(key, 0) + 1
+        try:
+            yield from worksheet.iter_rows(values_only=True)
+        finally:
+            readers = self._readers.pop(key, 1) - 1
+            if readers:
+                self._readers[key] = readers
+            self._evict()
+
+    def max_row(self, path: str, sheet: str) -> int | None:
+        """シートの最終行。ブックは開かずに、シートのXMLに記録された範囲から求める"""
+        key = (self._key(path), sheet)
+        if key not in self._max_rows:
+            self._max_rows[key] = sheet_max_row(path, sheet)
+        return self._max_rows[key]
+
+    def clear(self) -> None:
+        for book in self._books.values():
+            book.close()
+        self._books.clear()
+        self._sizes.clear()
+        self._readers.clear()
+        self._max_rows.clear()
+        self.size = 0
+
+    def _book(self, key) -> openpyxl.Workbook:
+        book = self._books.get(key)
+        if book is not None:
+            self._books.move_to_end(key)
+            return book
+        book = self._books[key] = openpyxl.load_workbook(key[0], read_only=True, data_only=True)
+        self._sizes[key] = estimate_size(key[0])
+        self.size += self._sizes[key]
+        self._evict(keep=key)
+        return book
+
+    def _evict(self, keep=None) -> None:
+        # 更新前の版のブックは、上限に関係なく閉じる
+        for key in [k for k in self._books if k != keep and k not in self._readers and self._stale(k)]:
+            self._close(key)
+        while len(self._books) > self.max_open or self.size > self.limit:
+            victim = next((k for k in self._books if k != keep and k not in self._readers), None)
+            if victim is None:
+                break
+            self._close(victim)
+
+    def _stale(self, key) -> bool:
+        try:
+            return os.path.getmtime(key[0]) != key[1]
+        except OSError:
+            return True
+
+    def _close(self, key) -> None:
+        self._books.pop(key).close()
+        self.size -= self._sizes.pop(key)
+
+
+workbooks = WorkbookCache()
@@ -1,6 +1,7 @@
-import openpyxl
+from itertools import islice
 
 from .base import BaseDataSource
+from .workbook import workbooks
 from ...utils.dict_utils import dict_to_nested
 
 
@@ -21,6 +22,10 @@ class DataSource(BaseDataSource):
         self.settings = kwargs.pop('settings', {})
         self._data = []
 
+    @property
+    def path(self) -> str:
+        return f'{self.folder}/{self.data_path}'
+
     @property
     def filename(self) -> str:
         return self.data_path
@@ -29,37 +34,48 @@ class DataSource(BaseDataSource):
     def data(self):
         return self._data
 
+    def estimate_rows(self) -> int | None:
+        # ブックに記録されたシートの範囲から求める（ブックは開かない。末尾の空行も数える）
+        max_row = workbooks.max_row(self.path, self.table_name)
+        if max_row is None:
+            return None
+        return max(max_row - self.start_row + 1, 0)
+
     def load(self):
-        wb = openpyxl.load_workbook(f'{self.folder}/{self.data_path}', data_only=True)
-        ws = wb[self.table_name]
-
-        headers = []
-        for col in range(1, ws.max_column + 1):
-            cell_value = ws.cell(row=self.header_row, column=col).value
-            if cell_value is not None:
-                headers.append(str(cell_value).strip())
-            else:
-                headers.append(f"Column_{col}")
-
-        data = []
-        for row_num in range(self.start_row, ws.max_row + 1):
+        self._data = list(self.iter_rows())
+
+    def iter_rows(self):
+        """シートを先頭から読み取り専用で走査し、変換した行を順に返す"""
+        rows = workbooks.rows(self.path, self.table_name)
+
+        header = next(islice(rows, self.header_row - 1, None), ())
+        headers = [
+            str(value).strip() if value is not None else f"Column_{col}"
+            for col, value in enumerate(header, 1)
+        ]
+
+        convert = self._convert_cell_value
+        if self.start_row > self.header_row:
+            body = islice(rows, self.start_row - self.header_row - 1, None)
+        else:
+            body = islice(workbooks.rows(self.path, self.table_name), self.start_row - 1, None)
+        for values in body:
+            if len(values) > len(headers):
+                # ヘッダー行より右側に値がある場合
+                headers.extend(f"Column_{col}" for col in range(len(headers) + 1, len(values) + 1))
             row_data = {}
             has_data = False
-
-            for col_idx, header in enumerate(headers):
-                cell_value = ws.cell(row=row_num, column=col_idx + 1).value
-
+            for header, cell_value in zip(headers, values):
                 if cell_value is not None:
                     has_data = True
-                    row_data[header] = self._convert_cell_value(cell_value)
+                    row_data[header] = convert(cell_value)
                 else:
                     row_data[header] = None
+            for header in headers[len(values):]:
+                row_data[header] = None
 
             if has_data:
-                data.append(dict_to_nested(row_data))
-
-        wb.close()
-        self._data = data
+                yield dict_to_nested(row_data)
 
     def _convert_cell_value(self, value):
         if value is None:
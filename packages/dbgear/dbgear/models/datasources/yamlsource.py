@@ -1,10 +1,18 @@
 import os
 import yaml
 
+from . import compiled
 from .base import BaseDataSource
+from .batch import ColumnBatch
 
 
 class DataSource(BaseDataSource):
+    """
+    YAML形式のデータソース
+
+    `dbgear data compile` で作成したコンパイル済みファイル（.datc）が最新であれば、
+    YAMLを解析せずにそちらを読み込む。
+    """
     folder: str
     environ: str
     name: str
@@ -21,6 +29,10 @@ class DataSource(BaseDataSource):
         self.segment = segment
         self.settings = kwargs.pop('settings', {})
         self._data = []
+        self._compiled: compiled.CompiledData | None = None
+        # 直前の load でコンパイル済みファイルを使用したかどうか
+        self.from_compiled = False
+        self._digest: str | None = None
 
     @property
     def filename(self) -> str:
@@ -28,20 +40,68 @@ class DataSource(BaseDataSource):
             return f"{self.schema_name}@{self.table_name}#{self.segment}.dat"
         return f"{self.schema_name}@{self.table_name}.dat"
 
+    @property
+    def path(self) -> str:
+        return os.path.join(self.folder, self.environ, self.name, self.filename)
+
     @property
     def data(self):
+        if self._compiled is not None:
+            # 行のdictは参照された時点で組み立てる
+            self._data = self._compiled.rows()
+            self._compiled = None
         return self._data
 
+    @property
+    def batch(self) -> ColumnBatch:
+        if self._compiled is not None:
+            return self._compiled.batch
+        return ColumnBatch.from_rows(self._data)
+
     def load(self):
-        path = os.path.join(self.folder, self.environ, self.name, self.filename)
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Data source file {path} does not exist.")
-        with open(path, 'r', encoding='utf-8') as f:
-            self._data = yaml.safe_load(f)
+        content = self._read()
+        self._digest = compiled.source_digest(content)
+        self._compiled = compiled.read(self.path, self._digest, self.table)
+        self.from_compiled = self._compiled is not None
+        if self.from_compiled:
+            self._data = None
+            return
+        self._data = yaml.safe_load(content)
+
+    def compile(self) -> bool:
+        """
+        読み込んだYAMLのデータからコンパイル済みファイルを作成する（未読み込みの場合は読み込む）
+
+        行のリスト以外のデータや、保存できない値を含む場合は作成せず False を返す。
+        """
+        if self._digest is None:
+            self.load()
+        if self.from_compiled:
+            return True
+        if not isinstance(self._data, list) or not all(isinstance(row, dict) for row in self._data):
+            return False
+        return compiled.write(self.path, self._digest, self._data, self.table)
+
+    def estimate_rows(self) -> int | None:
+        """
+        解析せずに求めた行数
+
+        save()（yaml.dump のブロック形式）で書かれた行のリストであれば、行頭の「- 」の数が行数になる。
+        先頭が「- 」で始まらないファイル（コメントやフロー形式で書いたもの等）は、数え方が
+        当てはまらないため None を返す。
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        if content.strip() in (b'', b'[]'):
+            return 0
+        if not content.startswith(b'- '):
+            return None
+        return 1 + content.count(b'\n- ')
 
     def save(self):
-        path = os.path.join(self.folder, self.environ, self.name, self.filename)
-        with open(path, 'w', encoding='utf-8') as f:
+        with open(self.path, 'w', encoding='utf-8') as f:
             yaml.dump(
                 self.data,
                 f,
@@ -50,3 +110,9 @@ class DataSource(BaseDataSource):
                 default_flow_style=False,
                 sort_keys=False
             )
+
+    def _read(self) -> bytes:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Data source file {self.path} does not exist.")
+        with open(self.path, 'rb') as f:
+            return f.read()
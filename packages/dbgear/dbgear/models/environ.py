@@ -7,9 +7,11 @@ from .base import BaseSchema
 from .schema import SchemaManager
 from .mapping import MappingManager
 from .tenant import TenantRegistry
+from .cache import ModelCache
 from .exceptions import DBGearEntityNotFoundError
 from .exceptions import DBGearEntityRemovalError
 from ..utils.fileio import save_model
+from ..utils.profiling import phase
 
 
 class Environ(BaseSchema):
@@ -21,6 +23,10 @@ class Environ(BaseSchema):
 
     _schemas: SchemaManager | None = None
     _tenant: TenantRegistry | None = None
+    _lazy: bool = False
+    _cache_dir: str | None = None
+    # 読み込んだMapping/DataModelをファイル単位で保持する
+    _cache: ModelCache = pydantic.PrivateAttr(default_factory=ModelCache)
 
     @classmethod
     def _directory(cls, folder, name) -> str:
@@ -31,13 +37,17 @@ class Environ(BaseSchema):
         return os.path.join(folder, name, 'environ.yaml')
 
     @classmethod
-    def load(cls, folder: str, name: str) -> None:
+    @phase('environ.load')
+    def load(cls, folder: str, name: str, lazy: bool = False, cache_dir: str | None = None) -> None:
         with open(cls._fullpath(folder, name), 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
-        return cls(
+        env = cls(
             folder=folder,
             name=name,
             **data)
+        env._lazy = lazy
+        env._cache_dir = cache_dir
+        return env
 
     def save(self) -> None:
         path = Environ._directory(self.folder, self.name)
@@ -60,18 +70,18 @@ class Environ(BaseSchema):
     @property
     def schemas(self) -> SchemaManager | None:
         if self._schemas is None:
-            self._schemas = SchemaManager.load(f'{self.folder}/{self.name}/schema.yaml')
+            self._schemas = SchemaManager.load(f'{self.folder}/{self.name}/schema.yaml', lazy=self._lazy, cache_dir=self._cache_dir)
         return self._schemas
 
     @property
     def tenant(self) -> TenantRegistry | None:
         if self._tenant is None:
-            self._tenant = TenantRegistry.load(self.folder, self.name)
+            self._tenant = TenantRegistry.load(self.folder, self.name, cache=self._cache)
         return self._tenant
 
     @property
     def mappings(self) -> MappingManager:
-        return MappingManager(self.folder, self.name)
+        return MappingManager(self.folder, self.name, cache=self._cache)
 
     @property
     def databases(self):
@@ -84,16 +94,18 @@ class Environ(BaseSchema):
 
 class EnvironManager:
 
-    def __init__(self, folder: str):
+    def __init__(self, folder: str, lazy: bool = False, cache_dir: str | None = None):
         self.folder = folder
+        self.lazy = lazy
+        self.cache_dir = cache_dir
 
     def __getitem__(self, key: str) -> Environ:
-        return Environ.load(self.folder, key)
+        return Environ.load(self.folder, key, lazy=self.lazy, cache_dir=self.cache_dir)
 
     def __iter__(self):
         for path in sorted(pathlib.Path(self.folder).glob('*/environ.yaml')):
             name = str(path.parent.relative_to(self.folder))
-            yield Environ.load(self.folder, name)
+            yield Environ.load(self.folder, name, lazy=self.lazy, cache_dir=self.cache_dir)
 
     def __contains__(self, name: str) -> bool:
         return os.path.exists(Environ._fullpath(self.folder, name))
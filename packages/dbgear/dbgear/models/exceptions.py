@@ -21,3 +21,11 @@ class DBGearEntityNotFoundError(DBGearError):
 class DBGearEntityRemovalError(DBGearError):
     """Raised when an entity cannot be removed due to constraints"""
     pass
+
+
+class DBGearDataValidationError(DBGearError):
+    """Raised when data sources do not match their table definitions"""
+
+    def __init__(self, message: str, issues: list = None):
+        super().__init__(message)
+        self.issues = issues or []
@@ -0,0 +1,149 @@
+"""
+Cross-schema relation graph.
+
+Forward and reverse foreign-key adjacency, keyed by ``"schema.table"``,
+built once from the schemas of a ``SchemaManager`` so neighbor lookups
+do not rescan every table.
+"""
+
+from collections import deque
+from typing import Iterable
+from typing import NamedTuple
+
+from .relation import Relation
+from .table import Table
+from .trigger import Trigger
+from .view import View
+
+
+class RelationEdge(NamedTuple):
+    source: str
+    target: str
+    relation: Relation
+
+
+class ViewRef(NamedTuple):
+    schema_name: str
+    view: View
+
+
+def qualified_name(schema_name: str, table_name: str) -> str:
+    return f'{schema_name}.{table_name}'
+
+
+def view_references_table(select_statement: str, schema_name: str, table_name: str) -> bool:
+    """Simple check if view references the specified table"""
+    # This is a simple implementation - in practice, you might want proper SQL parsing
+    statement_lower = select_statement.lower()
+
+    # Check for table name references
+    possible_refs = [
+        f" {table_name} ",
+        f" {table_name}.",
+        f" {schema_name}.{table_name} ",
+        f" {schema_name}.{table_name}.",
+        f"\t{table_name}\t",
+        f"\n{table_name}\n",
+        f"from {table_name}",
+        f"join {table_name}",
+    ]
+
+    return any(ref in statement_lower for ref in possible_refs)
+
+
+class RelationGraph:
+    """Foreign-key graph over all tables of the given schemas."""
+
+    def __init__(self, schemas: Iterable = ()):
+        self.tables: dict[str, Table] = {}
+        self._forward: dict[str, list[RelationEdge]] = {}
+        self._reverse: dict[str, list[RelationEdge]] = {}
+        self._triggers: dict[str, list[Trigger]] = {}
+        self._views: list[ViewRef] = []
+        self._view_refs: dict[str, list[ViewRef]] = {}
+
+        for schema in schemas:
+            for table in schema.tables:
+                self.add_table(qualified_name(schema.name, table.table_name), table)
+            for view in schema.views:
+                self._views.append(ViewRef(schema.name, view))
+            for trigger in schema.triggers:
+                key = qualified_name(schema.name, trigger.table_name)
+                self._triggers.setdefault(key, []).append(trigger)
+
+    @classmethod
+    def from_tables(cls, tables: dict[str, Table]) -> 'RelationGraph':
+        """Build a graph from tables keyed by ``"schema.table"``."""
+        graph = cls()
+        for key, table in tables.items():
+            graph.add_table(key, table)
+        return graph
+
+    def add_table(self, key: str, table: Table) -> None:
+        self.tables[key] = table
+        edges = self._forward.setdefault(key, [])
+        for relation in table.relations:
+            target = qualified_name(relation.target.schema_name, relation.target.table_name)
+            edge = RelationEdge(key, target, relation)
+            edges.append(edge)
+            self._reverse.setdefault(target, []).append(edge)
+        self._view_refs.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.tables
+
+    def references(self, key: str) -> list[RelationEdge]:
+        """Relations from the table to the tables it references."""
+        return self._forward.get(key, [])
+
+    def referenced_by(self, key: str) -> list[RelationEdge]:
+        """Relations from other tables that reference the table."""
+        return self._reverse.get(key, [])
+
+    def triggers(self, key: str) -> list[Trigger]:
+        """Triggers defined on the table."""
+        return self._triggers.get(key, [])
+
+    def views(self, key: str) -> list[ViewRef]:
+        """Views whose SELECT statement references the table."""
+        refs = self._view_refs.get(key)
+        if refs is None:
+            # SQLの解析は重いため、問い合わせのあったテーブルだけ判定して保持する
+            schema_name, table_name = key.split('.', 1)
+            refs = self._view_refs[key] = [
+                ref for ref in self._views
+                if view_references_table(ref.view.select_statement, schema_name, table_name)
+            ]
+        return refs
+
+    def neighbors(self, key: str, direction: str) -> list[str]:
+        """Adjacent table keys; ``direction`` is 'references' or 'referenced_by'."""
+        if direction == 'references':
+            return [edge.target for edge in self.references(key)]
+        if direction == 'referenced_by':
+            return [edge.source for edge in self.referenced_by(key)]
+        raise ValueError(f"Unknown direction '{direction}'")
+
+    def walk(self, start: str, direction: str, level: int,
+             include: Iterable[str] | None = None) -> dict[str, int]:
+        """Breadth-first search up to ``level`` hops.
+
+        Returns the reached table keys (including ``start``) with their
+        distance from ``start``. With ``include`` only those keys are
+        visited.
+        """
+        allowed = self.tables if include is None else include
+        if level < 0:
+            return {}
+        depths = {start: 0}
+        queue = deque([start])
+        while queue:
+            key = queue.popleft()
+            depth = depths[key]
+            if depth >= level:
+                continue
+            for neighbor in self.neighbors(key, direction):
+                if neighbor not in depths and neighbor in allowed:
+                    depths[neighbor] = depth + 1
+                    queue.append(neighbor)
+        return depths
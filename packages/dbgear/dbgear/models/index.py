@@ -24,8 +24,9 @@ class Index(BaseSchema):
 
 class IndexManager:
 
-    def __init__(self, indexes: list[Index]):
+    def __init__(self, indexes: list[Index], table=None):
         self.indexes = indexes
+        self.table = table
 
     def __getitem__(self, index: int) -> Index:
         return self.indexes[index]
@@ -38,6 +39,10 @@ class IndexManager:
 
     def append(self, index: Index) -> None:
         self.indexes.append(index)
+        if self.table is not None:
+            self.table.invalidate_index()
 
     def remove(self, index: Index) -> None:
         self.indexes.remove(index)
+        if self.table is not None:
+            self.table.invalidate_index()
@@ -0,0 +1,76 @@
+"""
+Deferred model materialization.
+
+Raw parsed YAML dicts are held as pending entries and validated into
+pydantic models only when they are first read.
+"""
+
+from typing import Any
+from typing import Callable
+
+
+class Pending:
+    """Raw data waiting to be validated into a model."""
+
+    __slots__ = ('factory', 'raw', 'value')
+
+    def __init__(self, factory: Callable[[dict], Any], raw: dict):
+        self.factory = factory
+        self.raw = raw
+        self.value = None
+
+    def resolve(self):
+        # 同じPendingを複数のLazyDictで共有しても検証は一度だけ行う
+        if self.value is None:
+            self.value = self.factory(self.raw)
+            self.raw = None
+        return self.value
+
+    def __repr__(self) -> str:
+        return f'Pending({self.value!r})' if self.value is not None else 'Pending(...)'
+
+
+class LazyDict(dict):
+    """dict whose Pending values are resolved and cached on first access."""
+
+    def _resolve(self, key, value):
+        if isinstance(value, Pending):
+            value = value.resolve()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __getitem__(self, key):
+        return self._resolve(key, dict.__getitem__(self, key))
+
+    def __iter__(self):
+        # dict.update()やdict()によるPendingの素通しを防ぐため、C実装のイテレータを使わせない
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self[key]
+
+    def pop(self, key, *args):
+        return self._resolve(key, dict.pop(self, key, *args))
+
+    def values(self):
+        return [self[key] for key in dict.keys(self)]
+
+    def items(self):
+        return [(key, self[key]) for key in dict.keys(self)]
+
+    def copy(self) -> 'LazyDict':
+        return LazyDict(dict.items(self))
+
+    def update_raw(self, other: dict) -> None:
+        """Copy entries from another dict without resolving pending values."""
+        for key in dict.keys(other):
+            dict.__setitem__(self, key, dict.__getitem__(other, key))
+
+    def is_pending(self, key) -> bool:
+        return isinstance(dict.__getitem__(self, key), Pending)
+
+    def materialize(self) -> None:
+        for key in dict.keys(self):
+            self[key]
@@ -7,6 +7,7 @@ from .base import BaseSchema
 from .schema import Schema
 from .schema import SchemaManager
 from .datamodel import DataModel
+from .cache import ModelCache
 from .exceptions import DBGearEntityNotFoundError
 from .exceptions import DBGearEntityRemovalError
 from ..utils.fileio import save_model
@@ -25,7 +26,9 @@ class Mapping(BaseSchema):
     charset: str | None = None      # e.g., utf8mb4, latin1
     collation: str | None = None    # e.g., utf8mb4_unicode_ci, utf8mb4_ja_0900_as_cs
 
-
+    _cache: ModelCache | None = None
+    # テナントビュー間で共有する状態（build_schemaの結果など）
+    _shared: dict = pydantic.PrivateAttr(default_factory=dict)
 
     @classmethod
     def _directory(cls, folder: str, environ: str, name: str) -> str:
@@ -36,8 +39,11 @@ class Mapping(BaseSchema):
         return os.path.join(folder, environ, name, '_mapping.yaml')
 
     @classmethod
-    def load(cls, folder: str, environ: str, name: str):
-        with open(Mapping._fullpath(folder, environ, name), 'r', encoding='utf-8') as f:
+    def load(cls, folder: str, environ: str, name: str, cache: ModelCache | None = None):
+        path = Mapping._fullpath(folder, environ, name)
+        if cache is not None:
+            return cache.get(path, lambda: cls.load(folder, environ, name)._with_cache(cache))
+        with open(path, 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
         return cls(
             folder=folder,
@@ -46,6 +52,10 @@ class Mapping(BaseSchema):
             **data
         )
 
+    def _with_cache(self, cache: ModelCache):
+        self._cache = cache
+        return self
+
     def save(self):
         path = Mapping._directory(self.folder, self.environ, self.name)
         if not os.path.exists(path):
@@ -64,32 +74,76 @@ class Mapping(BaseSchema):
         os.remove(Mapping._fullpath(self.folder, self.environ, self.name))
         os.rmdir(path)
 
+    def for_tenant(self, tenant_name: str):
+        """Return a lightweight view of this mapping for a tenant database.
+
+        The view is a shallow copy: fields and the built schema are shared
+        with this mapping and only ``tenant_name`` differs.
+        """
+        return self.model_copy(update={'tenant_name': tenant_name})
+
+    def detach(self):
+        """Return a copy that can be modified without affecting this mapping.
+
+        Mutable fields are copied and the built schema is not shared; the
+        model cache is kept so that datamodels are still loaded through it.
+        """
+        copied = self.model_copy(update={'schemas': list(self.schemas)})
+        copied._shared = {}
+        return copied
+
     def build_schema(self, project_schema: SchemaManager, environ_schema: SchemaManager | None) -> Schema:
-        schema = Schema(name=self.name)
+        """Return the read-only merged schema for this mapping.
+
+        The result is memoized (and shared with tenant views) until the list of
+        source schemas changes: a different ``schemas`` list, or a schema
+        added, removed or replaced in either manager.
+        """
+        sources = []
         for name in self.schemas:
             if name in project_schema:
-                schema.merge(project_schema[name])
+                sources.append(project_schema[name])
             if environ_schema is not None and name in environ_schema:
-                schema.merge(environ_schema[name])
+                sources.append(environ_schema[name])
+        built = self._shared.get('schema')
+        if built is not None and built[0] == self.name and _same_objects(built[1], sources):
+            return built[2]
+        schema = Schema.merged_view(self.name, sources)
+        self._shared['schema'] = (self.name, sources, schema)
         return schema
 
     @property
     def instance_name(self) -> str:
         return self.tenant_name or self.name
 
-    @property
-    def datamodels(self):
+    def _datamodel_names(self) -> list[tuple[str, str]]:
+        names = []
         for path in sorted(pathlib.Path(self.folder).glob(f'{self.environ}/{self.name}/*.yaml')):
             if path.name != '_mapping.yaml':
                 schema_name, table_name = path.stem.split('@')
-                yield DataModel.load(
-                    folder=self.folder,
-                    environ=self.environ,
-                    map_name=self.name,
-                    schema_name=schema_name,
-                    table_name=table_name,
-                    tenant_name=self.tenant_name,
-                )
+                names.append((schema_name, table_name))
+        return names
+
+    @property
+    def datamodels(self):
+        if self._cache is not None:
+            # ファイルの一覧はディレクトリの更新時刻が変わるまで再利用する
+            names = self._cache.get(
+                Mapping._directory(self.folder, self.environ, self.name),
+                self._datamodel_names,
+                variant='datamodels')
+        else:
+            names = self._datamodel_names()
+        for schema_name, table_name in names:
+            yield DataModel.load(
+                folder=self.folder,
+                environ=self.environ,
+                map_name=self.name,
+                schema_name=schema_name,
+                table_name=table_name,
+                tenant_name=self.tenant_name,
+                cache=self._cache,
+            )
 
     def datamodel(self, schema_name: str, table_name: str) -> DataModel:
         # 直接指定の場合は、パスが存在するか確認する。
@@ -103,22 +157,28 @@ class Mapping(BaseSchema):
             schema_name=schema_name,
             table_name=table_name,
             tenant_name=self.tenant_name,
+            cache=self._cache,
         )
 
 
+def _same_objects(a: list, b: list) -> bool:
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
 class MappingManager:
 
-    def __init__(self, folder: str, environ: str):
+    def __init__(self, folder: str, environ: str, cache: ModelCache | None = None):
         self.folder = folder
         self.environ = environ
+        self.cache = cache
 
     def __getitem__(self, key: str) -> Mapping:
-        return Mapping.load(self.folder, self.environ, key)
+        return Mapping.load(self.folder, self.environ, key, cache=self.cache)
 
     def __iter__(self):
         for path in sorted(pathlib.Path(self.folder).glob(f'{self.environ}/*/_mapping.yaml')):
             name = str(path.parent.relative_to(pathlib.Path(self.folder) / self.environ))
-            yield Mapping.load(self.folder, self.environ, name)
+            yield Mapping.load(self.folder, self.environ, name, cache=self.cache)
 
     def __contains__(self, key: str) -> bool:
         return os.path.exists(Mapping._fullpath(self.folder, self.environ, key))
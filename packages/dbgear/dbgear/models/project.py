@@ -7,6 +7,7 @@ from .schema import SchemaManager
 from .environ import EnvironManager
 from .option import Options
 from ..utils.fileio import save_model
+from ..utils.profiling import phase
 
 
 class Project(BaseSchema):
@@ -16,15 +17,22 @@ class Project(BaseSchema):
     options: Options = pydantic.Field(default_factory=Options)
 
     _schemas: SchemaManager | None = None
+    _lazy: bool = False
+    _cache_dir: str | None = None
 
     @classmethod
-    def load(cls, folder: str):
+    @phase('project.load')
+    def load(cls, folder: str, lazy: bool = False, cache_dir: str | None = None):
         with open(f'{folder}/project.yaml', 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
         mgr = cls(
             folder=folder,
             **data
         )
+        # スキーマ(プロジェクト・環境)を初回アクセス時に検証するモード
+        mgr._lazy = lazy
+        # 検証済みスキーマのキャッシュ先
+        mgr._cache_dir = cache_dir
         return mgr
 
     def save(self) -> None:
@@ -34,9 +42,9 @@ class Project(BaseSchema):
     @property
     def schemas(self) -> SchemaManager:
         if self._schemas is None:
-            self._schemas = SchemaManager.load(f'{self.folder}/schema.yaml')
+            self._schemas = SchemaManager.load(f'{self.folder}/schema.yaml', lazy=self._lazy, cache_dir=self._cache_dir)
         return self._schemas
 
     @property
     def envs(self) -> EnvironManager:
-        return EnvironManager(self.folder)
+        return EnvironManager(self.folder, lazy=self._lazy, cache_dir=self._cache_dir)
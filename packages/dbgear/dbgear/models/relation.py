@@ -43,8 +43,9 @@ class Relation(BaseSchema):
 
 class RelationManager:
 
-    def __init__(self, relations: list[Relation]):
+    def __init__(self, relations: list[Relation], table=None):
         self.relations = relations
+        self.table = table
 
     def __getitem__(self, index: int) -> Relation:
         return self.relations[index]
@@ -57,6 +58,10 @@ class RelationManager:
 
     def append(self, relation: Relation) -> None:
         self.relations.append(relation)
+        if self.table is not None:
+            self.table.invalidate_index()
 
     def remove(self, relation: Relation) -> None:
         self.relations.remove(relation)
+        if self.table is not None:
+            self.table.invalidate_index()
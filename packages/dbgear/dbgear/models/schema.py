@@ -2,6 +2,8 @@ import pydantic
 import yaml
 import os
 
+from collections.abc import Mapping
+
 from .base import BaseSchema
 from .column_type import ColumnType
 from .column_type import ColumnTypeRegistry
@@ -15,7 +17,12 @@ from .procedure import Procedure
 from .procedure import ProcedureManager
 from .notes import Note
 from .notes import NoteManager
+from .graph import RelationGraph
+from .lazy import LazyDict
+from .lazy import Pending
 from ..utils.populate import auto_populate_from_keys
+from ..utils import schema_cache
+from ..utils.profiling import phase
 
 
 class Schema(BaseSchema):
@@ -47,12 +54,97 @@ class Schema(BaseSchema):
         return NoteManager(self.notes_)
 
     def merge(self, other):
-        self.tables_.update(other.tables_)
-        self.views_.update(other.views_)
-        self.triggers_.update(other.triggers_)
-        self.procedures_.update(other.procedures_)
+        self.tables_ = _merge_entities(self.tables_, other.tables_)
+        self.views_ = _merge_entities(self.views_, other.views_)
+        self.triggers_ = _merge_entities(self.triggers_, other.triggers_)
+        self.procedures_ = _merge_entities(self.procedures_, other.procedures_)
         self.notes_.extend(other.notes_)
 
+    def materialize(self) -> None:
+        """Validate all entities that are still pending (lazy mode)."""
+        for entities in (self.tables_, self.views_, self.triggers_, self.procedures_):
+            if isinstance(entities, LazyDict):
+                entities.materialize()
+
+    @classmethod
+    def merged_view(cls, name: str, sources: list['Schema']):
+        """Build a read-only Schema over ``sources`` without copying their entities.
+
+        Lookups go to the sources at access time, and later sources take
+        precedence, the same as merging them in order.
+        """
+        schema = cls(name=name)
+        schema.tables_ = _MergedEntities(sources, 'tables_')
+        schema.views_ = _MergedEntities(sources, 'views_')
+        schema.triggers_ = _MergedEntities(sources, 'triggers_')
+        schema.procedures_ = _MergedEntities(sources, 'procedures_')
+        schema.notes_ = tuple(note for source in sources for note in source.notes_)
+        return schema
+
+    @classmethod
+    def load_lazy(cls, name: str, data: dict | None):
+        """Build a Schema whose tables, views, triggers and procedures are validated on first access."""
+        data = data or {}
+        schema = cls(name=name, notes=data.get('notes') or [])
+        schema.tables_ = _lazy_entities(Table, name, 'table_name', data.get('tables'))
+        schema.views_ = _lazy_entities(View, name, 'view_name', data.get('views'))
+        schema.triggers_ = _lazy_entities(Trigger, name, 'trigger_name', data.get('triggers'))
+        schema.procedures_ = _lazy_entities(Procedure, name, 'procedure_name', data.get('procedures'))
+        return schema
+
+
+class _MergedEntities(Mapping):
+    """Read-only view over the same entity dict of several schemas."""
+
+    def __init__(self, sources: list[Schema], attr: str):
+        self.sources = sources
+        self.attr = attr
+
+    def __getitem__(self, key):
+        for source in reversed(self.sources):
+            entities = getattr(source, self.attr)
+            if key in entities:
+                return entities[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        seen = {}
+        for source in self.sources:
+            seen.update(dict.fromkeys(getattr(source, self.attr)))
+        return iter(seen)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key) -> bool:
+        return any(key in getattr(source, self.attr) for source in self.sources)
+
+
+_ENTITY_KEYS = (
+    ('tables', 'table_name'),
+    ('views', 'view_name'),
+    ('triggers', 'trigger_name'),
+    ('procedures', 'procedure_name'),
+)
+
+
+def _lazy_entities(model, schema_name: str, key_field: str, raw: dict | None) -> LazyDict:
+    def factory(key):
+        # auto_populate_from_keysと同じ補完をエントリ単位で行う
+        return lambda data: model.model_validate({**data, 'instance': schema_name, key_field: key})
+    return LazyDict({key: Pending(factory(key), data) for key, data in (raw or {}).items()})
+
+
+def _merge_entities(target: dict, source: dict) -> dict:
+    if isinstance(source, LazyDict):
+        # 未検証のエントリは検証せずにそのまま引き継ぐ
+        if not isinstance(target, LazyDict):
+            target = LazyDict(target)
+        target.update_raw(source)
+    else:
+        target.update(source)
+    return target
+
 
 class SchemaManager(BaseSchema):
     schemas: dict[str, Schema] = {}
@@ -60,12 +152,41 @@ class SchemaManager(BaseSchema):
     notes_: list[Note] = pydantic.Field(default_factory=list, alias='notes')
 
     @classmethod
-    def load(cls, filename: str):
+    @phase('schema.load')
+    def load(cls, filename: str, lazy: bool = False, cache_dir: str | None = None):
+        """Load schema.yaml.
+
+        With ``lazy=True`` only the parsed YAML is kept; each Schema and its
+        entities are validated into models on first access and then cached.
+
+        With ``cache_dir`` the validated definition (``model_dump``) is stored
+        there, and later loads of the same file content skip YAML parsing and
+        validate the cached data instead. Cached data is always validated:
+        pydantic-core validates a dict faster than the models can be built
+        without validation in Python, so there is no unvalidated path.
+        """
         if not os.path.exists(filename):
             return None
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        populated_data = auto_populate_from_keys(data, {
+        with open(filename, 'rb') as f:
+            content = f.read()
+        if cache_dir is not None:
+            cached = schema_cache.read(cache_dir, filename, content)
+            if cached is not None:
+                if lazy:
+                    return cls._load_lazy(cached)
+                return cls.model_validate(cached)
+        data = yaml.safe_load(content)
+        if lazy:
+            return cls._load_lazy(data or {})
+        populated_data = cls._populate(data)
+        mgr = cls(**populated_data)
+        if cache_dir is not None:
+            schema_cache.write(cache_dir, filename, content, mgr._cache_dump())
+        return mgr
+
+    @staticmethod
+    def _populate(data: dict) -> dict:
+        return auto_populate_from_keys(data, {
             'schemas.$1.name': '$1',
             'schemas.$1.tables.$2.instance': '$1',
             'schemas.$1.tables.$2.table_name': '$2',
@@ -76,9 +197,37 @@ class SchemaManager(BaseSchema):
             'schemas.$1.procedures.$2.instance': '$1',
             'schemas.$1.procedures.$2.procedure_name': '$2',
         })
-        return cls(**populated_data)
+
+    def _cache_dump(self) -> dict:
+        # 除外フィールド（スキーマ名・エンティティ名）はキーから補完されるため、
+        # 読み込み時に_populateを行わなくて済むよう、ここで書き戻しておく
+        data = self.model_dump(by_alias=True)
+        for schema_name, schema in data['schemas'].items():
+            schema['name'] = schema_name
+            for attr, key_field in _ENTITY_KEYS:
+                for key, entity in (schema.get(attr) or {}).items():
+                    entity[key_field] = key
+        return data
+
+    @classmethod
+    def _load_lazy(cls, data: dict):
+        mgr = cls(
+            registry=data.get('registry') or {},
+            notes=data.get('notes') or [],
+        )
+        mgr.schemas = LazyDict({
+            name: Pending(lambda raw, name=name: Schema.load_lazy(name, raw), raw)
+            for name, raw in (data.get('schemas') or {}).items()
+        })
+        return mgr
+
+    def materialize(self) -> None:
+        """Validate everything that is still pending (lazy mode)."""
+        for schema in self:
+            schema.materialize()
 
     def save(self, filename: str) -> None:
+        self.materialize()
         with open(filename, 'w', encoding='utf-8') as f:
             yaml.dump(
                 self.model_dump(
@@ -120,3 +269,7 @@ class SchemaManager(BaseSchema):
     @property
     def notes(self) -> NoteManager:
         return NoteManager(self.notes_)
+
+    def relation_graph(self) -> RelationGraph:
+        """Build the cross-schema foreign-key graph of the current definitions."""
+        return RelationGraph(self)
@@ -32,6 +32,54 @@ class MySQLTableOptions(BaseSchema):
     partition_count: int | None = None  # HASH/KEY用のパーティション数
 
 
+class TableLookup:
+    """Name-based maps over a table's columns, indexes and relations.
+
+    The maps are rebuilt when one of the lists is replaced or changes
+    length; managers obtained from ``Table`` also invalidate them on
+    ``append``/``remove``. Renaming a column in place is not detected by
+    name lookups for the new name; call ``Table.invalidate_index()`` after it.
+    """
+
+    def __init__(self):
+        self.stamp = None
+        self.columns: dict[str, Column] = {}
+        self.indexes: dict[str, list[Index]] = {}
+        self.relations: dict[str, list[Relation]] = {}
+
+    def build(self, table: 'Table') -> None:
+        self.columns = {}
+        for column in table.columns_:
+            self.columns.setdefault(column.column_name, column)
+        self.indexes = {}
+        for index in table.indexes_:
+            for name in index.columns:
+                # "col DESC" のような並び順指定を除いたカラム名で引く
+                self.indexes.setdefault(name.split()[0], []).append(index)
+        self.relations = {}
+        for relation in table.relations_:
+            for bind in relation.bind_columns:
+                related = self.relations.setdefault(bind.source_column, [])
+                if relation not in related:
+                    related.append(relation)
+        self.stamp = _stamp(table)
+
+    def __eq__(self, other) -> bool:
+        # 派生データのため、モデルの比較には影響させない
+        return isinstance(other, TableLookup)
+
+    def __deepcopy__(self, memo):
+        return TableLookup()
+
+
+def _stamp(table: 'Table') -> tuple:
+    return (
+        id(table.columns_), len(table.columns_),
+        id(table.indexes_), len(table.indexes_),
+        id(table.relations_), len(table.relations_),
+    )
+
+
 class Table(BaseSchema):
     table_name: str = pydantic.Field(exclude=True)
     display_name: str
@@ -44,17 +92,44 @@ class Table(BaseSchema):
     # MySQL固有のテーブルオプション
     mysql_options: MySQLTableOptions | None = None
 
+    _lookup: TableLookup = pydantic.PrivateAttr(default_factory=TableLookup)
+
     @property
     def columns(self) -> ColumnManager:
-        return ColumnManager(self.columns_)
+        return ColumnManager(self.columns_, self)
 
     @property
     def indexes(self) -> IndexManager:
-        return IndexManager(self.indexes_)
+        return IndexManager(self.indexes_, self)
 
     @property
     def relations(self) -> RelationManager:
-        return RelationManager(self.relations_)
+        return RelationManager(self.relations_, self)
+
+    @property
+    def lookup(self) -> TableLookup:
+        if self._lookup.stamp != _stamp(self):
+            self._lookup.build(self)
+        return self._lookup
+
+    def invalidate_index(self) -> None:
+        self._lookup.stamp = None
+
+    def find_column(self, column_name: str) -> Column | None:
+        column = self.lookup.columns.get(column_name)
+        if column is None or column.column_name == column_name:
+            return column
+        # 見つかったカラムの名前が変わっている場合のみ作り直して再確認する
+        self.invalidate_index()
+        return self.lookup.columns.get(column_name)
+
+    def indexes_for(self, column_name: str) -> list[Index]:
+        """Indexes that include the column."""
+        return self.lookup.indexes.get(column_name, [])
+
+    def relations_for(self, column_name: str) -> list[Relation]:
+        """Relations that bind the column as their source column."""
+        return self.lookup.relations.get(column_name, [])
 
     @property
     def notes(self) -> NoteManager:
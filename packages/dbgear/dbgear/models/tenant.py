@@ -7,6 +7,7 @@ from typing import Any
 
 from .base import BaseSchema
 from .mapping import Mapping
+from .cache import ModelCache
 from .exceptions import DBGearEntityExistsError
 from .exceptions import DBGearEntityNotFoundError
 from ..utils.populate import auto_populate_from_keys
@@ -34,8 +35,10 @@ class TenantRegistry(BaseSchema):
     name: str = pydantic.Field(exclude=True)
     tenants: dict[str, TenantConfig] = pydantic.Field(default_factory=dict)
 
+    _cache: ModelCache | None = None
+
     @classmethod
-    def load(cls, folder: str, name: str):
+    def load(cls, folder: str, name: str, cache: ModelCache | None = None):
         path = f'{folder}/{name}/tenant.yaml'
         if not os.path.exists(path):
             return None
@@ -44,11 +47,13 @@ class TenantRegistry(BaseSchema):
         populated_data = auto_populate_from_keys(data, {
             'tenants.$1.name': '$1',
         })
-        return cls(
+        registry = cls(
             folder=folder,
             name=name,
             **populated_data
         )
+        registry._cache = cache
+        return registry
 
     def save(self) -> None:
         """Save tenant configurations to a YAML file"""
@@ -88,19 +93,22 @@ class TenantRegistry(BaseSchema):
         del self.tenants[name]
 
     def materialize(self, settings: dict[str, str] = None):
+        # 同じrefを参照するテナント間でMappingを共有する
+        maps = {}
         for tenant in self.tenants.values():
-            map = Mapping.load(self.folder, self.name, tenant.ref)
+            if tenant.ref not in maps:
+                maps[tenant.ref] = Mapping.load(self.folder, self.name, tenant.ref, cache=self._cache)
+            map = maps[tenant.ref]
             expanded_args = expand_dict(tenant.data_args, settings) if settings and tenant.data_args else tenant.data_args
 
             if type(tenant.databases) is str:
                 module = importlib.import_module(tenant.databases)
                 method = getattr(module, "retrieve")
-                for tenant_map in method(map, **expanded_args):
+                # retrieve()がキャッシュ中のMappingを書き換えないよう、コピーを渡す
+                for tenant_map in method(map.detach(), **expanded_args):
                     yield tenant_map
             else:
                 for database in tenant.databases:
                     if not database.active:
                         continue
-                    clone = map.model_copy(deep=True)
-                    clone.tenant_name = database.database
-                    yield clone
+                    yield map.for_tenant(database.database)
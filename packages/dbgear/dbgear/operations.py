@@ -1,3 +1,6 @@
+import json
+import os
+from contextlib import contextmanager
 from logging import getLogger
 from datetime import datetime
 
@@ -7,33 +10,53 @@ from .dbio import table
 from .dbio import view
 from .dbio import trigger
 from .dbio import procedure
+from .dbio.instrument import ExecutionReport
 
 from .models.project import Project
 from .models.mapping import Mapping
 from .models.schema import Schema
+from .models.exceptions import DBGearDataValidationError
+from .models.datasources.loader import create_pool
+from .models.datasources.loader import load_batches
 from .utils import const
-from .utils.variable import expand_variables
+from .utils import progress as progress_module
+from .utils.profiling import phase
 
 logger = getLogger(__name__)
 
 
 class Operation:
 
-    def __init__(self, project: Project, env: str, database: str, deploy: str, backup_key: str = None, dryrun: bool = False):
+    def __init__(self, project: Project, env: str, database: str, deploy: str, backup_key: str = None, dryrun: bool = False,
+                 load_workers: int | None = None, ordered_load: bool = True, conn=None,
+                 progress: progress_module.Progress | None = None, check_batches: bool = True):
         self.project = project
         self.environ = project.envs[env]
         self.database = database
         self.dryrun = dryrun
+        # セグメント分割されたデータソースを並列に読み込む際のプロセス数と、ファイル順での投入有無
+        self.load_workers = load_workers
+        self.ordered_load = ordered_load
 
-        self.conn = engine.get_connection(self.environ.deployments[deploy])
+        # connを指定した場合はその接続を使用し、閉じるのは呼び出し元に任せる（AsyncOperation等）
+        self._owns_conn = conn is None
+        self.conn = engine.get_connection(self.environ.deployments[deploy]) if conn is None else conn
         # backup_keyが指定されている場合はそれを使用、そうでなければ現在時刻
         self.ymd = backup_key if backup_key else datetime.strftime(datetime.now(), '%Y%m%d%H%M%S')
+        # 進捗の表示（Noneの場合は表示しない）と、復元時の見込みに使うバックアップテーブルの行数・サイズ
+        self.progress = progress
+        self._backup_stats: dict[str, tuple[int, int]] = {}
+        # 投入するバッチを、SQLを送信する前にテーブル定義と照合するかどうか
+        self.check_batches = check_batches
+        # insert_data の間、データソースの並列読み込みで共有するプロセスプール
+        self._pool = None
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.conn.close()
+        if self._owns_conn:
+            self.conn.close()
 
     def _log(self, message: str):
         """Log message with [DRYRUN] prefix if in dryrun mode."""
@@ -42,6 +65,49 @@ class Operation:
         else:
             logger.info(message)
 
+    @staticmethod
+    def _select(entities, all, target):
+        # 個別指定時は対象のみを取り出し、lazyモードで対象外の定義を検証しないようにする
+        if all:
+            return entities
+        return [entities[target]] if target in entities else []
+
+    def _load_batches(self, datasources):
+        datasources = list(datasources)
+        if len(datasources) == 1:
+            # 行の範囲で分割できるデータソース（jsonl等）は、分割して並列に解析する
+            datasources = datasources[0].split(self.load_workers or os.cpu_count() or 1)
+        # 複数のデータソース（セグメント分割等）のみ、別プロセスで並列に解析する
+        workers = self.load_workers if len(datasources) > 1 else 1
+        return load_batches(datasources, max_workers=workers, ordered=self.ordered_load, executor=self._pool)
+
+    @contextmanager
+    def _loader_pool(self):
+        """データ投入の間、全データモデルの並列読み込みで1つのプロセスプールを共有する"""
+        if self._pool is not None:
+            yield self._pool
+            return
+        self._pool = create_pool(self.load_workers)
+        try:
+            yield self._pool
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    @contextmanager
+    def _track(self, phase: str, env: str, table_name: str, rows: int | None = None, size: int | None = None):
+        """テーブルに対する処理（backup / insert / restore）の進捗を表示する"""
+        if self.progress is None:
+            yield
+            return
+        target = f'{env}.{table_name}'
+        self.progress.begin(phase, target, rows, size)
+        try:
+            yield
+        finally:
+            self.progress.end(phase, target)
+
+    @phase('create_database')
     def create_database(self, map: Mapping, all: str):
         # Get charset and collation from mapping, or use defaults
         charset = map.charset or 'utf8mb4'
@@ -58,6 +124,7 @@ class Operation:
                 self._log(f'database {map.instance_name} was created.')
                 database.create(self.conn, map.instance_name, charset=charset, collation=collation, dryrun=self.dryrun)
 
+    @phase('create_table')
     def create_table(self, map: Mapping, schema: Schema, all: str, target: str, restore_only: bool = False):
         if restore_only:
             return
@@ -65,9 +132,16 @@ class Operation:
         # テーブル再作成時に一緒に再作成したトリガーを記録
         recreated_triggers = set()
 
-        for tbl in schema.tables:
-            if not all and target != tbl.table_name:
-                continue
+        tables = self._select(schema.tables, all, target)
+        stats = {}
+        if self.progress is not None:
+            # バックアップするテーブルの行数の見込み
+            stats = table.get_stats(self.conn, map.instance_name)
+            for tbl in tables:
+                if tbl.table_name in stats:
+                    self.progress.plan('backup', stats[tbl.table_name][0])
+
+        for tbl in tables:
             # テーブルが存在しない場合は作成する。
             if not table.is_exist(self.conn, map.instance_name, tbl):
                 self._log(f'table {map.instance_name}.{tbl.table_name} was created.')
@@ -75,7 +149,8 @@ class Operation:
                 continue
             # データのバックアップ
             self._log(f'backup {map.instance_name}.{tbl.table_name}')
-            table.backup(self.conn, map.instance_name, tbl, self.ymd, dryrun=self.dryrun)
+            with self._track('backup', map.instance_name, tbl.table_name, *stats.get(tbl.table_name, (None, None))):
+                table.backup(self.conn, map.instance_name, tbl, self.ymd, dryrun=self.dryrun)
             # テーブルの再作成
             self._log(f'drop & create table {map.instance_name}.{tbl.table_name}')
             table.drop(self.conn, map.instance_name, tbl, dryrun=self.dryrun)
@@ -93,9 +168,7 @@ class Operation:
                     # 再作成済みとして記録
                     recreated_triggers.add(tr.trigger_name)
 
-        for vw in schema.views:
-            if not all and target != vw.view_name:
-                continue
+        for vw in self._select(schema.views, all, target):
             # ビューが存在しない場合は作成する。
             if not view.is_exist(self.conn, map.instance_name, vw):
                 self._log(f'view {map.instance_name}.{vw.view_name} was created.')
@@ -106,12 +179,10 @@ class Operation:
                 view.drop(self.conn, map.instance_name, vw, dryrun=self.dryrun)
                 view.create(self.conn, map.instance_name, vw, dryrun=self.dryrun)
 
-        for tr in schema.triggers:
+        for tr in self._select(schema.triggers, all, target):
             # テーブル再作成時に既に処理済みのトリガーはスキップ
             if tr.trigger_name in recreated_triggers:
                 continue
-            if not all and target != tr.trigger_name:
-                continue
             # トリガーが存在しない場合は作成する。
             if not trigger.is_exist(self.conn, map.instance_name, tr):
                 self._log(f'trigger {map.instance_name}.{tr.trigger_name} was created.')
@@ -122,9 +193,7 @@ class Operation:
                 trigger.drop(self.conn, map.instance_name, tr, dryrun=self.dryrun)
                 trigger.create(self.conn, map.instance_name, tr, dryrun=self.dryrun)
 
-        for proc in schema.procedures:
-            if not all and target != proc.procedure_name:
-                continue
+        for proc in self._select(schema.procedures, all, target):
             # プロシージャが存在しない場合は作成する。
             if not procedure.is_exist(self.conn, map.instance_name, proc):
                 self._log(f'procedure {map.instance_name}.{proc.procedure_name} was created.')
@@ -135,24 +204,64 @@ class Operation:
                 procedure.drop(self.conn, map.instance_name, proc, dryrun=self.dryrun)
                 procedure.create(self.conn, map.instance_name, proc, dryrun=self.dryrun)
 
+    def validate_data(self, map: Mapping, schema: Schema, all: bool, target: str, max_workers: int | None = None):
+        """投入予定のデータをテーブル定義と照合する。エラーがあればDDLの実行前に例外を送出する"""
+        validate_data(self.environ, map, schema, all, target, max_workers, self.dryrun)
+
+    @staticmethod
+    def _report_issues(env: str, name: str, issues: list):
+        """検証の結果をログに出力し、エラーがあれば例外を送出する"""
+        from .utils.validation import ERROR
+
+        errors = [issue for issue in issues if issue.level == ERROR]
+        for issue in issues:
+            if issue.level == ERROR:
+                logger.error(f'{env}: {issue}')
+            else:
+                logger.warning(f'{env}: {issue}')
+        if errors:
+            raise DBGearDataValidationError(f'Data validation failed for {name}: {len(errors)} errors', errors)
+
+    @phase('insert_data')
     def insert_data(self, map: Mapping, schema: Schema, all: bool, target: str, no_restore: bool = False, patch_file: str = None, restore_backup: bool = False):
         if no_restore:
             # no_restore が指定されている場合は、初期データ投入もバックアップ復元もスキップ
             return
 
+        # 処理済みテーブルを記録
+        processed_tables = set()
+
+        # データ投入処理
+        with self._loader_pool():
+            for dm, tbl, datasources, rows in self._insert_plan(map, schema, all, target, patch_file):
+                # 処理済みとしてマーク
+                processed_tables.add(dm.table_name)
+
+                checker = self._batch_checker(dm, tbl)
+                with self._track('insert', map.instance_name, tbl.table_name, rows):
+                    for ds, batch in self._load_batches(datasources):
+                        self._check_batch(map, tbl, checker, ds, batch)
+                        self._insert_batch(map, tbl, ds, batch)
+                self._restore_datamodel(map, dm, tbl, target, patch_file)
+
+        self._restore_target(map, schema, target, processed_tables, patch_file, restore_backup)
+
+    def _insert_targets(self, map: Mapping, schema: Schema, all: bool, target: str):
+        """データを投入するデータモデルとテーブル定義を、投入順に返す"""
         # データ投入の順序を決定
+        datamodels = list(map.datamodels)
         if all:
             # 全体指定時は依存関係を考慮した順序でデータ投入
             from .utils.dependency import DependencyResolver
             resolver = DependencyResolver()
 
             # 依存関係の妥当性をチェック
-            warnings = resolver.validate_dependencies(map.datamodels, schema)
+            warnings = resolver.validate_dependencies(datamodels, schema)
             for warning in warnings:
                 logger.warning(warning)
 
             try:
-                ordered_datamodels = resolver.resolve_insertion_order(map.datamodels, schema)
+                ordered_datamodels = resolver.resolve_insertion_order(datamodels, schema)
             except ValueError as e:
                 logger.error(f"Failed to resolve data insertion order: {e}")
                 raise
@@ -160,12 +269,8 @@ class Operation:
             datamodels_to_process = ordered_datamodels
         else:
             # 個別指定時は従来通り
-            datamodels_to_process = map.datamodels
-
-        # 処理済みテーブルを記録
-        processed_tables = set()
+            datamodels_to_process = datamodels
 
-        # データ投入処理
         for dm in datamodels_to_process:
             if dm.sync_mode == const.SYNC_MODE_MANUAL and all:
                 # 手動モードで全てで指定されている場合には、スキップする
@@ -173,36 +278,78 @@ class Operation:
             # FIXME テーブルレイアウトが変わっている場合は、データの挿入ができない。
             if not all and target != dm.table_name:
                 continue
-            tbl = schema.tables[dm.table_name]
-
-            # 処理済みとしてマーク
-            processed_tables.add(dm.table_name)
-
-            base_settings = {**self.environ.settings}
-            for ds in dm.get_datasources(base_settings):
-                self._log(f'insert {ds.filename} to {map.instance_name}.{tbl.table_name}')
-                ds.load()
-                items = expand_variables(ds.data, ds.settings)
-                table.insert(self.conn, map.instance_name, tbl, items, dryrun=self.dryrun)
-
-            if dm.sync_mode != const.SYNC_MODE_DROP_CREATE:
-                # 同期モードがdrop_create以外の場合は、データのリストアを行う。
-                if patch_file and target == dm.table_name:
-                    # パッチファイルが指定されている場合は、パッチを実行
-                    self._execute_patch(map.instance_name, tbl.table_name, patch_file)
-                elif table.is_exist_backup(self.conn, map.instance_name, tbl, self.ymd):
-                    # sync_modeに応じてリストア処理を変更
-                    if dm.sync_mode == const.SYNC_MODE_REPLACE:
-                        # replace: バックアップで既存レコードを上書き（REPLACE INTO）
-                        self._log(f'restore with replace {map.instance_name}.{tbl.table_name}')
+            yield dm, schema.tables[dm.table_name]
+
+    def _insert_plan(self, map: Mapping, schema: Schema, all: bool, target: str, patch_file: str = None):
+        """
+        データを投入するデータモデル・テーブル定義・データソース・見込みの行数を、投入順のリストで返す
+
+        進捗を表示する場合は、投入と復元の見込みの行数を登録する。
+        """
+        settings = {**self.environ.settings}
+        plan = []
+        for dm, tbl in self._insert_targets(map, schema, all, target):
+            datasources = list(dm.get_datasources(settings, tbl))
+            rows = None
+            if self.progress is not None:
+                rows = _estimate_rows(datasources)
+                self.progress.plan('insert', rows)
+            plan.append((dm, tbl, datasources, rows))
+
+        if self.progress is not None and plan:
+            self._backup_stats = table.get_stats(self.conn, map.instance_name)
+            for dm, tbl, _, _ in plan:
+                if dm.sync_mode == const.SYNC_MODE_DROP_CREATE or (patch_file and target == dm.table_name):
+                    continue
+                stats = self._backup_stats.get(table.backup_table_name(tbl, self.ymd))
+                if stats is not None:
+                    self.progress.plan('restore', stats[0])
+        return plan
+
+    def _batch_checker(self, dm, tbl):
+        if not self.check_batches:
+            return None
+        from .utils.dependency import datamodel_key
+        from .utils.validation import BatchChecker
+        return BatchChecker(datamodel_key(dm), tbl)
+
+    @phase('check_batch')
+    def _check_batch(self, map: Mapping, tbl, checker, ds, batch):
+        """バッチをテーブル定義と照合し、エラーがあればSQLを送信する前に例外を送出する"""
+        if checker is None:
+            return
+        self._report_issues(map.instance_name, f'{map.instance_name}.{tbl.table_name}', checker.check(ds.filename, batch))
+
+    @phase('insert')
+    def _insert_batch(self, map: Mapping, tbl, ds, batch):
+        self._log(f'insert {ds.filename} to {map.instance_name}.{tbl.table_name}')
+        table.insert(self.conn, map.instance_name, tbl, batch, dryrun=self.dryrun)
+
+    @phase('restore')
+    def _restore_datamodel(self, map: Mapping, dm, tbl, target: str, patch_file: str = None):
+        """データ投入後に、同期モードに応じてバックアップから復元し、コミットする"""
+        if dm.sync_mode != const.SYNC_MODE_DROP_CREATE:
+            # 同期モードがdrop_create以外の場合は、データのリストアを行う。
+            if patch_file and target == dm.table_name:
+                # パッチファイルが指定されている場合は、パッチを実行
+                self._execute_patch(map.instance_name, tbl.table_name, patch_file)
+            elif table.is_exist_backup(self.conn, map.instance_name, tbl, self.ymd):
+                # sync_modeに応じてリストア処理を変更
+                if dm.sync_mode == const.SYNC_MODE_REPLACE:
+                    # replace: バックアップで既存レコードを上書き（REPLACE INTO）
+                    self._log(f'restore with replace {map.instance_name}.{tbl.table_name}')
+                    with self._track_restore(map, tbl):
                         table.restore_update(self.conn, map.instance_name, tbl, self.ymd, dryrun=self.dryrun)
-                    else:
-                        # manual / update_diff: バックアップから新規レコードのみ追加（INSERT IGNORE）
-                        self._log(f'restore {map.instance_name}.{tbl.table_name}')
+                else:
+                    # manual / update_diff: バックアップから新規レコードのみ追加（INSERT IGNORE）
+                    self._log(f'restore {map.instance_name}.{tbl.table_name}')
+                    with self._track_restore(map, tbl):
                         table.restore(self.conn, map.instance_name, tbl, self.ymd, dryrun=self.dryrun)
 
-            engine.commit(self.conn, dryrun=self.dryrun)
+        engine.commit(self.conn, dryrun=self.dryrun)
 
+    def _restore_target(self, map: Mapping, schema: Schema, target: str, processed_tables: set,
+                        patch_file: str = None, restore_backup: bool = False):
         # datamodelがない場合でも、targetが指定されていてpatch/restore_backupが指定されていればリストア処理を実行
         if target and target not in processed_tables and (patch_file or restore_backup):
             if target not in schema.tables:
@@ -216,10 +363,15 @@ class Operation:
             elif restore_backup and table.is_exist_backup(self.conn, map.instance_name, tbl, self.ymd):
                 # restore_backupが指定されている場合は、バックアップから復元
                 self._log(f'restore {map.instance_name}.{tbl.table_name}')
-                table.restore(self.conn, map.instance_name, tbl, self.ymd, dryrun=self.dryrun)
+                with self._track_restore(map, tbl):
+                    table.restore(self.conn, map.instance_name, tbl, self.ymd, dryrun=self.dryrun)
 
             engine.commit(self.conn, dryrun=self.dryrun)
 
+    def _track_restore(self, map: Mapping, tbl):
+        stats = self._backup_stats.get(table.backup_table_name(tbl, self.ymd), (None, None))
+        return self._track('restore', map.instance_name, tbl.table_name, *stats)
+
     def _execute_patch(self, env: str, table_name: str, patch_file: str):
         """Execute patch file for data restoration."""
         from .patch import PatchConfig, generate_patch_sql, validate_patch_config
@@ -244,7 +396,7 @@ class Operation:
             self._log(f'executing patch {patch_file} for {env}.{table_name}')
             logger.debug(f'patch SQL: {sql}')
 
-            engine.execute(self.conn, sql, dryrun=self.dryrun)
+            engine.execute(self.conn, sql, dryrun=self.dryrun, category='patch', target=f'{env}.{table_name}')
 
         except Exception as e:
             logger.error(f"Failed to execute patch {patch_file}: {e}")
@@ -276,12 +428,11 @@ class Operation:
             dm = map.datamodel(schema_name, table_name)
             if dm is not None:
                 base_settings = {**self.environ.settings}
-                for ds in dm.get_datasources(base_settings):
+                for ds, batch in self._load_batches(dm.get_datasources(base_settings, tbl)):
                     self._log(f'insert {ds.filename} to {map.instance_name}.{tbl.table_name}')
-                    ds.load()
-                    items = expand_variables(ds.data, ds.settings)
-                    table.insert(self.conn, map.instance_name, tbl, items)
+                    table.insert(self.conn, map.instance_name, tbl, batch)
 
+    @phase('recreate_indexes')
     def recreate_indexes_only(self, map: Mapping, schema: Schema, target: str):
         """Recreate indexes for the specified table only."""
         if target is None:
@@ -289,15 +440,10 @@ class Operation:
             return
 
         # Find the target table in the schema
-        tbl = None
-        for t in schema.tables:
-            if t.table_name == target:
-                tbl = t
-                break
-
-        if tbl is None:
+        if target not in schema.tables:
             logger.error(f'table {target} not found in schema')
             return
+        tbl = schema.tables[target]
 
         # Check if table exists
         if not table.is_exist(self.conn, map.instance_name, tbl):
@@ -310,21 +456,97 @@ class Operation:
         engine.commit(self.conn, dryrun=self.dryrun)
 
 
+@contextmanager
+def execution_report(dryrun: bool = False, top: int = 10, report_file: str | None = None):
+    """実行したSQLを集計し、終了時（失敗時も含む）に表示する。report_fileを指定するとJSONで保存する"""
+    if dryrun:
+        yield None
+        return
+    report = ExecutionReport()
+    engine.add_hook(report)
+    try:
+        yield report
+    finally:
+        engine.remove_hook(report)
+        print(report.format(top))
+        if report_file:
+            with open(report_file, 'w', encoding='utf-8') as f:
+                f.write(report.to_json(top))
+
+
+@contextmanager
+def progress_report(dryrun: bool = False, mode: str = 'auto', interval: float = progress_module.DEFAULT_INTERVAL):
+    """テーブルごとの処理の進捗を表示する（modeは auto / bar / log / off）。表示しない場合は None を返す"""
+    progress = None if dryrun else progress_module.create(mode, interval)
+    if progress is None:
+        yield None
+        return
+    engine.add_hook(progress)
+    try:
+        yield progress
+    finally:
+        engine.remove_hook(progress)
+        progress.close()
+
+
+@phase('validate_data')
+def validate_data(environ, map: Mapping, schema: Schema, all: bool, target: str, max_workers: int | None = None, dryrun: bool = False):
+    """
+    投入予定のデータをテーブル定義と照合する。エラーがあれば例外を送出する
+
+    データベースに接続せずに実行できるため、接続を開く前の検証に使う。
+    """
+    from .utils.validation import validate_datamodels
+
+    if all:
+        datamodels = [dm for dm in map.datamodels if dm.sync_mode != const.SYNC_MODE_MANUAL]
+    else:
+        datamodels = [dm for dm in map.datamodels if dm.table_name == target]
+    if not datamodels:
+        return
+
+    logger.info(f'{"[DRYRUN] " if dryrun else ""}validate data of {map.instance_name} ({len(datamodels)} tables)')
+    issues = validate_datamodels(datamodels, schema, {**environ.settings}, max_workers)
+    Operation._report_issues(map.instance_name, map.instance_name, issues)
+
+
 def apply(
         project, env: str, database: str, target: str, all: str, deploy: str,
         no_restore: bool = False, restore_only: bool = False, patch: str = None, backup_key: str = None,
-        index_only: bool = False, restore_backup: bool = False, dryrun: bool = False):
-    """ データベースの適用処理を行う。 CLI向け関数. """
+        index_only: bool = False, restore_backup: bool = False, dryrun: bool = False,
+        validate: str = 'full', validate_workers: int | None = None,
+        load_workers: int | None = None, ordered_load: bool = True,
+        report_top: int = 10, report_file: str | None = None,
+        progress: str = 'auto', progress_interval: float = progress_module.DEFAULT_INTERVAL):
+    """
+    データベースの適用処理を行う。 CLI向け関数.
+
+    validate は投入データの検証方法。full（既定）はデータベースに接続する前に全データソースを
+    解析して検証し、投入時にも読み込んだバッチを送信前に検証する。batch は投入時の検証のみ行い、
+    off は検証しない。
+    """
     if dryrun:
         logger.info("=== DRYRUN MODE: SQL statements will be printed but not executed ===")
 
-    with Operation(project, env, database, deploy, backup_key, dryrun=dryrun) as op:
-        for map in op.environ.databases:
-            if database is not None and map.instance_name != database:
-                continue
-
-            schema = map.build_schema(op.project.schemas, op.environ.schemas)
-
+    environ = project.envs[env]
+    targets = []
+    for map in environ.databases:
+        if database is not None and map.instance_name != database:
+            continue
+        with phase('build_schema'):
+            targets.append((map, map.build_schema(project.schemas, environ.schemas)))
+
+    # テーブルを削除・再作成する前に、接続を開かずに全データベースの投入データを検証する
+    if validate == 'full' and not index_only and not no_restore:
+        for map, schema in targets:
+            validate_data(environ, map, schema, all, target, validate_workers, dryrun)
+
+    with execution_report(dryrun, report_top, report_file), \
+            progress_report(dryrun, progress, progress_interval) as reporter, \
+            Operation(project, env, database, deploy, backup_key, dryrun=dryrun,
+                      load_workers=load_workers, ordered_load=ordered_load, progress=reporter,
+                      check_batches=validate != 'off') as op:
+        for map, schema in targets:
             # index-only mode: recreate indexes only
             if index_only:
                 op.recreate_indexes_only(map, schema, target)
@@ -333,3 +555,137 @@ def apply(
                 op.create_database(map, all)
                 op.create_table(map, schema, all, target, restore_only)
                 op.insert_data(map, schema, all, target, no_restore, patch, restore_backup)
+
+
+def _estimate_rows(datasources) -> int | None:
+    """データソースを解析せずに求めた行数の合計。1つでも求められない場合は None"""
+    total = 0
+    for ds in datasources:
+        try:
+            rows = ds.estimate_rows()
+        except Exception as e:
+            logger.debug(f'Failed to estimate rows of {ds.filename}: {e}')
+            return None
+        if rows is None:
+            return None
+        total += rows
+    return total
+
+
+def _count_rows(dm, settings: dict, exact: bool = False) -> int | None:
+    """
+    データモデルの行数。既定ではデータソースを解析せずに見積もり（estimate_rows）、
+    見積もれないデータソースのみ読み込んで数える。exact の場合はすべて読み込んで数える。
+    読み込めない場合は None
+    """
+    rows = 0
+    try:
+        for ds in dm.get_datasources(settings):
+            if not exact:
+                estimated = ds.estimate_rows()
+                if estimated is not None:
+                    rows += estimated
+                    continue
+                logger.debug(f'Cannot estimate rows of {ds.filename}; counting them')
+            ds.load()
+            rows += len(ds.data or [])
+    except Exception as e:
+        logger.warning(f'Failed to count rows of {dm.schema_name}@{dm.table_name}: {e}')
+        return None
+    return rows
+
+
+def plan(project, env: str, database: str, count_rows: bool = True, as_json: bool = False, exact: bool = False):
+    """ データ投入計画（並行投入できる段階とクリティカルパス）を表示する。 CLI向け関数. """
+    from .utils.dependency import DependencyResolver
+    from .utils.dependency import datamodel_key
+
+    environ = project.envs[env]
+    resolver = DependencyResolver()
+    result = {}
+    # 行数を数えられなかったテーブル（重みは1として扱う）
+    unknown = {}
+    for map in environ.databases:
+        if database is not None and map.instance_name != database:
+            continue
+        schema = map.build_schema(project.schemas, environ.schemas)
+        # apply --all と同様に、手動モードのテーブルは投入対象外
+        datamodels = [dm for dm in map.datamodels if dm.sync_mode != const.SYNC_MODE_MANUAL]
+        weights = None
+        if count_rows:
+            counts = {datamodel_key(dm): _count_rows(dm, {**environ.settings}, exact) for dm in datamodels}
+            weights = {key: rows for key, rows in counts.items() if rows is not None}
+            unknown[map.instance_name] = sorted(key for key, rows in counts.items() if rows is None)
+        result[map.instance_name] = resolver.resolve_insertion_plan(datamodels, schema, weights)
+
+    if as_json:
+        output = {}
+        for name, p in result.items():
+            output[name] = p.to_dict()
+            if unknown.get(name):
+                output[name]['unknown_weights'] = unknown[name]
+        print(json.dumps(output, indent=2, ensure_ascii=False))
+        return
+
+    unit = 'rows' if count_rows else 'tables'
+    for name, p in result.items():
+        missing = set(unknown.get(name, ()))
+
+        def weight(dm):
+            key = datamodel_key(dm)
+            return '?' if key in missing else p.weights[key]
+
+        print(f'{name}: {sum(len(w) for w in p.waves)} tables in {len(p.waves)} waves, {p.total_weight} {unit}')
+        if missing:
+            print(f'  rows of {len(missing)} tables are unknown and counted as 1: {", ".join(sorted(missing))}')
+        for i, wave in enumerate(p.waves, 1):
+            tables = ', '.join(f'{datamodel_key(dm)} ({weight(dm)})' for dm in wave)
+            print(f'  wave {i}: {tables}')
+        if p.critical_path:
+            share = p.critical_path_weight / p.total_weight * 100 if p.total_weight else 100.0
+            print(f'  critical path: {" -> ".join(datamodel_key(dm) for dm in p.critical_path)}')
+            print(f'  critical path weight: {p.critical_path_weight} {unit} ({share:.1f}% of total)')
+
+
+def compile_data(project, env: str, database: str = None, target: str = None):
+    """ YAML形式のデータファイルをコンパイルし、apply時の解析を省く。 CLI向け関数. """
+    from .utils.validation import check_batch, ERROR
+    from .utils.dependency import datamodel_key
+
+    environ = project.envs[env]
+    counts = {'compiled': 0, 'up to date': 0, 'skipped': 0}
+    seen = set()
+    for map in environ.databases:
+        if database is not None and map.instance_name != database:
+            continue
+        schema = map.build_schema(project.schemas, environ.schemas)
+        for dm in map.datamodels:
+            if dm.data_type != const.DATATYPE_YAML or (target is not None and dm.table_name != target):
+                continue
+            label = datamodel_key(dm)
+            if dm.table_name not in schema.tables:
+                logger.warning(f'{map.instance_name}: {label}: table is not defined in the schema')
+                continue
+            tbl = schema.tables[dm.table_name]
+            for ds in dm.get_datasources({**environ.settings}, tbl):
+                # テナント等で同じファイルを参照する場合は一度だけコンパイルする
+                if ds.path in seen:
+                    continue
+                seen.add(ds.path)
+                ds.load()
+                if ds.from_compiled:
+                    counts['up to date'] += 1
+                    continue
+                # テーブル定義と照合し、エラーのあるデータはコンパイルしない（apply時にYAMLから検証される）
+                batch = ds.batch
+                batch.expand_variables(ds.settings)
+                errors = [i for i in check_batch(label, ds.filename, tbl, batch) if i.level == ERROR]
+                for issue in errors:
+                    logger.error(f'{map.instance_name}: {issue}')
+                if not errors and ds.compile():
+                    logger.info(f'compiled {ds.filename}')
+                    counts['compiled'] += 1
+                else:
+                    logger.warning(f'skipped {ds.filename}')
+                    counts['skipped'] += 1
+    print(', '.join(f'{count} {state}' for state, count in counts.items()))
@@ -4,6 +4,93 @@ from logging import getLogger
 logger = getLogger(__name__)
 
 
+class _OnlineOrder:
+    """
+    辺を追加しながらトポロジカル順序を維持する（Pearce-Kellyの動的トポロジカルソート）
+
+    辺 u -> v は「u を v より先に投入する」ことを表す。順序に反する辺が
+    追加された場合のみ、影響範囲のノードを探索して並べ替える。
+    """
+
+    def __init__(self, order):
+        self.ord = {node: i for i, node in enumerate(order)}
+        self.succ = {node: [] for node in self.ord}
+        self.pred = {node: [] for node in self.ord}
+
+    def add_edge(self, u, v) -> bool:
+        """辺 u -> v を追加する。循環する場合は追加せずFalseを返す"""
+        if u == v:
+            return False
+        lower, upper = self.ord[v], self.ord[u]
+        if lower < upper:
+            forward = self._reach(v, self.succ, lambda n: self.ord[n] <= upper, stop=u)
+            if forward is None:
+                return False
+            backward = self._reach(u, self.pred, lambda n: self.ord[n] >= lower)
+            self._reorder(backward, forward)
+        self.succ[u].append(v)
+        self.pred[v].append(u)
+        return True
+
+    def _reach(self, start, edges, within, stop=None):
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for nxt in edges[node]:
+                if nxt == stop:
+                    return None
+                if nxt not in visited and within(nxt):
+                    visited.add(nxt)
+                    stack.append(nxt)
+        return visited
+
+    def _reorder(self, backward, forward):
+        # 影響範囲の順序番号を、先行側(backward)→後続側(forward)の順に振り直す
+        nodes = sorted(backward, key=self.ord.__getitem__) + sorted(forward, key=self.ord.__getitem__)
+        slots = sorted(self.ord[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            self.ord[node] = slot
+
+
+def datamodel_key(dm) -> str:
+    return f"{dm.schema_name}@{dm.table_name}"
+
+
+class InsertionPlan:
+    """
+    同時に投入できるテーブルをまとめた段階（wave）単位のデータ投入計画
+
+    各waveのテーブルは互いに依存せず、前のwaveまでの投入が終われば並行して投入できる。
+    クリティカルパスは重み（行数）の合計が最大となる依存の連鎖で、並行投入しても
+    短縮できない所要時間の目安となる。
+    """
+
+    def __init__(self, waves, weights, critical_path):
+        self.waves = waves
+        self.weights = weights
+        self.critical_path = critical_path
+
+    @property
+    def total_weight(self) -> int:
+        return sum(self.weights.values())
+
+    @property
+    def critical_path_weight(self) -> int:
+        return sum(self.weights[datamodel_key(dm)] for dm in self.critical_path)
+
+    def to_dict(self) -> dict:
+        return {
+            "waves": [
+                [{"table": datamodel_key(dm), "weight": self.weights[datamodel_key(dm)]} for dm in wave]
+                for wave in self.waves
+            ],
+            "total_weight": self.total_weight,
+            "critical_path": [datamodel_key(dm) for dm in self.critical_path],
+            "critical_path_weight": self.critical_path_weight,
+        }
+
+
 class DependencyResolver:
     """データ投入時の依存関係を解決するためのクラス"""
 
@@ -25,6 +112,79 @@ class DependencyResolver:
         Raises:
             ValueError: 明示的依存関係で循環依存が検出された場合
         """
+        datamodel_map, combined_dependencies, ignored_fks = self._combine_dependencies(datamodels, schema)
+
+        # Phase 5: 最終的な順序を解決
+        try:
+            ts = TopologicalSorter(combined_dependencies)
+            ordered_keys = list(ts.static_order())
+
+            # DataModelオブジェクトの順序で返す
+            result = [datamodel_map[key] for key in ordered_keys if key in datamodel_map]
+
+            logger.info(f"Resolved insertion order: {[f'{dm.schema_name}@{dm.table_name}' for dm in result]}")
+            if ignored_fks:
+                logger.info(f"Ignored {len(ignored_fks)} FK dependencies to avoid cycles")
+
+            return result
+
+        except CycleError as e:
+            # ここには到達しないはずだが、念のため
+            logger.error(f"Unexpected circular dependency detected: {e}")
+            raise ValueError(f"Circular dependency detected: {e}")
+
+    def resolve_insertion_plan(self, datamodels, schema, weights=None):
+        """
+        DataModelリストを依存関係の段階（wave）ごとにまとめ、クリティカルパスを求める
+
+        依存関係の扱いは resolve_insertion_order と同じ。各テーブルは依存先のうち
+        最も後の段階の次の段階に配置される。
+
+        Args:
+            datamodels: DataModelのイテラブル
+            schema: Schema オブジェクト
+            weights: "schema@table" をキーとした重み（行数など）。未指定のテーブルは1
+
+        Returns:
+            InsertionPlan: 段階ごとのDataModelとクリティカルパス
+
+        Raises:
+            ValueError: 明示的依存関係で循環依存が検出された場合
+        """
+        datamodel_map, combined_dependencies, _ = self._combine_dependencies(datamodels, schema)
+        weights = {key: (weights or {}).get(key, 1) for key in datamodel_map}
+
+        levels = {}
+        # クリティカルパス: 各テーブルまでの重みの最大値と、その直前のテーブル
+        distance = {}
+        previous = {}
+        for key in TopologicalSorter(combined_dependencies).static_order():
+            deps = combined_dependencies[key]
+            levels[key] = max((levels[dep] + 1 for dep in deps), default=0)
+            heaviest = max(sorted(deps), key=distance.__getitem__, default=None)
+            previous[key] = heaviest
+            distance[key] = weights[key] + (distance[heaviest] if heaviest is not None else 0)
+
+        waves = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+        for key in sorted(levels):
+            waves[levels[key]].append(datamodel_map[key])
+
+        critical_path = []
+        key = max(sorted(distance), key=distance.__getitem__, default=None)
+        while key is not None:
+            critical_path.append(datamodel_map[key])
+            key = previous[key]
+        critical_path.reverse()
+
+        return InsertionPlan(waves, weights, critical_path)
+
+    def _combine_dependencies(self, datamodels, schema):
+        """
+        明示的依存関係とFK依存関係を統合する
+
+        Returns:
+            tuple: (キーからDataModelへの辞書, 統合した依存関係, 無視したFKのリスト)
+        """
         # DataModelをリストに変換し、キーマップを作成
         datamodels_list = list(datamodels)
         datamodel_map = {}
@@ -37,7 +197,7 @@ class DependencyResolver:
             key = f"{dm.schema_name}@{dm.table_name}"
             datamodel_map[key] = dm
             explicit_dependencies[key] = set()
-            fk_dependencies[key] = set()
+            fk_dependencies[key] = []
 
         # Phase 1: 明示的依存関係を収集
         for dm in datamodels_list:
@@ -45,15 +205,14 @@ class DependencyResolver:
 
             for dep in dm.dependencies:
                 # 同じデータセット内にある依存関係のみ追加
-                if any(f"{target_dm.schema_name}@{target_dm.table_name}" == dep
-                      for target_dm in datamodels_list):
+                if dep in datamodel_map:
                     explicit_dependencies[key].add(dep)
                     logger.debug(f"Explicit dependency: {key} -> {dep}")
 
         # Phase 2: 明示的依存関係で循環チェック（循環があればエラー）
         try:
             ts_explicit = TopologicalSorter(explicit_dependencies)
-            list(ts_explicit.static_order())
+            explicit_order = list(ts_explicit.static_order())
             logger.info("Explicit dependencies validation passed (no cycles)")
         except CycleError as e:
             logger.error(f"Circular dependency detected in explicit dependencies: {e}")
@@ -74,52 +233,30 @@ class DependencyResolver:
                         continue
 
                     # 同じデータセット内にある依存関係のみ追加
-                    if any(target_dm.schema_name == relation.target.schema_name and
-                          target_dm.table_name == relation.target.table_name
-                          for target_dm in datamodels_list):
-                        fk_dependencies[key].add(target_key)
+                    if target_key in datamodel_map and target_key not in fk_dependencies[key]:
+                        fk_dependencies[key].append(target_key)
                         logger.debug(f"FK dependency candidate: {key} -> {target_key}")
 
         # Phase 4: FK依存関係を明示的依存関係にマージ（循環を引き起こすFKは無視）
+        # 明示的依存関係の順序を起点に、FKを1本ずつ追加しながら循環を検出する
         combined_dependencies = {k: v.copy() for k, v in explicit_dependencies.items()}
         ignored_fks = []
+        order = _OnlineOrder(explicit_order)
+        for key, deps in explicit_dependencies.items():
+            for dep in deps:
+                order.add_edge(dep, key)
 
         for key, fk_deps in fk_dependencies.items():
             for fk_dep in fk_deps:
-                # FK依存関係を試しに追加
-                test_dependencies = {k: v.copy() for k, v in combined_dependencies.items()}
-                test_dependencies[key].add(fk_dep)
-
-                try:
-                    # 循環チェック
-                    ts_test = TopologicalSorter(test_dependencies)
-                    list(ts_test.static_order())
-                    # 循環しなければ正式に追加
+                if order.add_edge(fk_dep, key):
                     combined_dependencies[key].add(fk_dep)
                     logger.debug(f"FK dependency added: {key} -> {fk_dep}")
-                except CycleError:
+                else:
                     # 循環するFKは無視（警告のみ）
                     ignored_fks.append((key, fk_dep))
                     logger.warning(f"Ignoring FK dependency (would cause cycle): {key} -> {fk_dep}")
 
-        # Phase 5: 最終的な順序を解決
-        try:
-            ts = TopologicalSorter(combined_dependencies)
-            ordered_keys = list(ts.static_order())
-
-            # DataModelオブジェクトの順序で返す
-            result = [datamodel_map[key] for key in ordered_keys if key in datamodel_map]
-
-            logger.info(f"Resolved insertion order: {[f'{dm.schema_name}@{dm.table_name}' for dm in result]}")
-            if ignored_fks:
-                logger.info(f"Ignored {len(ignored_fks)} FK dependencies to avoid cycles")
-
-            return result
-
-        except CycleError as e:
-            # ここには到達しないはずだが、念のため
-            logger.error(f"Unexpected circular dependency detected: {e}")
-            raise ValueError(f"Circular dependency detected: {e}")
+        return datamodel_map, combined_dependencies, ignored_fks
 
     def validate_dependencies(self, datamodels, schema):
         """
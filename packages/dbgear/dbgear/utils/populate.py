@@ -2,7 +2,10 @@ import re
 import copy
 from typing import Dict, Any, List
 
+from .profiling import phase
 
+
+@phase('auto_populate_from_keys')
 def auto_populate_from_keys(data: Dict[str, Any], mapping: Dict[str, str]) -> Dict[str, Any]:
     """
     階層データのキーから値を抽出して、指定されたパスに自動補完する関数
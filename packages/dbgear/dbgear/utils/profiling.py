@@ -0,0 +1,260 @@
+"""
+フェーズ単位のプロファイリング（dbgear --profile）
+
+処理の区切り（プロジェクトの読み込み、スキーマの検証、データソースの解析等）を
+phase() で囲むと、有効時にフェーズごとの経過時間・CPU時間を入れ子で集計する。
+無効時（既定）は何もしない。
+
+    with phase('schema.load'):
+        ...
+
+    @phase('schema.populate')
+    def populate(...):
+        ...
+
+オプションで cProfile による関数単位の計測と、tracemalloc によるフェーズごとの
+メモリ使用量のピークを記録できる。結果は speedscope（https://www.speedscope.app/）の
+evented形式で保存でき、フレームグラフとして表示できる。
+別プロセス（データソースの並列解析等）で実行された処理は集計に含まれない。
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import ContextDecorator
+from typing import Any
+
+
+class _Node:
+    __slots__ = ('name', 'calls', 'wall', 'cpu', 'peak', 'children')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak: int | None = None
+        self.children: dict[str, '_Node'] = {}
+
+    def child(self, name: str) -> '_Node':
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = _Node(name)
+        return node
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {'name': self.name, 'calls': self.calls, 'wall': round(self.wall, 6), 'cpu': round(self.cpu, 6)}
+        if self.peak is not None:
+            data['peak_memory'] = self.peak
+        if self.children:
+            data['children'] = [child.to_dict() for child in self.children.values()]
+        return data
+
+
+class _Frame:
+    __slots__ = ('node', 'wall', 'cpu', 'memory', 'peak')
+
+    def __init__(self, node: _Node, wall: float, cpu: float, memory: int | None):
+        self.node = node
+        self.wall = wall
+        self.cpu = cpu
+        # フェーズ開始時のメモリ使用量と、その後のピーク
+        self.memory = memory
+        self.peak = memory
+
+
+class Profiler:
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self, cprofile: bool = False, memory: bool = False) -> None:
+        self.root = _Node('total')
+        self.frames: list[dict] = []
+        self._frame_index: dict[str, int] = {}
+        # スレッドごとのspeedscopeのイベント（開始・終了）
+        self.events: dict[str, list[tuple[str, int, float]]] = {}
+        self._local = threading.local()
+        self.memory = memory
+        # フェーズの外も含めた、メモリ使用量のピーク
+        self._peak = 0
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        self.enabled = True
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def stop(self) -> 'ProfileReport':
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self.enabled = False
+        self.root.calls = 1
+        self.root.wall = time.perf_counter() - self.started
+        self.root.cpu = time.process_time() - self.started_cpu
+        if self.memory:
+            self.root.peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        return ProfileReport(self.root, self.frames, self.events, self.cprofile)
+
+    def _stack(self) -> list[_Frame]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self, name: str) -> None:
+        stack = self._stack()
+        main = threading.current_thread() is threading.main_thread()
+        memory = None
+        if self.memory and main:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            else:
+                self._peak = max(self._peak, peak)
+            tracemalloc.reset_peak()
+            memory = current
+        with self._lock:
+            parent = stack[-1].node if stack else self.root
+            node = parent.child(name)
+            self._event('O', name)
+        stack.append(_Frame(node, time.perf_counter(), time.thread_time(), memory))
+
+    def exit(self) -> None:
+        stack = self._stack()
+        if not stack:
+            return
+        frame = stack.pop()
+        wall = time.perf_counter() - frame.wall
+        cpu = time.thread_time() - frame.cpu
+        peak = None
+        if frame.memory is not None:
+            frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            peak = frame.peak - frame.memory
+            if stack and stack[-1].peak is not None:
+                stack[-1].peak = max(stack[-1].peak, frame.peak)
+            elif not stack:
+                self._peak = max(self._peak, frame.peak)
+        with self._lock:
+            node = frame.node
+            node.calls += 1
+            node.wall += wall
+            node.cpu += cpu
+            if peak is not None:
+                node.peak = max(node.peak or 0, peak)
+            self._event('C', node.name)
+
+    def _event(self, kind: str, name: str) -> None:
+        index = self._frame_index.get(name)
+        if index is None:
+            index = self._frame_index[name] = len(self.frames)
+            self.frames.append({'name': name})
+        thread = threading.current_thread().name
+        self.events.setdefault(thread, []).append((kind, index, time.perf_counter() - self.started))
+
+
+profiler = Profiler()
+
+
+class phase(ContextDecorator):
+    """フェーズを計測する（withまたはデコレーターとして使う）。プロファイリングが無効であれば何もしない"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        if profiler.enabled:
+            profiler.enter(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if profiler.enabled:
+            profiler.exit()
+        return False
+
+
+class ProfileReport:
+
+    def __init__(self, root: _Node, frames: list[dict], events: dict, cprofile: cProfile.Profile | None):
+        self.root = root
+        self.frames = frames
+        self.events = events
+        self.cprofile = cprofile
+
+    def functions(self, top: int = 20) -> list[dict[str, Any]]:
+        """cProfileで計測した、累積時間の長い関数"""
+        if self.cprofile is None:
+            return []
+        stats = pstats.Stats(self.cprofile, stream=io.StringIO())
+        rows = []
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({'function': f'{filename}:{line}({name})', 'calls': calls,
+                         'tottime': round(tottime, 6), 'cumtime': round(cumtime, 6)})
+        rows.sort(key=lambda row: row['cumtime'], reverse=True)
+        return rows[:top]
+
+    def to_dict(self, top: int = 20) -> dict[str, Any]:
+        data = {'phases': self.root.to_dict()}
+        if self.cprofile is not None:
+            data['functions'] = self.functions(top)
+        return data
+
+    def format(self, top: int = 20) -> str:
+        lines = [f'{"phase":<48} {"calls":>7} {"wall (s)":>10} {"cpu (s)":>10}'
+                 + (f' {"peak (MB)":>10}' if self.root.peak is not None else '')]
+
+        def walk(node: _Node, depth: int):
+            name = '  ' * depth + node.name
+            line = f'{name:<48} {node.calls:>7} {node.wall:>10.3f} {node.cpu:>10.3f}'
+            if self.root.peak is not None:
+                line += f' {(node.peak or 0) / 1024 / 1024:>10.1f}'
+            lines.append(line)
+            for child in node.children.values():
+                walk(child, depth + 1)
+
+        walk(self.root, 0)
+        functions = self.functions(top)
+        if functions:
+            lines.append(f'{"cumtime":>10} {"tottime":>10} {"calls":>9}  function')
+            for row in functions:
+                lines.append(f'{row["cumtime"]:>10.3f} {row["tottime"]:>10.3f} {row["calls"]:>9}  {row["function"]}')
+        return '\n'.join(lines)
+
+    def write_json(self, path: str, top: int = 20) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(top), f, indent=2, ensure_ascii=False)
+
+    def write_speedscope(self, path: str) -> None:
+        """フェーズの開始・終了をspeedscopeのevented形式で保存する（スレッドごとに1つのプロファイル）"""
+        profiles = []
+        for thread, events in self.events.items():
+            profiles.append({
+                'type': 'evented',
+                'name': thread,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': max(self.root.wall, events[-1][2] if events else 0),
+                'events': [{'type': kind, 'frame': frame, 'at': at} for kind, frame, at in events],
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                '$schema': 'https://www.speedscope.app/file-format-schema.json',
+                'name': 'dbgear',
+                'exporter': 'dbgear',
+                'shared': {'frames': self.frames},
+                'profiles': profiles,
+            }, f)
+
+    def write_pstats(self, path: str) -> None:
+        """cProfileの結果を pstats 形式で保存する（snakeviz等で表示できる）"""
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(path)
@@ -0,0 +1,316 @@
+"""
+適用処理の進捗（行数・バイト数・スループット・残り時間）の表示
+
+Operation がテーブルごとの処理（backup / insert / restore）の開始と終了を通知し、
+処理した行数・バイト数は engine.add_hook() で受け取るSQLの実行結果から数える。
+見込みの行数は、投入はデータソースの行数（estimate_rows）、バックアップと復元は
+information_schema.tables の行数（InnoDBでは概算）を使う。
+
+端末では最下行のバーを書き換えて表示し、それ以外（ログファイルへのリダイレクト等）では
+一定の間隔で進捗をログに出力する。時間のかかるSQLの完了を待つ間も経過時間や残り時間が
+更新されるよう、create() で生成した Progress は別スレッドから定期的に表示を更新する。
+"""
+
+import logging
+import shutil
+import sys
+import threading
+import time
+from logging import getLogger
+
+from ..dbio.instrument import Statement
+
+logger = getLogger(__name__)
+
+PHASES = ('backup', 'insert', 'restore')
+
+# ログに出力する間隔（秒）
+DEFAULT_INTERVAL = 30.0
+# バーを書き換える間隔（秒）
+_BAR_INTERVAL = 0.2
+# SQLの実行を待つ間に表示を更新する間隔の上限（秒）
+_TICK_INTERVAL = 1.0
+_BAR_WIDTH = 20
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f'{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}'
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} TB'
+
+
+class Task:
+    """1つのテーブルに対する処理"""
+
+    def __init__(self, phase: str, target: str, total: int | None, size: int | None):
+        self.phase = phase
+        self.target = target
+        self.total = total
+        # バックアップ・復元で処理するデータのサイズ（終了時に処理したバイト数とする）
+        self.size = size
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    def elapsed(self, now: float) -> float:
+        return now - self.started
+
+    def planned(self) -> int:
+        """全体の進捗に計上する行数（見込みを超えた分は数えない）"""
+        return self.rows if self.total is None else min(self.rows, self.total)
+
+
+class _Phase:
+    """フェーズ全体の見込みと実績"""
+
+    def __init__(self):
+        self.total = 0
+        # 見込みの行数が分からないテーブルを含むかどうか
+        self.unknown = False
+        self.rows = 0
+        self.bytes = 0
+        # 終了したテーブルの、全体の進捗に計上する行数
+        self.done = 0
+        self.started: float | None = None
+        self.seconds = 0.0
+
+    def add(self, rows: int | None) -> None:
+        if rows is None:
+            self.unknown = True
+        else:
+            self.total += rows
+
+
+class Progress:
+    """
+    テーブルごとの処理の進捗を集計して表示する
+
+    engine.add_hook(progress) で登録し、Operation から begin() / end() を呼び出す。
+    start() を呼び出すと、close() までの間は別スレッドからも一定の間隔で表示を更新する。
+    """
+
+    def __init__(self, renderer: 'BarRenderer | LogRenderer'):
+        self.renderer = renderer
+        self.phases: dict[str, _Phase] = {}
+        self.tasks: dict[tuple[str, str], Task] = {}
+        self.current: Task | None = None
+        # 定期的に表示を更新するスレッドと、SQLの通知との排他
+        self._lock = threading.Lock()
+        self._ticker: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """SQLの実行を待つ間も一定の間隔で表示を更新するスレッドを開始する（close() で停止する）"""
+        if self._ticker is not None:
+            return
+        interval = min(self.renderer.interval, _TICK_INTERVAL)
+        self._ticker = threading.Thread(target=self._tick, args=(interval,), name='dbgear-progress', daemon=True)
+        self._ticker.start()
+
+    def _tick(self, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            self.refresh()
+
+    def refresh(self) -> None:
+        """処理中のテーブルがあれば表示を更新する（出力の間隔は renderer に従う）"""
+        with self._lock:
+            if self.current is not None:
+                self._render()
+
+    def _phase(self, phase: str) -> _Phase:
+        state = self.phases.get(phase)
+        if state is None:
+            state = self.phases[phase] = _Phase()
+        return state
+
+    def plan(self, phase: str, rows: int | None) -> None:
+        """これから処理するテーブルの見込みの行数を加える（分からない場合は None）"""
+        self._phase(phase).add(rows)
+
+    def begin(self, phase: str, target: str, rows: int | None = None, size: int | None = None) -> None:
+        task = Task(phase, target, rows, size)
+        with self._lock:
+            state = self._phase(phase)
+            if state.started is None:
+                state.started = task.started
+            self.tasks[(phase, target)] = task
+            self.current = task
+            self._render(force=True)
+
+    def end(self, phase: str, target: str) -> None:
+        with self._lock:
+            task = self.tasks.pop((phase, target), None)
+            if task is None:
+                return
+            state = self._phase(phase)
+            if task.size is not None:
+                task.bytes = task.size
+                state.bytes += task.size
+            state.done += task.total if task.total is not None else task.rows
+            state.seconds = time.perf_counter() - state.started
+            if self.current is task:
+                self.current = next(reversed(self.tasks.values()), None)
+            self._render(force=True)
+
+    def __call__(self, statement: Statement) -> None:
+        task = self.tasks.get((statement.phase, statement.target))
+        if task is None:
+            return
+        rows = max(statement.rows, 0)
+        with self._lock:
+            task.rows += rows
+            state = self._phase(task.phase)
+            state.rows += rows
+            if task.size is None:
+                # 投入では送信したデータのサイズを数える
+                task.bytes += statement.bytes
+                state.bytes += statement.bytes
+            self.current = task
+            self._render()
+
+    def _render(self, force: bool = False) -> None:
+        self.renderer.update(self.line, force)
+
+    @property
+    def line(self) -> str:
+        now = time.perf_counter()
+        parts = []
+        task = self.current
+        if task is not None:
+            elapsed = task.elapsed(now)
+            text = f'{task.phase} {task.target} {task.rows:,}'
+            if task.total:
+                text += f'/{task.total:,} rows ({min(task.rows / task.total, 1.0):.0%})'
+            else:
+                text += ' rows'
+            if elapsed > 0 and task.rows:
+                text += f' {task.rows / elapsed:,.0f} rows/s'
+                if task.size is None:
+                    text += f' {format_bytes(task.bytes / elapsed)}/s'
+                if task.total and task.rows < task.total:
+                    text += f' ETA {format_duration((task.total - task.rows) * elapsed / task.rows)}'
+            parts.append(text)
+            overall = self._overall(task.phase, now)
+            if overall:
+                parts.append(overall)
+        return ' | '.join(parts)
+
+    def _overall(self, phase: str, now: float) -> str | None:
+        state = self.phases.get(phase)
+        if state is None or state.unknown or not state.total:
+            return None
+        done = state.done + sum(task.planned() for task in self.tasks.values() if task.phase == phase)
+        ratio = min(done / state.total, 1.0)
+        text = f'{phase} total {done:,}/{state.total:,} rows ({ratio:.0%})'
+        elapsed = now - state.started
+        if done and elapsed > 0 and done < state.total:
+            text += f' ETA {format_duration((state.total - done) * elapsed / done)}'
+        bar = int(ratio * _BAR_WIDTH)
+        return f'[{"#" * bar}{"." * (_BAR_WIDTH - bar)}] {text}'
+
+    def summary(self) -> list[str]:
+        lines = []
+        for phase in PHASES:
+            state = self.phases.get(phase)
+            if state is None or state.started is None:
+                continue
+            rate = f', {state.rows / state.seconds:,.0f} rows/s, {format_bytes(state.bytes / state.seconds)}/s' if state.seconds else ''
+            lines.append(f'{phase}: {state.rows:,} rows, {format_bytes(state.bytes)} in {format_duration(state.seconds)}{rate}')
+        return lines
+
+    def close(self) -> None:
+        if self._ticker is not None:
+            self._stopped.set()
+            self._ticker.join()
+            self._ticker = None
+        self.renderer.close()
+        for line in self.summary():
+            logger.info(line)
+
+
+class BarRenderer(logging.Filter):
+    """
+    端末の最下行に進捗を書き換えて表示する
+
+    ログの出力と重ならないよう、ルートロガーのハンドラーの出力前にバーを消す。
+    """
+
+    def __init__(self, stream=None, interval: float = _BAR_INTERVAL):
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+        self._last = 0.0
+        self._shown = False
+        self._handlers = list(logging.getLogger().handlers)
+        for handler in self._handlers:
+            handler.addFilter(self)
+
+    def filter(self, record) -> bool:
+        self.clear()
+        return True
+
+    def update(self, line: str, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        width = shutil.get_terminal_size().columns - 1
+        self.stream.write(f'\r\x1b[K{line[:width]}')
+        self.stream.flush()
+        self._shown = True
+
+    def clear(self) -> None:
+        if self._shown:
+            self.stream.write('\r\x1b[K')
+            self.stream.flush()
+            self._shown = False
+            # ログの出力後は、次の更新ですぐに書き直す
+            self._last = 0.0
+
+    def close(self) -> None:
+        self.clear()
+        for handler in self._handlers:
+            handler.removeFilter(self)
+
+
+class LogRenderer:
+    """一定の間隔で進捗をログに出力する"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self._last = time.perf_counter()
+
+    def update(self, line: str, force: bool = False) -> None:
+        # テーブルの開始・終了時も、前回の出力から間隔が空いていなければ出力しない
+        now = time.perf_counter()
+        if not line or now - self._last < self.interval:
+            return
+        self._last = now
+        logger.info(line)
+
+    def close(self) -> None:
+        pass
+
+
+def create(mode: str = 'auto', interval: float = DEFAULT_INTERVAL, stream=None) -> Progress | None:
+    """
+    表示方法（auto / bar / log / off）に応じた、表示の定期更新を開始した Progress を返す。off の場合は None
+
+    auto は出力先（既定は標準エラー出力）が端末であればバー、そうでなければログに出力する。
+    """
+    if mode == 'off':
+        return None
+    stream = stream if stream is not None else sys.stderr
+    if mode == 'bar' or (mode == 'auto' and stream.isatty()):
+        reporter = Progress(BarRenderer(stream))
+    else:
+        reporter = Progress(LogRenderer(interval))
+    reporter.start()
+    return reporter
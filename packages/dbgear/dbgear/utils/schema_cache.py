@@ -0,0 +1,61 @@
+"""Local cache of schema definition data that has already passed validation.
+
+The cached data is validated again when it is loaded; only YAML parsing and
+key population are skipped.
+
+Entries are keyed by the source file's content hash (plus the dbgear and
+marshal versions), so an edited source or an upgraded package never hits
+a stale entry.
+"""
+
+import hashlib
+import marshal
+import os
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+def _package_version() -> str:
+    try:
+        return version('dbgear')
+    except PackageNotFoundError:
+        return 'dev'
+
+
+def cache_path(cache_dir: str, filename: str, content: bytes) -> str:
+    digest = hashlib.sha256(content)
+    digest.update(f'{_package_version()}:{marshal.version}'.encode())
+    stem = os.path.basename(filename)
+    return os.path.join(cache_dir, f'{stem}.{digest.hexdigest()[:32]}.bin')
+
+
+def read(cache_dir: str, filename: str, content: bytes):
+    """Return the cached data for ``content`` or None."""
+    path = cache_path(cache_dir, filename, content)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return marshal.load(f)
+    except (EOFError, ValueError, TypeError) as e:
+        logger.warning(f'Ignoring broken cache {path}: {e}')
+        return None
+
+
+def write(cache_dir: str, filename: str, content: bytes, data) -> None:
+    """Store validated ``data`` for ``content``; unsupported values are skipped."""
+    try:
+        payload = marshal.dumps(data)
+    except ValueError:
+        # YAMLの日付型などmarshal非対応の値を含む場合はキャッシュしない
+        logger.debug(f'{filename} contains values that cannot be cached')
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(cache_dir, filename, content)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, path)
@@ -0,0 +1,383 @@
+"""
+データセットの検証
+
+validate_datamodels は、DDLを実行する前に投入予定の全データソースをテーブル定義と
+照合する（apply --validate）。列の過不足、NOT NULL、列型への変換可否、主キーの一意性、
+読み込み対象内での外部キーの存在を1回の走査で確認し、ファイル単位で並列に処理する。
+データソースを投入とは別に解析するため、その分の時間がかかる。
+
+BatchChecker は、投入時に読み込んだバッチを、SQLを送信する前にテーブル定義と照合する
+（apply の既定）。解析済みのバッチを使うため追加の解析は不要だが、テーブルをまたぐ
+外部キーは確認しない。
+"""
+
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from decimal import Decimal
+from decimal import InvalidOperation
+from logging import getLogger
+from typing import NamedTuple
+
+from .const import SYNC_MODE_DROP_CREATE
+from .dependency import datamodel_key
+from ..models.column import Column
+from ..models.column_type import DECIMAL_TYPES
+from ..models.column_type import FLOAT_TYPES
+from ..models.column_type import INTEGER_TYPES
+from ..models.datasources.batch import ColumnBatch
+from ..models.datasources.batch import is_sql_function
+from ..models.table import Table
+
+logger = getLogger(__name__)
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# 問題のある行番号は先頭からこの件数まで保持する
+MAX_REPORTED_ROWS = 5
+
+_DATE_TYPES = {'DATE', 'DATETIME', 'TIMESTAMP'}
+_LENGTH_TYPES = {'CHAR', 'VARCHAR', 'BINARY', 'VARBINARY'}
+
+_INTEGER_PATTERN = re.compile(r'^\s*[+-]?\d+\s*$')
+_DATE_PATTERN = re.compile(r'^\d{4}[-/]\d{1,2}[-/]\d{1,2}([ T]\d{1,2}:\d{1,2}(:\d{1,2}(\.\d+)?)?)?$')
+_TIME_PATTERN = re.compile(r'^-?\d+:\d{1,2}(:\d{1,2}(\.\d+)?)?$')
+
+
+class DataIssue(NamedTuple):
+    level: str
+    table: str
+    filename: str | None
+    column: str | None
+    message: str
+    rows: tuple[int, ...] = ()
+    count: int = 0
+
+    def __str__(self) -> str:
+        where = self.table
+        if self.filename:
+            where += f' ({self.filename})'
+        if self.column:
+            where += f' column {self.column}'
+        text = f'{where}: {self.message}'
+        if self.count:
+            rows = ', '.join(str(row) for row in self.rows)
+            more = ', ...' if self.count > len(self.rows) else ''
+            text += f' [{self.count} rows: {rows}{more}]'
+        return text
+
+
+class SourceReport(NamedTuple):
+    issues: list[DataIssue]
+    keys: dict[tuple[str, ...], list[tuple]]
+
+
+def primary_key(table: Table) -> tuple[str, ...]:
+    """主キーの列名（primary_keyの順）"""
+    columns = sorted((c for c in table.columns if c.primary_key is not None), key=lambda c: c.primary_key)
+    return tuple(c.column_name for c in columns)
+
+
+def check_value(column: Column, value) -> str | None:
+    """値が列型に変換できるかを確認する。問題があればその内容を返す"""
+    column_type = column.column_type
+    base_type = column_type.base_type
+    if base_type in INTEGER_TYPES:
+        if isinstance(value, (bool, int)):
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return None
+        if isinstance(value, str) and _INTEGER_PATTERN.match(value):
+            return None
+        return f'not an integer for {column_type.column_type}'
+    if base_type in DECIMAL_TYPES or base_type in FLOAT_TYPES:
+        if isinstance(value, bool):
+            return None
+        try:
+            number = Decimal(value.strip() if isinstance(value, str) else str(value))
+        except (InvalidOperation, ValueError):
+            return f'not a number for {column_type.column_type}'
+        if not number.is_finite():
+            return f'not a number for {column_type.column_type}'
+        if base_type in DECIMAL_TYPES and column_type.precision and number:
+            digits = column_type.precision - (column_type.scale or 0)
+            if number.adjusted() + 1 > digits:
+                return f'out of range for {column_type.column_type}'
+        return None
+    if base_type in _DATE_TYPES:
+        if isinstance(value, (date, datetime)):
+            return None
+        if isinstance(value, str) and _DATE_PATTERN.match(value.strip()):
+            return None
+        return f'not a date for {column_type.column_type}'
+    if base_type == 'TIME':
+        if isinstance(value, (time, timedelta, datetime)):
+            return None
+        if isinstance(value, str) and _TIME_PATTERN.match(value.strip()):
+            return None
+        return f'not a time for {column_type.column_type}'
+    if base_type in _LENGTH_TYPES:
+        if column_type.length is not None and len(str(value)) > column_type.length:
+            return f'longer than {column_type.column_type}'
+        return None
+    if base_type == 'ENUM':
+        if str(value) not in column_type.get_item_values():
+            return f'not a member of {column_type.column_type}'
+        return None
+    if base_type == 'SET':
+        items = set(column_type.get_item_values())
+        if str(value) and not all(item in items for item in str(value).split(',')):
+            return f'not a member of {column_type.column_type}'
+        return None
+    if base_type == 'JSON':
+        if isinstance(value, str):
+            try:
+                json.loads(value)
+            except ValueError:
+                return 'not a valid JSON document'
+        return None
+    return None
+
+
+def _issue(level, label, filename, column, message, rows=()):
+    return DataIssue(level, label, filename, column, message, tuple(rows[:MAX_REPORTED_ROWS]), len(rows))
+
+
+def check_batch(label: str, filename: str | None, table: Table, batch: ColumnBatch) -> list[DataIssue]:
+    """1つのデータソースの内容をテーブル定義と照合する（行番号は1始まり）"""
+    issues = []
+    if len(batch) == 0:
+        return issues
+
+    insertable = [c for c in table.columns if c.expression is None]
+    for name in batch.names:
+        column = table.find_column(name)
+        if column is None:
+            issues.append(_issue(WARNING, label, filename, name, 'column is not defined in the table and is ignored'))
+        elif column.expression is not None:
+            issues.append(_issue(WARNING, label, filename, name, 'generated column value is ignored'))
+
+    for column in insertable:
+        name = column.column_name
+        if name not in batch:
+            issues.append(_issue(ERROR, label, filename, name, 'column is missing from the data'))
+            continue
+        absent = batch.missing.get(name, ())
+        if absent:
+            # 値を省略した行は、列のDEFAULTではなくNULLとして投入されてしまう
+            issues.append(_issue(ERROR, label, filename, name, 'column is missing from some rows', [i + 1 for i in absent]))
+            absent = set(absent)
+        nulls = []
+        invalid = {}
+        for row, value in enumerate(batch.columns[name], 1):
+            if value is None:
+                if not column.nullable and not column.auto_increment and row - 1 not in absent:
+                    nulls.append(row)
+                continue
+            if is_sql_function(value):
+                continue
+            message = check_value(column, value)
+            if message is not None:
+                invalid.setdefault(message, []).append(row)
+        if nulls:
+            issues.append(_issue(ERROR, label, filename, name, 'NULL in NOT NULL column', nulls))
+        for message, rows in invalid.items():
+            issues.append(_issue(ERROR, label, filename, name, message, rows))
+
+    pk = primary_key(table)
+    if pk and all(name in batch for name in pk):
+        seen = set()
+        duplicates = []
+        for row, key in enumerate(zip(*(batch.columns[name] for name in pk)), 1):
+            if any(v is None or is_sql_function(v) for v in key):
+                continue
+            key = tuple(_key_value(v) for v in key)
+            if key in seen:
+                duplicates.append(row)
+            seen.add(key)
+        if duplicates:
+            issues.append(_issue(ERROR, label, filename, ', '.join(pk), 'duplicate primary key', duplicates))
+    return issues
+
+
+def _key_value(value):
+    # データソースによって 1 / 1.0 / '1' と表現が揺れるため、整数は揃えて比較する
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and _INTEGER_PATTERN.match(value):
+        return int(value)
+    return value
+
+
+def collect_keys(batch: ColumnBatch, names: tuple[str, ...]) -> list[tuple]:
+    """指定列の値の組を行順に返す。NULLや関数定義を含む組は除く"""
+    if not all(name in batch for name in names):
+        return []
+    return [
+        tuple(_key_value(v) for v in key) for key in zip(*(batch.columns[name] for name in names))
+        if not any(v is None or is_sql_function(v) for v in key)
+    ]
+
+
+class BatchChecker:
+    """1つのテーブルに投入するバッチを、順に照合する（主キーの重複はバッチをまたいで確認する）"""
+
+    def __init__(self, label: str, table: Table):
+        self.label = label
+        self.table = table
+        self.pk = primary_key(table)
+        self._keys: set[tuple] = set()
+        self._warned: set[tuple] = set()
+
+    def check(self, filename: str | None, batch: ColumnBatch) -> list[DataIssue]:
+        """バッチの問題を返す（行番号はバッチ内の1始まり。同じ警告はテーブルごとに1度だけ返す）"""
+        issues = []
+        for issue in check_batch(self.label, filename, self.table, batch):
+            if issue.level == WARNING:
+                if (issue.column, issue.message) in self._warned:
+                    continue
+                self._warned.add((issue.column, issue.message))
+            issues.append(issue)
+        if self.pk:
+            keys = collect_keys(batch, self.pk)
+            duplicates = self._keys.intersection(keys)
+            if duplicates:
+                issues.append(_issue(
+                    ERROR, self.label, filename, ', '.join(self.pk),
+                    f'{len(duplicates)} primary keys also appear in an earlier batch'))
+            self._keys.update(keys)
+        return issues
+
+
+def check_source(label: str, table: Table, datasource, groups: list[tuple[str, ...]]) -> SourceReport:
+    """データソースを読み込んで検証する。並列実行用に例外も結果として返す"""
+    filename = None
+    try:
+        filename = datasource.filename
+        datasource.load()
+        batch = datasource.batch
+        batch.expand_variables(datasource.settings)
+    except Exception as e:
+        return SourceReport([_issue(ERROR, label, filename, None, f'failed to load: {e}')], {})
+    return SourceReport(
+        check_batch(label, filename, table, batch),
+        {names: collect_keys(batch, names) for names in groups},
+    )
+
+
+class _Job(NamedTuple):
+    label: str
+    table: Table
+    datasource: object
+    groups: list[tuple[str, ...]]
+
+
+def _run_jobs(jobs: list[_Job], max_workers: int | None) -> list[SourceReport]:
+    if len(jobs) <= 1 or max_workers == 1:
+        return [check_source(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(check_source, *job) for job in jobs]
+        reports = []
+        for job, future in zip(jobs, futures):
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                # 別プロセスに渡せないデータソース（pickle不可など）はこのプロセスで検証する
+                logger.debug(f'validating {job.label} in process: {e}')
+                reports.append(check_source(*job))
+        return reports
+
+
+def validate_datamodels(datamodels: list, schema, settings: dict[str, str] = None,
+                        max_workers: int | None = None) -> list[DataIssue]:
+    """
+    データモデルの全データソースをテーブル定義と照合する
+
+    Args:
+        datamodels: 投入対象のデータモデル
+        schema: テーブル定義を持つスキーマ
+        settings: 変数展開に使う設定値
+        max_workers: 並列数（1の場合は同一プロセスで実行）
+
+    Returns:
+        検出した問題のリスト（levelがerrorのものは投入に失敗する）
+    """
+    settings = settings or {}
+    issues = []
+    loaded = {}
+    for dm in datamodels:
+        label = datamodel_key(dm)
+        if dm.table_name not in schema.tables:
+            issues.append(_issue(ERROR, label, None, None, 'table is not defined in the schema'))
+            continue
+        loaded[label] = (dm, schema.tables[dm.table_name])
+
+    # 主キー、読み込み対象内を参照する外部キーの参照元・参照先の列の組を集める
+    groups = {label: [] for label in loaded}
+    foreign_keys = []
+    for label, (dm, tbl) in loaded.items():
+        pk = primary_key(tbl)
+        if pk:
+            groups[label].append(pk)
+        for relation in tbl.relations:
+            target = f'{relation.target.schema_name}@{relation.target.table_name}'
+            if target not in loaded or not relation.bind_columns:
+                continue
+            source_names = tuple(b.source_column for b in relation.bind_columns)
+            target_names = tuple(b.target_column for b in relation.bind_columns)
+            groups[label].append(source_names)
+            groups[target].append(target_names)
+            foreign_keys.append((label, source_names, target, target_names))
+    groups = {label: list(dict.fromkeys(names)) for label, names in groups.items()}
+
+    jobs = []
+    for label, (dm, tbl) in loaded.items():
+        try:
+            for ds in dm.get_datasources(settings, tbl):
+                jobs.append(_Job(label, tbl, ds, groups[label]))
+        except Exception as e:
+            issues.append(_issue(ERROR, label, None, None, f'failed to resolve data sources: {e}'))
+
+    reports = _run_jobs(jobs, max_workers)
+    files = {label: [] for label in loaded}
+    for job, report in zip(jobs, reports):
+        issues.extend(report.issues)
+        files[job.label].append((job.datasource.filename, report.keys))
+
+    # ファイルをまたいだ主キーの重複
+    for label, (dm, tbl) in loaded.items():
+        pk = primary_key(tbl)
+        if not pk or len(files[label]) < 2:
+            continue
+        seen = set()
+        for filename, keys in files[label]:
+            current = set(keys.get(pk, []))
+            duplicates = seen & current
+            if duplicates:
+                issues.append(_issue(
+                    ERROR, label, filename, ', '.join(pk),
+                    f'{len(duplicates)} primary keys also appear in another data source'))
+            seen |= current
+
+    # 読み込み対象内での外部キーの参照先の存在
+    for label, source_names, target, target_names in foreign_keys:
+        existing = set()
+        for _, keys in files[target]:
+            existing.update(keys.get(target_names, []))
+        # 参照先がバックアップから復元される場合、データベース上には存在し得る
+        level = ERROR if loaded[target][0].sync_mode == SYNC_MODE_DROP_CREATE else WARNING
+        for filename, keys in files[label]:
+            missing = {key for key in keys.get(source_names, []) if key not in existing}
+            if missing:
+                sample = ', '.join(str(key[0] if len(key) == 1 else key) for key in sorted(missing, key=str)[:MAX_REPORTED_ROWS])
+                issues.append(_issue(
+                    level, label, filename, ', '.join(source_names),
+                    f'{len(missing)} values not found in {target} ({", ".join(target_names)}): {sample}'))
+    return issues
@@ -1,22 +1,91 @@
 import re
 
+# $$name（エスケープ）と $name を1回の走査で処理する
+_PATTERN = re.compile(r'\$\$(\w+)|\$(\w+)')
+
+
+class VariableExpander:
+    """settingsごとに構築する変数展開器。
+
+    $$name と書くことでエスケープし、展開後にリテラルの $name として残す。
+    settingsに定義がない $name は展開せず元の文字列を保持する。
+    値が変わらない場合は、元のオブジェクト（文字列・dict・行・列）をそのまま返す。
+    """
+
+    def __init__(self, settings: dict[str, str]):
+        self.settings = settings
+
+        def replace(m):
+            if m.group(1) is not None:
+                return f'${m.group(1)}'
+            return settings.get(m.group(2), m.group(0))
+
+        self._sub = lambda value: _PATTERN.sub(replace, value)
+
+    def value(self, value):
+        """str, dictは再帰的に展開する。それ以外の型はそのまま返す。"""
+        if isinstance(value, str):
+            if '$' not in value:
+                return value
+            return self._sub(value)
+        if isinstance(value, dict):
+            return self.dict(value)
+        return value
+
+    def dict(self, d: dict) -> dict:
+        expanded = None
+        for k, v in d.items():
+            new = self.value(v)
+            if new is not v and new != v:
+                if expanded is None:
+                    expanded = dict(d)
+                expanded[k] = new
+        return d if expanded is None else expanded
+
+    def column(self, values: list) -> list:
+        """列（値のリスト）を展開する。変更がなければ同じリストを返す。"""
+        expanded = None
+        for i, v in enumerate(values):
+            if isinstance(v, str):
+                if '$' not in v:
+                    continue
+                new = self._sub(v)
+            elif isinstance(v, dict):
+                new = self.dict(v)
+            else:
+                continue
+            if new is not v and new != v:
+                if expanded is None:
+                    expanded = list(values)
+                expanded[i] = new
+        return values if expanded is None else expanded
+
 
 def expand_variables(items: list[dict], settings: dict[str, str]) -> list[dict]:
     """データ内の$name形式の変数をsettingsの値で展開する。
 
     $$name と書くことでエスケープし、展開後にリテラルの $name として残す。
     settingsに定義がない $name は展開せず元の文字列を保持する。
+    変数を含まない行は複製せず、元のdictをそのまま返す。
     """
     if not settings:
         return items
-    return [_expand_item(item, settings) for item in items]
+    expander = VariableExpander(settings)
+    return [expander.dict(item) for item in items]
+
+
+def expand_column(values: list, settings: dict[str, str]) -> list:
+    """列（値のリスト）内の$name形式の変数をsettingsの値で展開する。"""
+    if not settings:
+        return values
+    return VariableExpander(settings).column(values)
 
 
 def expand_dict(d: dict, settings: dict[str, str]) -> dict:
     """dict内の$name形式の変数をsettingsの値で展開する。"""
     if not settings:
         return d
-    return {k: expand_value(v, settings) for k, v in d.items()}
+    return VariableExpander(settings).dict(d)
 
 
 def expand_value(value, settings: dict[str, str]):
@@ -24,18 +93,4 @@ def expand_value(value, settings: dict[str, str]):
 
     str, dictは再帰的に展開する。それ以外の型はそのまま返す。
     """
-    if isinstance(value, str):
-        # 1. $$name → プレースホルダに退避（展開を回避）
-        # 2. $name → settingsの値で展開
-        # 3. プレースホルダ → $name に復元
-        result = re.sub(r'\$\$(\w+)', lambda m: f'\x00{m.group(1)}\x00', value)
-        result = re.sub(r'\$(\w+)', lambda m: settings.get(m.group(1), m.group(0)), result)
-        result = re.sub(r'\x00(\w+)\x00', lambda m: f'${m.group(1)}', result)
-        return result
-    if isinstance(value, dict):
-        return {k: expand_value(v, settings) for k, v in value.items()}
-    return value
-
-
-def _expand_item(item: dict, settings: dict[str, str]) -> dict:
-    return {k: expand_value(v, settings) for k, v in item.items()}
+    return VariableExpander(settings).value(value)
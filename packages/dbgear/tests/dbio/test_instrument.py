@@ -0,0 +1,96 @@
+"""Unit tests for SQL execution instrumentation."""
+
+import json
+import unittest
+from unittest.mock import Mock
+
+from dbgear.dbio import engine
+from dbgear.dbio import instrument
+from dbgear.dbio import table
+from dbgear.dbio.instrument import ExecutionReport
+from dbgear.dbio.instrument import Statement
+from dbgear.models.column import Column
+from dbgear.models.column_type import ColumnType
+from dbgear.models.table import Table
+
+
+def _table(name: str) -> Table:
+    column = Column(column_name='id', display_name='id', nullable=True,
+                    column_type=ColumnType(column_type='VARCHAR(10)', base_type='VARCHAR', length=10))
+    return Table(table_name=name, display_name=name, columns_=[column])
+
+
+class TestInstrument(unittest.TestCase):
+    """Test statement classification and the per-run report."""
+
+    def test_phase_of(self):
+        """Test templates are grouped into phases."""
+        self.assertEqual(instrument.phase_of('mysql_insert_into'), 'insert')
+        self.assertEqual(instrument.phase_of('mysql_backup_table'), 'backup')
+        self.assertEqual(instrument.phase_of('mysql_restore_table_update'), 'restore')
+        self.assertEqual(instrument.phase_of('mysql_create_index'), 'index')
+        self.assertEqual(instrument.phase_of('mysql_check_table_exists'), 'check')
+        self.assertEqual(instrument.phase_of('mysql_create_table'), 'create')
+        self.assertEqual(instrument.phase_of('patch'), 'restore')
+        self.assertEqual(instrument.phase_of('sql'), 'other')
+
+    def test_target_of(self):
+        """Test the target is taken from template arguments or parameters."""
+        self.assertEqual(instrument.target_of({'env': 'db', 'table_name': 'items'}), 'db.items')
+        self.assertEqual(instrument.target_of({'env': 'db', 'table': _table('orders')}), 'db.orders')
+        self.assertEqual(instrument.target_of({'database_name': 'db'}), 'db')
+        self.assertIsNone(instrument.target_of({}))
+
+    def test_param_bytes(self):
+        """Test parameter sizes are summed and estimated from a sample for many rows."""
+        self.assertEqual(instrument.param_bytes({'a': 'xyz', 'b': 12, 'c': None}), 3 + 2 + 4)
+        self.assertEqual(instrument.param_bytes([{'a': 'xy'}] * 5000), 10000)
+
+    def test_report(self):
+        """Test statements are aggregated by phase and target."""
+        report = ExecutionReport()
+        report(Statement('mysql_insert_into', 'insert', 'db.items', 100, 2000, 1.5))
+        report(Statement('mysql_insert_into', 'insert', 'db.items', 50, 1000, 0.5))
+        report(Statement('mysql_backup_table', 'backup', 'db.orders', 10, 100, 0.25))
+        report(Statement('mysql_check_table_exists', 'check', 'db.users', -1, 80, 0.01))
+
+        data = report.to_dict(top=2)
+        self.assertEqual(data['total']['count'], 4)
+        self.assertEqual(data['total']['rows'], 160)
+        self.assertEqual(data['phases']['insert'], {'count': 2, 'rows': 150, 'bytes': 3000, 'seconds': 2.0})
+        self.assertEqual([item['target'] for item in data['slowest']], ['db.items', 'db.orders'])
+        self.assertEqual(json.loads(report.to_json(top=2)), data)
+        self.assertIn('insert', report.format())
+
+
+class TestEngineHook(unittest.TestCase):
+    """Test engine.execute reports statements to registered hooks."""
+
+    def setUp(self):
+        self.report = ExecutionReport()
+        engine.add_hook(self.report)
+
+    def tearDown(self):
+        engine.remove_hook(self.report)
+
+    def test_execute(self):
+        """Test template name, target and rows of executed statements are recorded."""
+        conn = Mock()
+        conn.execute.return_value.rowcount = 2
+        table.insert(conn, 'db', _table('items'), [{'id': 'a'}, {'id': 'b'}])
+        table.drop(conn, 'db', _table('items'))
+        engine.execute(conn, 'DELETE FROM db.items', category='patch', target='db.items')
+
+        self.assertEqual(self.report.categories['mysql_insert_into'].rows, 2)
+        self.assertEqual(self.report.targets['db.items'].count, 3)
+        self.assertEqual(set(self.report.phases), {'insert', 'create', 'restore'})
+        self.assertGreater(self.report.total.bytes, 0)
+
+    def test_dryrun(self):
+        """Test statements that are only printed are not recorded."""
+        table.drop(Mock(), 'db', _table('items'), dryrun=True)
+        self.assertEqual(self.report.total.count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
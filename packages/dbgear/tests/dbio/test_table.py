@@ -0,0 +1,108 @@
+"""Unit tests for table data operations."""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from dbgear.dbio import table
+from dbgear.models.column import Column
+from dbgear.models.column_type import ColumnType
+from dbgear.models.datasources.batch import ColumnBatch
+from dbgear.models.table import Table
+
+
+def _column(name: str, expression: str | None = None) -> Column:
+    return Column(
+        column_name=name,
+        display_name=name,
+        column_type=ColumnType(column_type='VARCHAR(10)', base_type='VARCHAR', length=10),
+        nullable=True,
+        expression=expression,
+    )
+
+
+class TestTableInsert(unittest.TestCase):
+    """Test INSERT statement and parameter generation."""
+
+    def setUp(self):
+        self.mock_conn = Mock()
+        self.table = Table(
+            table_name='items',
+            display_name='Items',
+            columns_=[_column('id'), _column('attrs'), _column('updated_at'), _column('upper_id', 'UPPER(id)')],
+        )
+
+    @patch('dbgear.dbio.table.engine')
+    def test_insert_batch(self, mock_engine):
+        """Test a ColumnBatch is inserted with SQL functions embedded and dicts JSON-encoded."""
+        batch = ColumnBatch.from_rows([
+            {'id': 'a', 'attrs': {'k': 1}, 'updated_at': 'NOW()'},
+            {'id': 'b', 'attrs': None, 'updated_at': 'NOW()'},
+        ])
+        table.insert(self.mock_conn, 'testdb', self.table, batch)
+
+        sql, params = mock_engine.execute.call_args[0][1:3]
+        self.assertIn('INSERT INTO testdb.items (`id`, `attrs`, `updated_at`)', sql)
+        self.assertIn('VALUES (:id, :attrs, NOW())', sql)
+        self.assertEqual(params, [{'id': 'a', 'attrs': '{"k": 1}'}, {'id': 'b', 'attrs': None}])
+        self.mock_conn.commit.assert_called_once()
+
+    @patch('dbgear.dbio.table.engine')
+    def test_insert_mixed_shapes(self, mock_engine):
+        """Test rows are grouped by which columns hold SQL functions, in first-seen order."""
+        batch = ColumnBatch.from_rows([
+            {'id': 'a', 'attrs': 'Tokyo (HQ)', 'updated_at': '2024-01-01'},
+            {'id': 'b', 'attrs': None, 'updated_at': 'NOW()'},
+            {'id': 'c', 'attrs': 'x', 'updated_at': '2024-01-02'},
+            {'id': 'UUID()', 'attrs': None, 'updated_at': 'NOW()'},
+            {'id': 'd', 'attrs': None, 'updated_at': 'NOW()'},
+        ])
+        table.insert(self.mock_conn, 'testdb', self.table, batch)
+
+        calls = [c[0][1:3] for c in mock_engine.execute.call_args_list]
+        self.assertEqual(len(calls), 3)
+        self.assertIn('VALUES (:id, :attrs, :updated_at)', calls[0][0])
+        self.assertEqual(calls[0][1], [
+            {'id': 'a', 'attrs': 'Tokyo (HQ)', 'updated_at': '2024-01-01'},
+            {'id': 'c', 'attrs': 'x', 'updated_at': '2024-01-02'},
+        ])
+        self.assertIn('VALUES (:id, :attrs, NOW())', calls[1][0])
+        self.assertEqual(calls[1][1], [{'id': 'b', 'attrs': None}, {'id': 'd', 'attrs': None}])
+        self.assertIn('VALUES (UUID(), :attrs, NOW())', calls[2][0])
+        self.assertEqual(calls[2][1], [{'attrs': None}])
+        self.mock_conn.commit.assert_called_once()
+
+    @patch('dbgear.dbio.table.engine')
+    def test_insert_rows(self, mock_engine):
+        """Test a list of dicts is still accepted."""
+        table.insert(self.mock_conn, 'testdb', self.table, [{'id': 'a', 'attrs': 'x', 'updated_at': None}])
+        params = mock_engine.execute.call_args[0][2]
+        self.assertEqual(params, [{'id': 'a', 'attrs': 'x', 'updated_at': None}])
+
+    @patch('dbgear.dbio.table.engine')
+    @patch('dbgear.dbio.table.INSERT_CHUNK_ROWS', 2)
+    def test_insert_chunks(self, mock_engine):
+        """Test a large group is sent in chunks of INSERT_CHUNK_ROWS rows and committed once."""
+        batch = ColumnBatch.from_rows([{'id': str(i), 'attrs': None, 'updated_at': None} for i in range(5)])
+        table.insert(self.mock_conn, 'testdb', self.table, batch)
+
+        chunks = [c[0][2] for c in mock_engine.execute.call_args_list]
+        self.assertEqual([[row['id'] for row in chunk] for chunk in chunks], [['0', '1'], ['2', '3'], ['4']])
+        self.mock_conn.commit.assert_called_once()
+
+    @patch('dbgear.dbio.table.engine')
+    def test_insert_missing_column(self, mock_engine):
+        """Test a missing column raises ValueError and empty data is skipped."""
+        with self.assertRaises(ValueError):
+            table.insert(self.mock_conn, 'testdb', self.table, [{'id': 'a'}])
+        # 一部の行で省略した列は、NULLとして投入せずにエラーとする
+        with self.assertRaises(ValueError):
+            table.insert(self.mock_conn, 'testdb', self.table, [
+                {'id': 'a', 'attrs': 'x', 'updated_at': None},
+                {'id': 'b', 'updated_at': None},
+            ])
+        table.insert(self.mock_conn, 'testdb', self.table, [])
+        mock_engine.execute.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from dbgear.models.datasources.batch import ColumnBatch
+
+
+class TestColumnBatch(unittest.TestCase):
+    """Test ColumnBatch conversion and per-column transforms"""
+
+    def test_from_rows(self):
+        """Test rows are converted to columns, filling missing keys with None"""
+        batch = ColumnBatch.from_rows([
+            {'id': 1, 'name': 'a'},
+            {'id': 2, 'memo': 'x'},
+        ])
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.names, ['id', 'name', 'memo'])
+        self.assertEqual(batch.columns['name'], ['a', None])
+        self.assertEqual(batch.null_mask('memo'), [True, False])
+        self.assertEqual(batch.rows(['id', 'memo']), [{'id': 1, 'memo': None}, {'id': 2, 'memo': 'x'}])
+        # 省略した値はNULLを指定した値と区別できる
+        self.assertEqual(batch.missing, {'name': [1], 'memo': [0]})
+        self.assertEqual(ColumnBatch.from_rows([{'id': 1, 'name': None}]).missing, {})
+        self.assertEqual(len(ColumnBatch.from_rows(None)), 0)
+        self.assertEqual(len(ColumnBatch.from_rows([])), 0)
+
+    def test_expand_variables_only_touches_columns_with_variables(self):
+        """Test variable expansion skips columns without $ strings or dicts"""
+        batch = ColumnBatch.from_rows([
+            {'id': 1, 'url': '$base/a', 'note': 'plain', 'attrs': {'owner': '$user'}},
+            {'id': 2, 'url': 'fixed', 'note': None, 'attrs': None},
+        ])
+        note = batch.columns['note']
+        batch.expand_variables({'base': 'https://example.com', 'user': 'admin'})
+        self.assertEqual(batch.columns['url'], ['https://example.com/a', 'fixed'])
+        self.assertEqual(batch.columns['attrs'], [{'owner': 'admin'}, None])
+        self.assertIs(batch.columns['note'], note)
+
+    def test_encode_json(self):
+        """Test dict values are JSON encoded and other values are kept"""
+        batch = ColumnBatch.from_rows([{'attrs': {'a': 'あ'}}, {'attrs': 'text'}, {'attrs': None}])
+        self.assertEqual(batch.null_mask('attrs'), [False, False, True])
+        batch.encode_json()
+        self.assertEqual(batch.columns['attrs'], ['{"a": "\\u3042"}', 'text', None])
+
+    def test_map_column_keeps_length(self):
+        """Test map_column rejects results with a different length"""
+        batch = ColumnBatch({'id': [1, 2]})
+        batch.map_column('id', lambda values: [v * 10 for v in values])
+        self.assertEqual(batch.columns['id'], [10, 20])
+        with self.assertRaises(ValueError):
+            batch.map_column('id', lambda values: values[:1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import tempfile
+import os
+import shutil
+from decimal import Decimal
+
+from dbgear.models.column import Column
+from dbgear.models.column_type import parse_column_type
+from dbgear.models.datamodel import DataModel
+from dbgear.models.datasources import csvsource
+from dbgear.models.datasources import tsvsource
+from dbgear.models.table import Table
+
+
+def _column(name: str, type_string: str) -> Column:
+    return Column(column_name=name, display_name=name, column_type=parse_column_type(type_string), nullable=True)
+
+
+class TestDataSource(unittest.TestCase):
+    """Test DataSource CSV/TSV reads"""
+
+    def setUp(self):
+        """Create temporary directory for test files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.base_dir = os.path.join(self.temp_dir, 'development', 'base')
+        os.makedirs(self.base_dir)
+        self.table = Table(
+            table_name='items',
+            display_name='Items',
+            columns_=[_column('id', 'INT'), _column('price', 'DECIMAL(10,2)'), _column('active', 'TINYINT(1)'),
+                      _column('name', 'VARCHAR(20)'), _column('attrs', 'JSON')],
+        )
+
+    def tearDown(self):
+        """Clean up temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, filename: str, text: str):
+        with open(os.path.join(self.base_dir, filename), 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def test_load_with_table(self):
+        """Test values are converted by column type and dotted headers are nested"""
+        self._write('main@items.csv', 'id,price,active,name,attrs.color,attrs.size\n'
+                                      '1,10.50,true,"a, b",red,\n'
+                                      '\n'
+                                      '2,,0,$prefix\n')
+        datasource = csvsource.DataSource(self.temp_dir, 'development', 'base', 'main', 'items')
+        datasource.table = self.table
+        datasource.load()
+        self.assertEqual(datasource.data, [
+            {'id': 1, 'price': Decimal('10.50'), 'active': 1, 'name': 'a, b', 'attrs': {'color': 'red', 'size': None}},
+            {'id': 2, 'price': None, 'active': 0, 'name': '$prefix', 'attrs': {'color': None, 'size': None}},
+        ])
+        self.assertEqual(list(datasource.iter_rows()), datasource.data)
+        self.assertEqual(datasource.batch.columns['id'], [1, 2])
+
+    def test_load_without_table(self):
+        """Test values stay strings without a table definition"""
+        self._write('main@items.tsv', '1\tx\n2\t\n')
+        datasource = tsvsource.DataSource(
+            self.temp_dir, 'development', 'base', 'main', 'items', header=False, columns=['id', 'name'])
+        datasource.load()
+        self.assertEqual(datasource.filename, 'main@items.tsv')
+        self.assertEqual(datasource.data, [{'id': '1', 'name': 'x'}, {'id': '2', 'name': None}])
+
+    def test_estimate_rows(self):
+        """Test rows are counted from line breaks without parsing"""
+        self._write('main@items.csv', 'id,name\n1,a\n2,b')
+        datasource = csvsource.DataSource(self.temp_dir, 'development', 'base', 'main', 'items')
+        self.assertEqual(datasource.estimate_rows(), 2)
+        self._write('main@items.tsv', '1\tx\n2\ty\n')
+        datasource = tsvsource.DataSource(self.temp_dir, 'development', 'base', 'main', 'items', header=False)
+        self.assertEqual(datasource.estimate_rows(), 2)
+
+    def test_segments(self):
+        """Test segment files are found by the data source's extension"""
+        self._write('main@items#1.csv', 'id\n1\n')
+        self._write('main@items#2.csv', 'id\n2\n')
+        self._write('main@items#3.dat', '- id: 3\n')
+        dm = DataModel(
+            folder=self.temp_dir, environ='development', map_name='base', schema_name='main', table_name='items',
+            description='', sync_mode='drop_create', data_type='csv', data_params={'segment': 'id'},
+        )
+        datasources = list(dm.get_datasources(table=self.table))
+        self.assertEqual([ds.filename for ds in datasources], ['main@items#1.csv', 'main@items#2.csv'])
+        for ds in datasources:
+            ds.load()
+        self.assertEqual([ds.data for ds in datasources], [[{'id': 1}], [{'id': 2}]])
+
+
+if __name__ == '__main__':
+    unittest.main()
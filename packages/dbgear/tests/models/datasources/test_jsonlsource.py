@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from dbgear.models.datasources import jsonlsource
+from dbgear.models.datasources.loader import load_batches
+
+
+class TestDataSource(unittest.TestCase):
+    """Test DataSource JSON Lines reads"""
+
+    def setUp(self):
+        """Create temporary directory for test files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.base_dir = os.path.join(self.temp_dir, 'development', 'base')
+        os.makedirs(self.base_dir)
+        self.path = os.path.join(self.base_dir, 'main@items.jsonl')
+
+    def tearDown(self):
+        """Clean up temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, text: str):
+        with open(self.path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def _rows(self, count: int) -> list[dict]:
+        rows = [{'id': i, 'name': f'item{i}', 'attrs': '{"n": %d}' % i} for i in range(count)]
+        self._write(''.join(json.dumps(row) + '\n' for row in rows))
+        return rows
+
+    def _datasource(self, **kwargs) -> jsonlsource.DataSource:
+        return jsonlsource.DataSource(self.temp_dir, 'development', 'base', 'main', 'items', **kwargs)
+
+    def test_load(self):
+        """Test blank lines are skipped and the last line needs no newline"""
+        self._write('{"id": 1, "attrs": {"a": [1, 2]}}\n\n  \n{"id": 2, "attrs": "{\\"b\\": 1}"}')
+        datasource = self._datasource()
+        datasource.load()
+        self.assertEqual(datasource.data, [{'id': 1, 'attrs': {'a': [1, 2]}}, {'id': 2, 'attrs': '{"b": 1}'}])
+        self.assertEqual(datasource.filename, 'main@items.jsonl')
+
+    def test_empty_file(self):
+        """Test an empty file has no rows"""
+        self._write('')
+        datasource = self._datasource()
+        datasource.load()
+        self.assertEqual(datasource.data, [])
+        self.assertEqual(list(datasource.iter_batches()), [])
+
+    def test_line_index(self):
+        """Test the sidecar index is reused and rebuilt when the file changes"""
+        self._rows(3)
+        offsets = jsonlsource.line_index(self.path)
+        self.assertEqual(len(offsets) - 1, 3)
+        self.assertEqual(offsets[-1], os.path.getsize(self.path))
+        self.assertTrue(os.path.exists(self.path + jsonlsource.INDEX_SUFFIX))
+        self.assertEqual(jsonlsource.line_index(self.path), offsets)
+
+        self._rows(5)
+        offsets = jsonlsource.line_index(self.path)
+        self.assertEqual(len(offsets) - 1, 5)
+        self.assertEqual(offsets[-1], os.path.getsize(self.path))
+
+    def test_iter_batches(self):
+        """Test batches are read batch_size rows at a time"""
+        rows = self._rows(7)
+        batches = list(self._datasource(batch_size=3).iter_batches())
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+        self.assertEqual(sum((batch.columns['id'] for batch in batches), []), [row['id'] for row in rows])
+        # JSON列に文字列として書かれた値はそのまま渡される
+        self.assertEqual(batches[0].columns['attrs'][0], '{"n": 0}')
+
+    def test_split(self):
+        """Test split parts cover every line once and can be loaded in parallel"""
+        rows = self._rows(10)
+        datasource = self._datasource()
+        datasource.table = object()
+        parts = datasource.split(3)
+        self.assertEqual([(ds.start, ds.stop) for ds in parts], [(0, 4), (4, 8), (8, 10)])
+        self.assertTrue(all(ds.table is datasource.table for ds in parts))
+        self.assertEqual(parts[1].filename, 'main@items.jsonl[4:8]')
+
+        for ds in parts:
+            ds.table = None
+        result = list(load_batches(parts, max_workers=2))
+        self.assertEqual([ds for ds, _ in result], parts)
+        self.assertEqual(sum((batch.columns['id'] for _, batch in result), []), [row['id'] for row in rows])
+
+        self.assertEqual(len(self._datasource().split(1)), 1)
+        self.assertEqual(len(self._datasource().split(20)), 10)
+
+    def test_estimate_rows(self):
+        """Test rows are counted from the line index, per split part"""
+        self._rows(10)
+        self.assertEqual(self._datasource().estimate_rows(), 10)
+        self.assertEqual([ds.estimate_rows() for ds in self._datasource().split(3)], [4, 4, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
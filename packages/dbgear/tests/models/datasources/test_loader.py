@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from dbgear.models.datasources.loader import create_pool
+from dbgear.models.datasources.loader import load_batches
+from dbgear.models.datasources.yamlsource import DataSource
+
+
+class TestLoadBatches(unittest.TestCase):
+    """Test parallel loading of segmented data sources"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, 'dev', 'base'))
+        self.datasources = []
+        for seg in range(6):
+            path = os.path.join(self.temp_dir, 'dev', 'base', f'main@items#{seg}.dat')
+            with open(path, 'w', encoding='utf-8') as f:
+                yaml.dump([{'id': seg * 10 + i, 'name': '$prefix-x'} for i in range(3)], f)
+            self.datasources.append(DataSource(
+                self.temp_dir, 'dev', 'base', 'main', 'items', str(seg), settings={'prefix': 'item'}))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_ordered(self):
+        """Test batches are returned in data source order with variables expanded"""
+        for workers, pending in ((1, None), (2, 1), (3, None)):
+            result = list(load_batches(self.datasources, max_workers=workers, max_pending=pending))
+            self.assertEqual([ds.segment for ds, _ in result], [str(seg) for seg in range(6)])
+            self.assertEqual(result[2][1].columns['id'], [20, 21, 22])
+            self.assertEqual(result[2][1].columns['name'], ['item-x'] * 3)
+
+    def test_completion_order(self):
+        """Test every batch is returned once when ordering is not required"""
+        result = list(load_batches(iter(self.datasources), max_workers=2, ordered=False))
+        self.assertEqual(sorted(ds.segment for ds, _ in result), [str(seg) for seg in range(6)])
+
+    def test_load_error(self):
+        """Test a load error is raised to the caller without parsing again in this process"""
+        self.datasources.insert(2, DataSource(self.temp_dir, 'dev', 'base', 'main', 'items', 'missing'))
+        with self.assertNoLogs('dbgear.models.datasources.loader', level='DEBUG'), self.assertRaises(FileNotFoundError):
+            list(load_batches(self.datasources, max_workers=2))
+
+    def test_unpicklable_source_loaded_in_process(self):
+        """Test a data source that cannot be sent to a worker is loaded in this process"""
+        self.datasources[1].settings = {'prefix': 'item', 'hook': lambda: None}
+        result = list(load_batches(self.datasources, max_workers=2))
+        self.assertEqual(result[1][1].columns['id'], [10, 11, 12])
+
+    def test_shared_executor(self):
+        """Test a given pool is used and left open for the next load"""
+        with create_pool(2) as executor:
+            for _ in range(2):
+                result = list(load_batches(self.datasources, max_workers=2, executor=executor))
+                self.assertEqual(len(result), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
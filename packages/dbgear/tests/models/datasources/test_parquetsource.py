@@ -0,0 +1,103 @@
+import unittest
+import tempfile
+import os
+import shutil
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from dbgear.models.column import Column
+from dbgear.models.column_type import parse_column_type
+from dbgear.models.table import Table
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from dbgear.models.datasources import parquetsource
+except ImportError:  # pyarrow is an optional extra
+    pa = None
+
+
+def _column(name: str, type_string: str) -> Column:
+    return Column(column_name=name, display_name=name, column_type=parse_column_type(type_string), nullable=True)
+
+
+@unittest.skipIf(pa is None, 'pyarrow is not installed')
+class TestDataSource(unittest.TestCase):
+    """Test DataSource Parquet reads"""
+
+    def setUp(self):
+        """Create a Parquet file with two row groups"""
+        self.temp_dir = tempfile.mkdtemp()
+        base_dir = os.path.join(self.temp_dir, 'development', 'base')
+        os.makedirs(base_dir)
+        arrow_table = pa.table({
+            'id': pa.array([1, 2, 3], pa.int64()),
+            'price': pa.array([Decimal('1.50'), None, Decimal('3.00')], pa.decimal128(10, 2)),
+            'active': pa.array([True, False, None]),
+            'category': pa.array(['a', 'b', 'a']).dictionary_encode(),
+            'attrs': pa.array([{'color': 'red'}, None, {'color': 'blue'}]),
+            'released': pa.array([date(2024, 1, 1), None, date(2024, 3, 1)]),
+            'unused': pa.array([0, 0, 0]),
+        })
+        pq.write_table(arrow_table, os.path.join(base_dir, 'main@items.parquet'), row_group_size=2)
+        self.table = Table(
+            table_name='items',
+            display_name='Items',
+            columns_=[_column('id', 'BIGINT'), _column('price', 'DECIMAL(10,2)'), _column('active', 'TINYINT(1)'),
+                      _column('category', 'VARCHAR(10)'), _column('attrs', 'JSON'), _column('released', 'DATE')],
+        )
+
+    def tearDown(self):
+        """Clean up temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def _datasource(self, **kwargs):
+        datasource = parquetsource.DataSource(self.temp_dir, 'development', 'base', 'main', 'items', **kwargs)
+        datasource.table = self.table
+        return datasource
+
+    def test_estimate_rows(self):
+        """Test the row count comes from the file metadata"""
+        self.assertEqual(self._datasource().estimate_rows(), 3)
+
+    def test_load(self):
+        """Test Arrow columns are mapped to the table's column types"""
+        datasource = self._datasource()
+        datasource.load()
+        batch = datasource.batch
+        self.assertEqual(batch.names, ['id', 'price', 'active', 'category', 'attrs', 'released'])
+        self.assertEqual(batch.columns['price'], [Decimal('1.50'), None, Decimal('3.00')])
+        self.assertEqual(batch.columns['active'], [1, 0, None])
+        self.assertEqual(batch.columns['category'], ['a', 'b', 'a'])
+        self.assertEqual(batch.columns['attrs'], ['{"color": "red"}', None, '{"color": "blue"}'])
+        self.assertEqual(batch.columns['released'], [date(2024, 1, 1), None, date(2024, 3, 1)])
+
+    def test_iter_batches(self):
+        """Test the file is read in batches"""
+        batches = list(self._datasource(batch_size=2, columns=['id']).iter_batches())
+        self.assertEqual([b.columns for b in batches], [{'id': [1, 2]}, {'id': [3]}])
+
+    def test_files_closed(self):
+        """Test every read closes the file, including an iteration stopped early"""
+        opened = []
+        original = parquetsource.DataSource._open
+
+        def _open(datasource):
+            parquet = original(datasource)
+            opened.append(parquet)
+            return parquet
+
+        with mock.patch.object(parquetsource.DataSource, '_open', _open):
+            datasource = self._datasource(batch_size=2)
+            datasource.estimate_rows()
+            datasource.load()
+            batches = datasource.iter_batches()
+            next(batches)
+            batches.close()
+        self.assertEqual(len(opened), 3)
+        self.assertTrue(all(parquet.closed for parquet in opened))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import tempfile
+import os
+import shutil
+from datetime import datetime
+
+try:
+    import openpyxl
+    from dbgear.models.datasources import xlsxsource
+    from dbgear.models.datasources.workbook import WorkbookCache, workbooks
+except ImportError:  # openpyxl is an optional extra
+    openpyxl = None
+
+
+@unittest.skipIf(openpyxl is None, 'openpyxl is not installed')
+class TestDataSource(unittest.TestCase):
+    """Test DataSource XLSX streaming reads"""
+
+    def setUp(self):
+        """Create a workbook with two sheets"""
+        self.temp_dir = tempfile.mkdtemp()
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'users'
+        ws.append(['title'])
+        ws.append(['id', 'name', 'attrs.color', None, 'created'])
+        ws.append([1, ' alice ', 'red', None, datetime(2024, 1, 2, 3, 4, 5)])
+        ws.append([])
+        ws.append([2.0, 'NULL', None, 'x', 'now()'])
+        ws2 = wb.create_sheet('roles')
+        ws2.append(['code'])
+        ws2.append(['admin'])
+        self.path = os.path.join(self.temp_dir, 'master.xlsx')
+        wb.save(self.path)
+
+    def tearDown(self):
+        """Clean up temporary files"""
+        workbooks.clear()
+        shutil.rmtree(self.temp_dir)
+
+    def test_load(self):
+        """Test rows are converted, nested by dotted headers and empty rows are skipped"""
+        datasource = xlsxsource.DataSource(self.temp_dir, 'master.xlsx', 'users', header_row=2, start_row=3)
+        datasource.load()
+        self.assertEqual(datasource.data, [
+            {'id': 1, 'name': 'alice', 'attrs': {'color': 'red'}, 'Column_4': None, 'created': '2024-01-02T03:04:05'},
+            {'id': 2, 'name': None, 'attrs': {'color': None}, 'Column_4': 'x', 'created': 'NOW()'},
+        ])
+
+    def test_estimate_rows(self):
+        """Test rows are estimated from the sheet dimensions without opening the workbook"""
+        datasource = xlsxsource.DataSource(self.temp_dir, 'master.xlsx', 'users', header_row=2, start_row=3)
+        self.assertEqual(datasource.estimate_rows(), 3)
+        self.assertEqual(xlsxsource.DataSource(self.temp_dir, 'master.xlsx', 'roles', 1, 2).estimate_rows(), 1)
+        self.assertEqual(len(workbooks._books), 0)
+        with self.assertRaises(KeyError):
+            xlsxsource.DataSource(self.temp_dir, 'master.xlsx', 'missing', 1, 2).estimate_rows()
+
+    def test_workbook_shared_between_sheets(self):
+        """Test sheets of the same file reuse the opened workbook until the file changes"""
+        xlsxsource.DataSource(self.temp_dir, 'master.xlsx', 'users', header_row=2, start_row=3).load()
+        roles = xlsxsource.DataSource(self.temp_dir, 'master.xlsx', 'roles', header_row=1, start_row=2)
+        roles.load()
+        self.assertEqual(roles.data, [{'code': 'admin'}])
+        self.assertEqual(len(workbooks._books), 1)
+
+        # 更新前の版のブックは閉じる
+        os.utime(self.path, (0, 0))
+        roles.load()
+        self.assertEqual(list(workbooks._books), [(os.path.abspath(self.path), 0.0)])
+
+    def test_workbook_used_only_while_reading(self):
+        """Test creating data sources does not open or pin workbooks until a sheet is read"""
+        users = xlsxsource.DataSource(self.temp_dir, 'master.xlsx', 'users', header_row=2, start_row=3)
+        self.assertEqual(len(workbooks._books), 0)
+        rows = users.iter_rows()
+        next(rows)
+        self.assertEqual(list(workbooks._readers.values()), [1])
+        rows.close()
+        self.assertEqual(workbooks._readers, {})
+
+    def test_idle_workbooks_closed_first(self):
+        """Test only workbooks that are not being read are closed past the limit"""
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, f'book{i}.xlsx')
+            shutil.copy(self.path, path)
+            paths.append(path)
+        cache = WorkbookCache(max_open=1)
+        reading = cache.rows(paths[0], 'roles')
+        self.assertEqual(next(reading), ('code',))
+        list(cache.rows(paths[1], 'roles'))
+        # 読み出し中のブックは閉じない
+        self.assertEqual([key[0] for key in cache._books], [os.path.abspath(paths[0])])
+        self.assertEqual(list(reading), [('admin',)])
+        list(cache.rows(paths[2], 'roles'))
+        self.assertEqual([key[0] for key in cache._books], [os.path.abspath(paths[2])])
+        cache.clear()
+
+    def test_size_limit(self):
+        """Test idle workbooks are closed once their estimated size passes the limit"""
+        cache = WorkbookCache(limit_mb=0)
+        self.assertEqual(list(cache.rows(self.path, 'roles')), [('code',), ('admin',)])
+        self.assertEqual(len(cache._books), 0)
+        self.assertEqual(cache.size, 0)
+
+        cache = WorkbookCache()
+        list(cache.rows(self.path, 'roles'))
+        self.assertGreater(cache.size, 0)
+        cache.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,14 @@ import tempfile
 import os
 import yaml
 import shutil
+from datetime import date
+from datetime import datetime
 
+from dbgear.models.column import Column
+from dbgear.models.column_type import parse_column_type
+from dbgear.models.datasources import compiled
 from dbgear.models.datasources.yamlsource import DataSource
+from dbgear.models.table import Table
 
 
 class TestDataSource(unittest.TestCase):
@@ -83,6 +89,22 @@ class TestDataSource(unittest.TestCase):
         self.assertEqual(datasource.data[0]['name'], 'Product A')
         self.assertEqual(datasource.data[1]['price'], 200.0)
 
+    def test_estimate_rows(self):
+        """Test rows of block-style YAML are counted without parsing"""
+        datasource = DataSource(self.temp_dir, 'development', 'base', 'main', 'items')
+        os.makedirs(os.path.dirname(datasource.path), exist_ok=True)
+        datasource._data = [{'id': 1, 'tags': ['a', 'b']}, {'id': 2, 'tags': []}]
+        datasource.save()
+        self.assertEqual(datasource.estimate_rows(), 2)
+
+        # フロー形式等、行頭の「- 」で数えられない場合は None
+        with open(datasource.path, 'w', encoding='utf-8') as f:
+            f.write('[{id: 1}, {id: 2}]\n')
+        self.assertIsNone(datasource.estimate_rows())
+        with open(datasource.path, 'w', encoding='utf-8') as f:
+            f.write('# comment\n- id: 1\n- id: 2\n')
+        self.assertIsNone(datasource.estimate_rows())
+
     def test_datasource_roundtrip(self):
         """Test DataSource save/load roundtrip"""
         # Create original DataSource
@@ -173,5 +195,77 @@ class TestDataSource(unittest.TestCase):
         self.assertIn('does not exist', str(context.exception))
 
 
+class TestCompiledData(unittest.TestCase):
+    """Test compiled .datc files are used while the YAML file is unchanged"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, 'development', 'base'))
+        self.path = os.path.join(self.temp_dir, 'development', 'base', 'main@items.dat')
+        self.rows = [
+            {'id': 1, 'name': 'a', 'created': datetime(2024, 1, 2, 3, 4, 5), 'attrs': {'tags': ['x']}},
+            {'id': 2, 'day': date(2024, 5, 6), 'created': 'NOW()'},
+            {'id': 3, 'name': None},
+        ]
+        with open(self.path, 'w', encoding='utf-8') as f:
+            yaml.dump(self.rows, f, sort_keys=False)
+        self.table = Table(table_name='items', display_name='Items', columns_=[
+            Column(column_name='id', display_name='id', column_type=parse_column_type('INT'), nullable=False, primary_key=1),
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _datasource(self, table=None) -> DataSource:
+        datasource = DataSource(self.temp_dir, 'development', 'base', 'main', 'items')
+        datasource.table = table
+        return datasource
+
+    def test_compile_and_load(self):
+        """Test compiled data restores the same rows, missing keys and dates included"""
+        self.assertTrue(self._datasource(self.table).compile())
+        self.assertTrue(os.path.exists(self.path + compiled.SUFFIX))
+
+        datasource = self._datasource(self.table)
+        datasource.load()
+        self.assertTrue(datasource.from_compiled)
+        self.assertEqual(datasource.batch.columns['day'], [None, date(2024, 5, 6), None])
+        self.assertEqual(datasource.data, self.rows)
+
+        # テーブル定義なしでも、内容が同じであれば使用する
+        datasource = self._datasource()
+        datasource.load()
+        self.assertTrue(datasource.from_compiled)
+
+    def test_stale(self):
+        """Test YAML is parsed when the file or the table definition changed"""
+        self._datasource(self.table).compile()
+
+        other = Table(table_name='items', display_name='Items', columns_=[
+            Column(column_name='id', display_name='id', column_type=parse_column_type('BIGINT'), nullable=False),
+        ])
+        datasource = self._datasource(other)
+        datasource.load()
+        self.assertFalse(datasource.from_compiled)
+        self.assertEqual(datasource.data, self.rows)
+
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('- id: 4\n')
+        datasource = self._datasource(self.table)
+        datasource.load()
+        self.assertFalse(datasource.from_compiled)
+        self.assertEqual(datasource.data[-1], {'id': 4})
+
+    def test_not_compilable(self):
+        """Test data that cannot be stored is left to YAML"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            yaml.dump([{'id': 1, 'attrs': {'since': date(2024, 1, 1)}}], f)
+        self.assertFalse(self._datasource().compile())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('')
+        self.assertFalse(self._datasource().compile())
+        self.assertFalse(os.path.exists(self.path + compiled.SUFFIX))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,8 +2,11 @@ import unittest
 import tempfile
 import os
 import yaml
+from unittest.mock import patch
 
 from dbgear.models.environ import EnvironManager, Environ
+from dbgear.models.mapping import Mapping
+from dbgear.models.datamodel import DataModel
 from dbgear.models.exceptions import DBGearEntityRemovalError
 
 
@@ -159,6 +162,50 @@ class TestEnviron(unittest.TestCase):
         self.assertEqual(loaded_environ.folder, original_environ.folder)
         self.assertEqual(loaded_environ.deployments, original_environ.deployments)
 
+    def test_environ_caches_mappings_and_datamodels(self):
+        """Test Environ returns the same Mapping/DataModel objects until files change"""
+        environ = Environ(folder=self.temp_dir, name='cached', description='Cached environment')
+        environ.save()
+        mapping = Mapping(
+            folder=self.temp_dir, environ='cached', name='base',
+            description='Base mapping', schemas=['main'], deploy=True)
+        mapping.save()
+        datamodel = DataModel(
+            folder=self.temp_dir, environ='cached', map_name='base',
+            schema_name='main', table_name='users',
+            description='Users', sync_mode='drop_create', data_type='yaml')
+        datamodel.save()
+
+        loaded = EnvironManager(self.temp_dir)['cached']
+        first = loaded.mappings['base']
+        self.assertIs(first, loaded.mappings['base'])
+        self.assertIs(first, next(iter(loaded.mappings)))
+        self.assertIs(next(first.datamodels), next(first.datamodels))
+        self.assertIs(next(first.datamodels), first.datamodel('main', 'users'))
+
+        # 保存されたファイルは次回アクセス時に再読み込みされる
+        first.description = 'Updated mapping'
+        first.save()
+        os.utime(Mapping._fullpath(self.temp_dir, 'cached', 'base'), ns=(0, 0))
+        reloaded = loaded.mappings['base']
+        self.assertIsNot(first, reloaded)
+        self.assertEqual(reloaded.description, 'Updated mapping')
+
+        # ファイルの一覧はデータモデルが追加されるまで再利用する
+        with patch('pathlib.Path.glob') as glob:
+            self.assertEqual([dm.table_name for dm in reloaded.datamodels], ['users'])
+        glob.assert_not_called()
+        DataModel(
+            folder=self.temp_dir, environ='cached', map_name='base',
+            schema_name='main', table_name='orders',
+            description='Orders', sync_mode='drop_create', data_type='yaml').save()
+        os.utime(Mapping._directory(self.temp_dir, 'cached', 'base'), ns=(1, 1))
+        self.assertEqual([dm.table_name for dm in reloaded.datamodels], ['orders', 'users'])
+
+        # 別のEnvironとはキャッシュを共有しない
+        other = EnvironManager(self.temp_dir)['cached']
+        self.assertIsNot(other.mappings['base'], reloaded)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from dbgear.models.schema import SchemaManager, Schema
+from dbgear.models.table import Table
+from dbgear.models.view import View
+from dbgear.models.trigger import Trigger
+from dbgear.models.relation import Relation, EntityInfo, BindColumn
+
+
+def _table(name: str, *targets: tuple[str, str]) -> Table:
+    return Table(
+        table_name=name,
+        display_name=name,
+        relations_=[
+            Relation(
+                target=EntityInfo(schema_name=schema_name, table_name=table_name),
+                bind_columns=[BindColumn(source_column=f'{table_name}_id', target_column='id')],
+            )
+            for schema_name, table_name in targets
+        ],
+    )
+
+
+class TestRelationGraph(unittest.TestCase):
+    """Test RelationGraph adjacency and traversal"""
+
+    def setUp(self):
+        main = Schema(name='main')
+        main.tables.append(_table('users'))
+        main.tables.append(_table('orders', ('main', 'users')))
+        main.tables.append(_table('order_items', ('main', 'orders'), ('master', 'products')))
+        main.views.append(View(view_name='v_orders', display_name='v', select_statement='SELECT * FROM orders'))
+        main.triggers.append(Trigger(
+            trigger_name='tr_orders', display_name='t', table_name='orders',
+            timing='AFTER', event='INSERT', body='SET @x = 1'))
+        master = Schema(name='master')
+        master.tables.append(_table('products'))
+        self.schema_manager = SchemaManager(schemas={'main': main, 'master': master})
+        self.graph = self.schema_manager.relation_graph()
+
+    def test_adjacency(self):
+        """Test forward and reverse neighbors across schemas"""
+        self.assertEqual(self.graph.neighbors('main.order_items', 'references'), ['main.orders', 'master.products'])
+        self.assertEqual(self.graph.neighbors('master.products', 'referenced_by'), ['main.order_items'])
+        self.assertEqual(self.graph.neighbors('main.users', 'references'), [])
+        edge = self.graph.referenced_by('main.users')[0]
+        self.assertEqual((edge.source, edge.target), ('main.orders', 'main.users'))
+        self.assertEqual(edge.relation.bind_columns[0].source_column, 'users_id')
+        self.assertIn('master.products', self.graph)
+
+    def test_views_and_triggers(self):
+        """Test views and triggers are looked up per table"""
+        self.assertEqual([ref.view.view_name for ref in self.graph.views('main.orders')], ['v_orders'])
+        self.assertEqual(self.graph.views('main.users'), [])
+        self.assertEqual([t.trigger_name for t in self.graph.triggers('main.orders')], ['tr_orders'])
+
+    def test_walk(self):
+        """Test BFS depth limits and include filter"""
+        self.assertEqual(self.graph.walk('main.users', 'referenced_by', 1), {'main.users': 0, 'main.orders': 1})
+        self.assertEqual(
+            self.graph.walk('main.users', 'referenced_by', 3),
+            {'main.users': 0, 'main.orders': 1, 'main.order_items': 2})
+        self.assertEqual(
+            self.graph.walk('main.order_items', 'references', 2, include={'main.orders', 'main.users'}),
+            {'main.order_items': 0, 'main.orders': 1, 'main.users': 2})
+        self.assertEqual(self.graph.walk('main.users', 'references', 0), {'main.users': 0})
+        with self.assertRaises(ValueError):
+            self.graph.neighbors('main.users', 'sideways')
+
+
+if __name__ == "__main__":
+    unittest.main()
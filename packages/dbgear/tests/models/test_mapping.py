@@ -4,6 +4,8 @@ import os
 import yaml
 
 from dbgear.models.mapping import MappingManager, Mapping
+from dbgear.models.schema import SchemaManager, Schema
+from dbgear.models.table import Table
 from dbgear.models.exceptions import DBGearEntityRemovalError
 
 
@@ -173,6 +175,47 @@ class TestMapping(unittest.TestCase):
         self.assertEqual(loaded_mapping.schemas, original_mapping.schemas)
         self.assertEqual(loaded_mapping.deploy, original_mapping.deploy)
 
+    def _table(self, name, display_name):
+        return Table(table_name=name, display_name=display_name)
+
+    def test_build_schema_merges_and_memoizes(self):
+        """Test build_schema returns a memoized read-only merged view"""
+        project_main = Schema(name='main')
+        project_main.tables_ = {'users': self._table('users', 'ユーザー'), 'items': self._table('items', '品目')}
+        project_sub = Schema(name='sub')
+        project_sub.tables_ = {'logs': self._table('logs', 'ログ')}
+        project_schema = SchemaManager(schemas={'main': project_main, 'sub': project_sub})
+
+        environ_main = Schema(name='main')
+        environ_main.tables_ = {'users': self._table('users', '環境ユーザー')}
+        environ_schema = SchemaManager(schemas={'main': environ_main})
+
+        mapping = Mapping(folder=self.temp_dir, environ=self.env_name, name='base', description='', schemas=['main'])
+        schema = mapping.build_schema(project_schema, environ_schema)
+        self.assertEqual(schema.name, 'base')
+        self.assertEqual([t.table_name for t in schema.tables], ['users', 'items'])
+        # 環境スキーマの定義が優先される
+        self.assertEqual(schema.tables['users'].display_name, '環境ユーザー')
+        self.assertIs(schema, mapping.build_schema(project_schema, environ_schema))
+
+        # 読み取り専用のビュー
+        with self.assertRaises(TypeError):
+            schema.tables_['new'] = self._table('new', '新規')
+
+        # 元スキーマへの追加はビューに反映される
+        project_main.tables.append(self._table('orders', '注文'))
+        self.assertIn('orders', schema.tables)
+        self.assertIs(schema, mapping.build_schema(project_schema, environ_schema))
+
+        # 元スキーマの構成が変わると再構築される
+        mapping.schemas.append('sub')
+        rebuilt = mapping.build_schema(project_schema, environ_schema)
+        self.assertIsNot(schema, rebuilt)
+        self.assertIn('logs', rebuilt.tables)
+
+        project_schema.schemas['sub'] = Schema(name='sub')
+        self.assertNotIn('logs', mapping.build_schema(project_schema, environ_schema).tables)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,11 +2,14 @@ import unittest
 import tempfile
 import os
 import yaml
+import pydantic
+from unittest import mock
 
 from dbgear.models.schema import SchemaManager, Schema
 from dbgear.models.table import Table
 from dbgear.models.column import Column
 from dbgear.models.column_type import ColumnType, ColumnTypeItem
+from dbgear.utils import schema_cache
 
 
 class TestSchema(unittest.TestCase):
@@ -192,6 +195,151 @@ class TestSchema(unittest.TestCase):
         self.assertEqual(status_column.column_type.items[0].value, 'active')
         self.assertEqual(status_column.column_type.items[1].value, 'inactive')
 
+    def _write_lazy_fixture(self):
+        schema_data = {
+            'schemas': {
+                'main': {
+                    'tables': {
+                        'users': {
+                            'displayName': 'ユーザー',
+                            'columns': [
+                                {
+                                    'columnName': 'id',
+                                    'displayName': 'ID',
+                                    'columnType': {'columnType': 'BIGINT', 'baseType': 'BIGINT'},
+                                    'nullable': False,
+                                    'primaryKey': 1
+                                }
+                            ]
+                        },
+                        # displayNameが欠けた不正な定義
+                        'broken': {
+                            'columns': []
+                        }
+                    },
+                    'views': {
+                        'v_users': {
+                            'displayName': 'ユーザービュー',
+                            'selectStatement': 'SELECT * FROM users'
+                        }
+                    }
+                }
+            }
+        }
+        with open(self.schema_yaml_path, 'w', encoding='utf-8') as f:
+            yaml.dump(schema_data, f, allow_unicode=True)
+
+    def test_lazy_load_validates_on_access(self):
+        """Test lazy SchemaManager validates tables only when accessed"""
+        self._write_lazy_fixture()
+
+        # Eager load fails because of the broken table
+        with self.assertRaises(pydantic.ValidationError):
+            SchemaManager.load(self.schema_yaml_path)
+
+        schema_manager = SchemaManager.load(self.schema_yaml_path, lazy=True)
+        self.assertIn('main', schema_manager)
+        main_schema = schema_manager['main']
+        self.assertTrue(main_schema.tables_.is_pending('users'))
+        self.assertIn('broken', main_schema.tables)
+        self.assertEqual(len(main_schema.tables), 2)
+
+        users = main_schema.tables['users']
+        self.assertEqual(users.table_name, 'users')
+        self.assertEqual(users.display_name, 'ユーザー')
+        self.assertEqual(users.columns['id'].column_type.base_type, 'BIGINT')
+        self.assertFalse(main_schema.tables_.is_pending('users'))
+        self.assertIs(main_schema.tables['users'], users)
+        self.assertEqual(main_schema.views['v_users'].view_name, 'v_users')
+
+        with self.assertRaises(pydantic.ValidationError):
+            main_schema.tables['broken']
+
+    def test_lazy_merge_keeps_entities_pending(self):
+        """Test Schema.merge does not validate pending entities"""
+        self._write_lazy_fixture()
+        schema_manager = SchemaManager.load(self.schema_yaml_path, lazy=True)
+
+        merged = Schema(name='merged')
+        merged.merge(schema_manager['main'])
+        self.assertTrue(merged.tables_.is_pending('broken'))
+        self.assertEqual(merged.tables['users'].display_name, 'ユーザー')
+        # マージ元とマージ先で同じモデルを共有する
+        self.assertIs(schema_manager['main'].tables['users'], merged.tables['users'])
+
+    def test_lazy_save_roundtrip(self):
+        """Test lazy SchemaManager saves the same content as eager load"""
+        schema_data = {
+            'schemas': {
+                'main': {
+                    'tables': {
+                        'items': {
+                            'displayName': '品目',
+                            'columns': [
+                                {
+                                    'columnName': 'code',
+                                    'displayName': 'コード',
+                                    'columnType': {'columnType': 'VARCHAR(10)', 'baseType': 'VARCHAR', 'length': 10},
+                                    'nullable': False,
+                                    'primaryKey': 1
+                                }
+                            ]
+                        }
+                    }
+                }
+            }
+        }
+        with open(self.schema_yaml_path, 'w', encoding='utf-8') as f:
+            yaml.dump(schema_data, f, allow_unicode=True)
+
+        eager_path = os.path.join(self.temp_dir, 'eager.yaml')
+        lazy_path = os.path.join(self.temp_dir, 'lazy.yaml')
+        SchemaManager.load(self.schema_yaml_path).save(eager_path)
+        SchemaManager.load(self.schema_yaml_path, lazy=True).save(lazy_path)
+
+        with open(eager_path, 'r', encoding='utf-8') as f:
+            eager = yaml.safe_load(f)
+        with open(lazy_path, 'r', encoding='utf-8') as f:
+            lazy = yaml.safe_load(f)
+        self.assertEqual(eager, lazy)
+
+    def test_load_with_schema_cache(self):
+        """Test validated schema cache is reused for unchanged files"""
+        self._write_lazy_fixture()
+        with open(self.schema_yaml_path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        del data['schemas']['main']['tables']['broken']
+        with open(self.schema_yaml_path, 'w', encoding='utf-8') as f:
+            yaml.dump(data, f, allow_unicode=True)
+        cache_dir = os.path.join(self.temp_dir, 'cache')
+
+        first = SchemaManager.load(self.schema_yaml_path, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        # 読み込んだYAMLではなく、検証済みのモデルの内容を保存する
+        with open(self.schema_yaml_path, 'rb') as f:
+            stored = schema_cache.read(cache_dir, self.schema_yaml_path, f.read())
+        dumped = first.model_dump(by_alias=True)['schemas']['main']['tables']['users']
+        self.assertEqual(stored['schemas']['main']['tables']['users'], {**dumped, 'table_name': 'users'})
+
+        with mock.patch('dbgear.models.schema.yaml.safe_load') as safe_load:
+            cached = SchemaManager.load(self.schema_yaml_path, cache_dir=cache_dir)
+            lazy = SchemaManager.load(self.schema_yaml_path, lazy=True, cache_dir=cache_dir)
+            safe_load.assert_not_called()
+        self.assertEqual(cached.model_dump(), first.model_dump())
+        users = cached['main'].tables['users']
+        self.assertIsInstance(users.columns['id'].column_type, ColumnType)
+        self.assertEqual(users.columns['id'].column_type.base_type, 'BIGINT')
+        self.assertTrue(lazy['main'].tables_.is_pending('users'))
+        lazy.materialize()
+        self.assertEqual(lazy.model_dump(), first.model_dump())
+
+        # ファイルが変わればキャッシュは使われない
+        data['schemas']['main']['tables']['users']['displayName'] = '利用者'
+        with open(self.schema_yaml_path, 'w', encoding='utf-8') as f:
+            yaml.dump(data, f, allow_unicode=True)
+        changed = SchemaManager.load(self.schema_yaml_path, cache_dir=cache_dir)
+        self.assertEqual(changed['main'].tables['users'].display_name, '利用者')
+
 
 if __name__ == "__main__":
     unittest.main()
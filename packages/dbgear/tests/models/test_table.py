@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch
+
+from dbgear.models.table import Table
+from dbgear.models.table import TableLookup
+from dbgear.models.column import Column
+from dbgear.models.column_type import ColumnType
+from dbgear.models.index import Index
+from dbgear.models.relation import Relation, EntityInfo, BindColumn
+
+
+def _column(name: str) -> Column:
+    return Column(
+        column_name=name,
+        display_name=name,
+        column_type=ColumnType(column_type='INT', base_type='INT'),
+        nullable=True,
+    )
+
+
+def _relation(source: str, target_table: str) -> Relation:
+    return Relation(
+        target=EntityInfo(schema_name='main', table_name=target_table),
+        bind_columns=[BindColumn(source_column=source, target_column='id')],
+    )
+
+
+class TestTable(unittest.TestCase):
+    """Test Table column/index/relation lookups"""
+
+    def setUp(self):
+        self.table = Table(
+            table_name='orders',
+            display_name='Orders',
+            columns_=[_column('id'), _column('user_id'), _column('created_at')],
+            indexes_=[Index(index_name='ix_orders', columns=['user_id', 'created_at DESC'])],
+            relations_=[_relation('user_id', 'users')],
+        )
+
+    def test_column_lookup_by_name(self):
+        """Test columns are found by name through the table index"""
+        self.assertIs(self.table.columns['user_id'], self.table.columns_[1])
+        self.assertIn('created_at', self.table.columns)
+        self.assertNotIn('missing', self.table.columns)
+        with self.assertRaises(KeyError):
+            self.table.columns['missing']
+
+    def test_reverse_maps(self):
+        """Test column to indexes/relations maps"""
+        self.assertEqual([i.index_name for i in self.table.indexes_for('user_id')], ['ix_orders'])
+        self.assertEqual([i.index_name for i in self.table.indexes_for('created_at')], ['ix_orders'])
+        self.assertEqual(self.table.indexes_for('id'), [])
+        self.assertEqual([r.target.table_name for r in self.table.relations_for('user_id')], ['users'])
+        self.assertEqual(self.table.relations_for('id'), [])
+
+    def test_lookup_follows_changes(self):
+        """Test lookups stay consistent with append/remove and direct assignment"""
+        self.table.columns['id']
+        amount = _column('amount')
+        self.table.columns.append(amount)
+        self.assertIs(self.table.columns['amount'], amount)
+        self.table.columns.remove(amount)
+        self.assertNotIn('amount', self.table.columns)
+
+        self.table.relations.append(_relation('id', 'parents'))
+        self.assertEqual(len(self.table.relations_for('id')), 1)
+        self.table.indexes.remove(self.table.indexes[0])
+        self.assertEqual(self.table.indexes_for('user_id'), [])
+
+        self.table.columns_ = [_column('code')]
+        self.assertNotIn('id', self.table.columns)
+        self.assertEqual(self.table.columns['code'].column_name, 'code')
+
+        # 名前が変わったカラムは古い名前では見つからない
+        self.table.columns_[0].column_name = 'renamed'
+        self.assertNotIn('code', self.table.columns)
+        self.table.invalidate_index()
+        self.assertEqual(self.table.columns['renamed'].column_name, 'renamed')
+
+    def test_miss_does_not_rebuild(self):
+        """Test a lookup miss is answered from the current index"""
+        self.table.columns['id']
+        with patch.object(TableLookup, 'build') as build:
+            self.assertNotIn('missing', self.table.columns)
+            self.assertIsNone(self.table.find_column('missing'))
+            with self.assertRaises(KeyError):
+                self.table.columns['missing']
+        build.assert_not_called()
+
+    def test_lookup_does_not_affect_equality(self):
+        """Test built lookups are ignored by model comparison and copies"""
+        other = self.table.model_copy(deep=True)
+        self.table.columns['id']
+        self.assertEqual(self.table, other)
+        self.assertIs(other.columns['id'], other.columns_[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,14 @@
 import unittest
 import tempfile
 import os
+import sys
+import types
+from unittest.mock import patch
 
+from dbgear.models.cache import ModelCache
 from dbgear.models.tenant import TenantRegistry, TenantConfig, DatabaseInfo
+from dbgear.models.mapping import Mapping
+from dbgear.models.schema import SchemaManager, Schema
 
 
 class TestTenant(unittest.TestCase):
@@ -146,6 +152,68 @@ class TestTenant(unittest.TestCase):
         )
         self.assertEqual(tenant_config.data_args, {})
 
+    def test_materialize_shares_mapping_between_tenants(self):
+        """Test materialize yields lightweight tenant views of one mapping"""
+        Mapping(
+            folder=self.temp_dir, environ='test_env', name='base',
+            description='Base mapping', schemas=['main']
+        ).save()
+
+        tenant_registry = TenantRegistry(folder=self.temp_dir, name='test_env')
+        tenant_registry.append(TenantConfig(
+            name='first',
+            ref='base',
+            databases=[
+                DatabaseInfo(database='db1'),
+                DatabaseInfo(database='db2'),
+                DatabaseInfo(database='db3', active=False),
+            ]
+        ))
+        tenant_registry.append(TenantConfig(
+            name='second',
+            ref='base',
+            databases=[DatabaseInfo(database='db4')]
+        ))
+
+        maps = list(tenant_registry.materialize())
+        self.assertEqual([m.instance_name for m in maps], ['db1', 'db2', 'db4'])
+        self.assertTrue(all(m.name == 'base' for m in maps))
+        self.assertIs(maps[0].schemas, maps[2].schemas)
+
+        # ビルド済みスキーマはテナント間で共有される
+        project_schema = SchemaManager(schemas={'main': Schema(name='main')})
+        schema = maps[0].build_schema(project_schema, None)
+        self.assertIs(schema, maps[1].build_schema(project_schema, None))
+        self.assertIs(schema, maps[2].build_schema(project_schema, None))
+
+    def test_materialize_passes_copy_to_retrieve(self):
+        """Test retrieve() cannot modify the cached mapping"""
+        Mapping(
+            folder=self.temp_dir, environ='test_env', name='base',
+            description='Base mapping', schemas=['main']
+        ).save()
+
+        def retrieve(map):
+            map.schemas.append('extra')
+            map.description = 'changed'
+            yield map.for_tenant('db1')
+
+        module = types.ModuleType('tenant_module')
+        module.retrieve = retrieve
+        cache = ModelCache()
+        tenant_registry = TenantRegistry(folder=self.temp_dir, name='test_env')
+        tenant_registry._cache = cache
+        tenant_registry.append(TenantConfig(name='dynamic', ref='base', databases='tenant_module'))
+
+        with patch.dict(sys.modules, {'tenant_module': module}):
+            for _ in range(2):
+                maps = list(tenant_registry.materialize())
+                self.assertEqual(maps[0].description, 'changed')
+                self.assertEqual(maps[0].schemas, ['main', 'extra'])
+        cached = Mapping.load(self.temp_dir, 'test_env', 'base', cache=cache)
+        self.assertEqual(cached.description, 'Base mapping')
+        self.assertEqual(cached.schemas, ['main'])
+
 
 if __name__ == "__main__":
     unittest.main()
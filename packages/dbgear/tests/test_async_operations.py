@@ -0,0 +1,137 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from dbgear import async_operations
+from dbgear.async_operations import AsyncOperation
+from dbgear.async_operations import apply_async
+from dbgear.models.exceptions import DBGearDataValidationError
+
+
+class _FakeAsyncConnection:
+    """AsyncConnection と同じく、run_sync に同期版の接続を渡す"""
+
+    def __init__(self, sync_conn):
+        self.sync_conn = sync_conn
+        self.closed = False
+
+    async def run_sync(self, fn, *args):
+        return fn(self.sync_conn, *args)
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeEngine:
+
+    def __init__(self):
+        self.connections = []
+        self.disposed = False
+
+    async def connect(self):
+        conn = _FakeAsyncConnection(MagicMock(name=f'conn{len(self.connections)}'))
+        self.connections.append(conn)
+        return conn
+
+    async def dispose(self):
+        self.disposed = True
+
+
+def _project(databases=()):
+    environ = MagicMock(settings={'prefix': 'x'}, deployments={'local': 'mysql+pymysql://user@localhost/'})
+    environ.databases = list(databases)
+    project = MagicMock()
+    project.envs = {'dev': environ}
+    return project
+
+
+class TestAsyncOperation(unittest.IsolatedAsyncioTestCase):
+    """Test the asyncio backend drives the synchronous Operation steps"""
+
+    async def test_operation_uses_async_connection(self):
+        """Test the Operation is bound to the sync facade of the async connection"""
+        fake = _FakeEngine()
+        async with AsyncOperation(_project(), 'dev', None, 'local', backup_key='20240101000000', async_engine=fake) as op:
+            self.assertIs(op.operation.conn, fake.connections[0].sync_conn)
+            self.assertEqual(op.operation.ymd, '20240101000000')
+        self.assertTrue(fake.connections[0].closed)
+        # 共有したエンジンは破棄しない
+        self.assertFalse(fake.disposed)
+
+    async def test_shared_loader_pool(self):
+        """Test a given loader pool is used by the Operation and left open for the caller"""
+        pool = MagicMock()
+        async with AsyncOperation(_project(), 'dev', None, 'local', async_engine=_FakeEngine(), loader_pool=pool) as op:
+            with op.operation._loader_pool() as used:
+                self.assertIs(used, pool)
+        pool.shutdown.assert_not_called()
+
+    async def test_insert_data(self):
+        """Test every batch is inserted in order and each datamodel is restored afterwards"""
+        async with AsyncOperation(_project(), 'dev', None, 'local', async_engine=_FakeEngine()) as op:
+            sync = op.operation = MagicMock()
+            map = MagicMock(instance_name='main')
+            dms = [MagicMock(table_name='items'), MagicMock(table_name='orders')]
+            tbls = [MagicMock(table_name='items'), MagicMock(table_name='orders')]
+            sync._insert_plan.return_value = [(dms[0], tbls[0], ['src1'], 2), (dms[1], tbls[1], ['src2'], None)]
+            sync._load_batches.side_effect = lambda datasources: iter([('ds1', 'b1'), ('ds2', 'b2')])
+            checked = []
+            sync._check_batch.side_effect = lambda map, tbl, checker, ds, batch: checked.append((ds, threading.get_ident()))
+            await op.insert_data(map, 'schema', 'drop', None)
+
+        names = [c[0] for c in sync.method_calls if c[0] in ('_insert_batch', '_restore_datamodel', '_restore_target')]
+        self.assertEqual(names, [
+            '_insert_batch', '_insert_batch', '_restore_datamodel',
+            '_insert_batch', '_insert_batch', '_restore_datamodel', '_restore_target',
+        ])
+        # バッチは投入前に、イベントループ以外のスレッドで照合する
+        self.assertEqual([ds for ds, _ in checked], ['ds1', 'ds2', 'ds1', 'ds2'])
+        self.assertNotIn(threading.get_ident(), [ident for _, ident in checked])
+        self.assertEqual(sync._insert_batch.call_args_list[1].args, (map, tbls[0], 'ds2', 'b2'))
+        self.assertEqual([c.args[0] for c in sync._load_batches.call_args_list], [['src1'], ['src2']])
+        self.assertEqual(sync._track.call_args_list[0].args, ('insert', 'main', 'items', 2))
+        self.assertEqual(sync._restore_target.call_args.args, (map, 'schema', None, {'items', 'orders'}, None, False))
+
+    async def test_apply_continues_after_failure(self):
+        """Test a failing database does not stop the others and the error is raised at the end"""
+        maps = [MagicMock(instance_name=f'db{i}') for i in range(3)]
+        fake = _FakeEngine()
+        applied = []
+
+        async def create_database(self, map, all):
+            if map.instance_name == 'db1':
+                raise RuntimeError('boom')
+            applied.append(map.instance_name)
+
+        with patch.object(async_operations.engine, 'get_async_engine', return_value=fake), \
+                patch.object(AsyncOperation, 'create_database', create_database), \
+                patch.object(AsyncOperation, 'create_table', MagicMock(side_effect=_noop)), \
+                patch.object(AsyncOperation, 'insert_data', MagicMock(side_effect=_noop)):
+            with self.assertRaises(RuntimeError):
+                await apply_async(_project(maps), 'dev', None, None, 'drop', 'local', validate='off', concurrency=2)
+        self.assertEqual(applied, ['db0', 'db2'])
+        self.assertTrue(fake.disposed)
+        self.assertTrue(all(conn.closed for conn in fake.connections))
+
+    async def test_validate_before_connecting(self):
+        """Test full validation fails before the async engine is created or any connection is opened"""
+        maps = [MagicMock(instance_name='db0')]
+        get_async_engine = MagicMock(return_value=_FakeEngine())
+        validate_data = MagicMock(side_effect=DBGearDataValidationError('invalid', []))
+
+        with patch.object(async_operations.engine, 'get_async_engine', get_async_engine), \
+                patch.object(async_operations, 'validate_data', validate_data):
+            with self.assertRaises(DBGearDataValidationError):
+                # 既定（validate='full'）で接続前に検証する
+                await apply_async(_project(maps), 'dev', None, None, 'drop', 'local')
+        self.assertEqual(validate_data.call_args.args[1], maps[0])
+        get_async_engine.assert_not_called()
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+if __name__ == '__main__':
+    unittest.main()
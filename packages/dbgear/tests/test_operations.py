@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from dbgear import operations
+from dbgear.models.exceptions import DBGearDataValidationError
+
+
+def _project(databases=()):
+    environ = MagicMock(settings={'prefix': 'x'}, deployments={'local': 'mysql+pymysql://user@localhost/'})
+    environ.databases = list(databases)
+    project = MagicMock()
+    project.envs = {'dev': environ}
+    return project
+
+
+class TestApply(unittest.TestCase):
+    """Test the validation mode of apply"""
+
+    def test_validate_before_connecting(self):
+        """Test data is validated by default before any connection is opened or DDL runs"""
+        maps = [MagicMock(instance_name='db0')]
+        validate_data = MagicMock(side_effect=DBGearDataValidationError('invalid', []))
+        with patch.object(operations, 'validate_data', validate_data), \
+                patch.object(operations, 'Operation') as operation:
+            with self.assertRaises(DBGearDataValidationError):
+                operations.apply(_project(maps), 'dev', None, None, 'drop', 'local', progress='off')
+        self.assertEqual(validate_data.call_args.args[1], maps[0])
+        operation.assert_not_called()
+
+    def test_no_validate(self):
+        """Test validate='off' skips the pre-DDL pass and batch checks"""
+        maps = [MagicMock(instance_name='db0')]
+        validate_data = MagicMock()
+        with patch.object(operations, 'validate_data', validate_data), \
+                patch.object(operations, 'Operation') as operation:
+            operations.apply(_project(maps), 'dev', None, None, 'drop', 'local', validate='off', progress='off')
+        validate_data.assert_not_called()
+        self.assertFalse(operation.call_args.kwargs['check_batches'])
+        operation.return_value.__enter__.return_value.insert_data.assert_called_once()
+
+
+class TestCountRows(unittest.TestCase):
+    """Test row counts used as plan weights"""
+
+    def _datasource(self, estimate, rows):
+        ds = MagicMock(filename='items.dat', data=[])
+        ds.estimate_rows.return_value = estimate
+        ds.load.side_effect = lambda: setattr(ds, 'data', [{}] * rows)
+        return ds
+
+    def test_parse_sources_without_estimate(self):
+        """Test a source without an estimate is parsed instead of counted as 0"""
+        dm = MagicMock()
+        dm.get_datasources.return_value = [self._datasource(10, 0), self._datasource(None, 3)]
+        self.assertEqual(operations._count_rows(dm, {}), 13)
+        self.assertEqual(operations._count_rows(dm, {}, exact=True), 3)
+
+    def test_unknown_when_unreadable(self):
+        """Test the weight is unknown when a source cannot be read"""
+        dm = MagicMock(schema_name='main', table_name='items')
+        ds = self._datasource(None, 0)
+        ds.load.side_effect = OSError('broken')
+        dm.get_datasources.return_value = [ds]
+        with self.assertLogs('dbgear.operations', level='WARNING'):
+            self.assertIsNone(operations._count_rows(dm, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -287,6 +287,75 @@ class TestDependencyPriority(unittest.TestCase):
         table4_idx = result_keys.index("test@table4")
         self.assertLess(table3_idx, table4_idx, "table3 should come before table4")
 
+    def test_long_fk_chain_drops_only_closing_fk(self):
+        """Test a long FK chain keeps its order and drops only the FK closing the cycle"""
+        count = 2000
+        datamodels = [self._create_datamodel(f"table{i}") for i in reversed(range(count))]
+
+        # table{i} -> table{i-1} for every i, and table0 -> table{count-1} closes the cycle
+        schema = Schema(name="test_schema")
+        schema.tables_ = {
+            f"table{i}": Table(
+                table_name=f"table{i}",
+                display_name=f"table{i}",
+                relations_=[
+                    Relation(
+                        target=EntityInfo(schema_name="test", table_name=f"table{(i - 1) % count}"),
+                        bind_columns=[]
+                    )
+                ]
+            )
+            for i in range(count)
+        }
+
+        with self.assertLogs('dbgear.utils.dependency', level='WARNING') as logs:
+            result = self.resolver.resolve_insertion_order(datamodels, schema)
+
+        result_keys = [f"{dm.schema_name}@{dm.table_name}" for dm in result]
+        self.assertEqual(result_keys, [f"test@table{i}" for i in range(count)])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn(f"test@table0 -> test@table{count - 1}", logs.output[0])
+
+    def test_insertion_plan_waves_and_critical_path(self):
+        """Test insertion plan groups independent tables and weights the critical path"""
+        dm1 = self._create_datamodel("table1")
+        dm2 = self._create_datamodel("table2")
+        dm3 = self._create_datamodel("table3", dependencies=["test@table1"])
+        dm4 = self._create_datamodel("table4")
+
+        # table4 -> table2 (FK), table3 -> table1 (explicit)
+        schema = Schema(name="test_schema")
+        schema.tables_ = {
+            "table1": Table(table_name="table1", display_name="table1", relations_=[]),
+            "table2": Table(table_name="table2", display_name="table2", relations_=[]),
+            "table3": Table(table_name="table3", display_name="table3", relations_=[]),
+            "table4": Table(
+                table_name="table4",
+                display_name="table4",
+                relations_=[
+                    Relation(
+                        target=EntityInfo(schema_name="test", table_name="table2"),
+                        bind_columns=[]
+                    )
+                ]
+            )
+        }
+
+        weights = {"test@table1": 10, "test@table2": 100, "test@table3": 5, "test@table4": 1}
+        plan = self.resolver.resolve_insertion_plan([dm4, dm3, dm2, dm1], schema, weights)
+
+        waves = [[dm.table_name for dm in wave] for wave in plan.waves]
+        self.assertEqual(waves, [["table1", "table2"], ["table3", "table4"]])
+        self.assertEqual([dm.table_name for dm in plan.critical_path], ["table2", "table4"])
+        self.assertEqual(plan.critical_path_weight, 101)
+        self.assertEqual(plan.total_weight, 116)
+        self.assertEqual(plan.to_dict()["waves"][0][1], {"table": "test@table2", "weight": 100})
+
+        # Without weights every table counts as 1
+        plan = self.resolver.resolve_insertion_plan([dm1, dm2, dm3, dm4], schema)
+        self.assertEqual(plan.critical_path_weight, 2)
+        self.assertEqual(plan.total_weight, 4)
+
 
 if __name__ == '__main__':
     unittest.main()
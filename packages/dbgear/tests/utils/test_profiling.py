@@ -0,0 +1,122 @@
+"""
+Test phase profiling
+"""
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from dbgear.utils.profiling import Profiler
+from dbgear.utils.profiling import phase
+from dbgear.utils import profiling
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.original = profiling.profiler
+        profiling.profiler = Profiler()
+
+    def tearDown(self):
+        if profiling.profiler.enabled:
+            profiling.profiler.stop()
+        profiling.profiler = self.original
+
+    def test_disabled_is_noop(self):
+        @phase('work')
+        def work():
+            return 42
+
+        self.assertEqual(work(), 42)
+        self.assertFalse(profiling.profiler.enabled)
+        self.assertFalse(hasattr(profiling.profiler, 'root'))
+
+    def test_nested_phases(self):
+        @phase('inner')
+        def inner():
+            pass
+
+        profiling.profiler.start()
+        with phase('outer'):
+            inner()
+            inner()
+        with phase('outer'):
+            pass
+        report = profiling.profiler.stop()
+
+        outer = report.root.children['outer']
+        self.assertEqual(outer.calls, 2)
+        self.assertEqual(outer.children['inner'].calls, 2)
+        self.assertGreaterEqual(report.root.wall, outer.wall)
+        self.assertIn('    inner', report.format())
+
+    def test_exception_closes_phase(self):
+        profiling.profiler.start()
+        with self.assertRaises(ValueError):
+            with phase('failing'):
+                raise ValueError()
+        with phase('next'):
+            pass
+        report = profiling.profiler.stop()
+
+        self.assertEqual(set(report.root.children), {'failing', 'next'})
+
+    def test_threads_are_separate_stacks(self):
+        profiling.profiler.start()
+
+        def work():
+            with phase('thread'):
+                pass
+
+        with phase('main'):
+            worker = threading.Thread(target=work, name='worker')
+            worker.start()
+            worker.join()
+        report = profiling.profiler.stop()
+
+        # 別スレッドのフェーズは呼び出し元のフェーズの子にはならない
+        self.assertIn('thread', report.root.children)
+        self.assertNotIn('thread', report.root.children['main'].children)
+        self.assertEqual(set(report.events), {threading.main_thread().name, 'worker'})
+
+    def test_memory(self):
+        profiling.profiler.start(memory=True)
+        with phase('allocate'):
+            data = [bytearray(1024) for _ in range(1024)]
+        del data
+        report = profiling.profiler.stop()
+
+        peak = report.root.children['allocate'].peak
+        self.assertGreaterEqual(peak, 1024 * 1024)
+        self.assertGreaterEqual(report.root.peak, peak)
+        self.assertIn('peak (MB)', report.format())
+
+    def test_outputs(self):
+        profiling.profiler.start(cprofile=True)
+        with phase('outer'):
+            with phase('inner'):
+                sum(range(1000))
+        report = profiling.profiler.stop()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            report.write_json(os.path.join(tmp, 'profile.json'))
+            with open(os.path.join(tmp, 'profile.json')) as f:
+                data = json.load(f)
+            self.assertEqual(data['phases']['children'][0]['name'], 'outer')
+            self.assertEqual(data['phases']['children'][0]['children'][0]['name'], 'inner')
+            self.assertTrue(data['functions'])
+
+            report.write_speedscope(os.path.join(tmp, 'profile.speedscope.json'))
+            with open(os.path.join(tmp, 'profile.speedscope.json')) as f:
+                data = json.load(f)
+            self.assertEqual([frame['name'] for frame in data['shared']['frames']], ['outer', 'inner'])
+            events = data['profiles'][0]['events']
+            self.assertEqual([(e['type'], e['frame']) for e in events], [('O', 0), ('O', 1), ('C', 1), ('C', 0)])
+
+            report.write_pstats(os.path.join(tmp, 'profile.pstats'))
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'profile.pstats')))
+
+
+if __name__ == '__main__':
+    unittest.main()
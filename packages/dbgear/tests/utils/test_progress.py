@@ -0,0 +1,174 @@
+"""
+Test progress reporting of apply
+"""
+import io
+import logging
+import time
+import unittest
+from unittest.mock import patch
+
+from dbgear.dbio.instrument import Statement
+from dbgear.utils import progress
+from dbgear.utils.progress import BarRenderer
+from dbgear.utils.progress import LogRenderer
+from dbgear.utils.progress import Progress
+
+
+class _Renderer:
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.lines = []
+
+    def update(self, line, force=False):
+        self.lines.append(line)
+
+    def close(self):
+        pass
+
+
+def _statement(phase, target, rows, size=0):
+    return Statement('mysql_insert_into', phase, target, rows, size, 0.1)
+
+
+class TestProgress(unittest.TestCase):
+
+    def setUp(self):
+        self.renderer = _Renderer()
+        self.progress = Progress(self.renderer)
+
+    def test_insert(self):
+        """Test rows and bytes are counted from statements of the running table"""
+        self.progress.plan('insert', 100)
+        self.progress.plan('insert', 300)
+        self.progress.begin('insert', 'main.items', 100)
+        self.progress(_statement('insert', 'main.items', 40, 4000))
+        # 他のテーブル・フェーズのSQLは数えない
+        self.progress(_statement('insert', 'main.orders', 10))
+        self.progress(_statement('backup', 'main.items', 10))
+
+        line = self.renderer.lines[-1]
+        self.assertIn('insert main.items 40/100 rows (40%)', line)
+        self.assertIn('rows/s', line)
+        self.assertIn('ETA', line)
+        self.assertIn('insert total 40/400 rows (10%)', line)
+
+        self.progress.end('insert', 'main.items')
+        self.progress.begin('insert', 'main.orders', 300)
+        self.assertIn('insert total 100/400 rows (25%)', self.renderer.lines[-1])
+        self.assertEqual(self.progress.phases['insert'].rows, 40)
+        self.assertEqual(self.progress.phases['insert'].bytes, 4000)
+
+    def test_backup_counts_estimated_size(self):
+        """Test backups count the estimated data size once the table is done"""
+        self.progress.plan('backup', 50)
+        self.progress.begin('backup', 'main.items', 50, 8192)
+        self.progress(_statement('backup', 'main.items', 50, 100))
+        self.progress.end('backup', 'main.items')
+        self.assertEqual(self.progress.phases['backup'].bytes, 8192)
+        self.assertTrue(self.progress.summary()[0].startswith('backup: 50 rows, 8.0 KB'))
+
+    def test_unknown_total(self):
+        """Test the overall share is not shown when a table has no row estimate"""
+        self.progress.plan('insert', 100)
+        self.progress.plan('insert', None)
+        self.progress.begin('insert', 'main.items')
+        self.progress(_statement('insert', 'main.items', 10))
+        line = self.renderer.lines[-1]
+        self.assertIn('insert main.items 10 rows', line)
+        self.assertNotIn('total', line)
+
+    def test_refresh_while_waiting(self):
+        """Test the running table is redrawn periodically between statements until closed"""
+        renderer = _Renderer(interval=0.01)
+        reporter = Progress(renderer)
+        reporter.start()
+        try:
+            reporter.begin('insert', 'main.items', 100)
+            count = len(renderer.lines)
+            for _ in range(100):
+                if len(renderer.lines) > count + 2:
+                    break
+                time.sleep(0.01)
+            self.assertGreater(len(renderer.lines), count + 2)
+            self.assertTrue(all(line.startswith('insert main.items 0/100 rows') for line in renderer.lines))
+        finally:
+            reporter.close()
+        self.assertIsNone(reporter._ticker)
+        count = len(renderer.lines)
+        time.sleep(0.05)
+        self.assertEqual(len(renderer.lines), count)
+
+    def test_refresh_without_task(self):
+        """Test nothing is drawn while no table is running"""
+        self.progress.refresh()
+        self.assertEqual(self.renderer.lines, [])
+
+
+class TestRenderers(unittest.TestCase):
+
+    def test_log_renderer(self):
+        """Test progress lines are logged at most once per interval"""
+        renderer = LogRenderer(interval=60)
+        with self.assertLogs('dbgear.utils.progress', level='INFO') as logs:
+            renderer.update('first', force=True)
+            renderer._last -= 60
+            renderer.update('second')
+            renderer.update('third')
+            progress.logger.info('end')
+        self.assertEqual([record.getMessage() for record in logs.records], ['second', 'end'])
+
+    def test_log_renderer_refreshed(self):
+        """Test progress is logged during a long statement without any new statement"""
+        reporter = Progress(LogRenderer(interval=0.01))
+        with self.assertLogs('dbgear.utils.progress', level='INFO') as logs:
+            reporter.begin('insert', 'main.items', 100)
+            reporter.start()
+            time.sleep(0.1)
+            reporter.close()
+        self.assertIn('insert main.items 0/100 rows (0%)', [record.getMessage() for record in logs.records])
+
+    def test_bar_renderer_refreshed(self):
+        """Test the bar is rewritten during a long statement without any new statement"""
+        stream = io.StringIO()
+        reporter = Progress(BarRenderer(stream, interval=0.01))
+        reporter.begin('insert', 'main.items', 100)
+        count = stream.getvalue().count('\r\x1b[Kinsert')
+        reporter.start()
+        time.sleep(0.1)
+        reporter.close()
+        self.assertGreater(stream.getvalue().count('\r\x1b[Kinsert'), count)
+
+    def test_bar_renderer_clears_before_logging(self):
+        """Test the bar is rewritten in place and erased before a log record is written"""
+        stream = io.StringIO()
+        root = logging.getLogger()
+        handler = logging.StreamHandler(stream)
+        root.addHandler(handler)
+        try:
+            renderer = BarRenderer(stream, interval=0)
+            renderer.update('10%')
+            renderer.update('20%')
+            logging.getLogger('dbgear.test').warning('message')
+            renderer.close()
+        finally:
+            root.removeHandler(handler)
+        self.assertEqual(stream.getvalue(), '\r\x1b[K10%\r\x1b[K20%\r\x1b[Kmessage\n')
+        self.assertEqual(handler.filters, [])
+
+    def test_create(self):
+        """Test the renderer is chosen from the mode and whether the stream is a terminal"""
+        self.assertIsNone(progress.create('off'))
+        stream = io.StringIO()
+        with patch.object(stream, 'isatty', return_value=True):
+            reporters = [progress.create('auto', stream=io.StringIO()), progress.create('log'), progress.create('auto', stream=stream)]
+        for reporter, renderer in zip(reporters, (LogRenderer, LogRenderer, BarRenderer)):
+            self.assertIsInstance(reporter.renderer, renderer)
+            # 表示の定期更新を開始し、close() で停止する
+            self.assertTrue(reporter._ticker.is_alive())
+            reporter.close()
+            self.assertIsNone(reporter._ticker)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from dbgear.models.column import Column
+from dbgear.models.column_type import parse_column_type
+from dbgear.models.datamodel import DataModel
+from dbgear.models.datasources.batch import ColumnBatch
+from dbgear.models.relation import Relation, EntityInfo, BindColumn
+from dbgear.models.schema import Schema
+from dbgear.models.table import Table
+from dbgear.utils.const import DATATYPE_YAML
+from dbgear.utils.validation import BatchChecker, check_batch, validate_datamodels, ERROR, WARNING
+
+
+def _column(name: str, type_string: str, nullable: bool = True, primary_key: int | None = None, **kwargs) -> Column:
+    return Column(
+        column_name=name,
+        display_name=name,
+        column_type=parse_column_type(type_string),
+        nullable=nullable,
+        primary_key=primary_key,
+        **kwargs,
+    )
+
+
+def _users() -> Table:
+    return Table(
+        table_name='users',
+        display_name='Users',
+        columns_=[
+            _column('id', 'INT', nullable=False, primary_key=1),
+            _column('name', 'VARCHAR(5)', nullable=False),
+            _column('status', "ENUM('active','inactive')"),
+            _column('score', 'DECIMAL(4,2)'),
+            _column('joined', 'DATE'),
+            _column('label', 'VARCHAR(20)', expression="CONCAT(name, '!')"),
+        ],
+    )
+
+
+def _orders() -> Table:
+    return Table(
+        table_name='orders',
+        display_name='Orders',
+        columns_=[
+            _column('id', 'INT', nullable=False, primary_key=1),
+            _column('user_id', 'INT', nullable=False),
+        ],
+        relations_=[Relation(
+            target=EntityInfo(schema_name='main', table_name='users'),
+            bind_columns=[BindColumn(source_column='user_id', target_column='id')],
+        )],
+    )
+
+
+class TestCheckBatch(unittest.TestCase):
+    """Test per-data-source checks against the table definition"""
+
+    def _messages(self, rows):
+        issues = check_batch('main@users', 'main@users.dat', _users(), ColumnBatch.from_rows(rows))
+        return {(issue.level, issue.column, issue.message): issue for issue in issues}
+
+    def test_valid_rows(self):
+        rows = [
+            {'id': 1, 'name': 'alice', 'status': 'active', 'score': 12.5, 'joined': '2024-01-31'},
+            {'id': '2', 'name': 'bob', 'status': None, 'score': '-1', 'joined': 'CURDATE()'},
+        ]
+        self.assertEqual(self._messages(rows), {})
+
+    def test_detects_row_level_problems(self):
+        rows = [
+            {'id': 1, 'name': 'alice', 'status': 'deleted', 'score': 123.4, 'joined': 'yesterday', 'extra': 1},
+            {'id': 1, 'name': None, 'status': 'active', 'score': 'abc', 'joined': None, 'label': 'x'},
+            {'id': 2, 'name': 'charlotte', 'status': 'active', 'score': 1, 'joined': None},
+        ]
+        issues = self._messages(rows)
+        self.assertEqual(issues[(ERROR, 'name', 'NULL in NOT NULL column')].rows, (2,))
+        self.assertEqual(issues[(ERROR, 'name', 'longer than VARCHAR(5)')].rows, (3,))
+        self.assertEqual(issues[(ERROR, 'status', "not a member of ENUM('active','inactive')")].rows, (1,))
+        self.assertEqual(issues[(ERROR, 'score', 'out of range for DECIMAL(4,2)')].rows, (1,))
+        self.assertEqual(issues[(ERROR, 'score', 'not a number for DECIMAL(4,2)')].rows, (2,))
+        self.assertEqual(issues[(ERROR, 'joined', 'not a date for DATE')].rows, (1,))
+        self.assertEqual(issues[(ERROR, 'id', 'duplicate primary key')].rows, (2,))
+        self.assertIn((WARNING, 'extra', 'column is not defined in the table and is ignored'), issues)
+        self.assertIn((WARNING, 'label', 'generated column value is ignored'), issues)
+
+    def test_missing_column(self):
+        issues = self._messages([{'id': 1, 'name': 'alice'}])
+        self.assertIn((ERROR, 'status', 'column is missing from the data'), issues)
+        self.assertNotIn((ERROR, 'label', 'column is missing from the data'), issues)
+
+    def test_column_missing_from_some_rows(self):
+        rows = [
+            {'id': 1, 'name': 'alice', 'status': None, 'score': 1, 'joined': None},
+            {'id': 2, 'status': 'active', 'score': 1, 'joined': None},
+            {'id': 3, 'name': 'carol', 'status': 'active', 'joined': None},
+        ]
+        issues = self._messages(rows)
+        self.assertEqual(issues[(ERROR, 'name', 'column is missing from some rows')].rows, (2,))
+        self.assertEqual(issues[(ERROR, 'score', 'column is missing from some rows')].rows, (3,))
+        # 省略した行はNOT NULLの違反としては重ねて報告しない
+        self.assertNotIn((ERROR, 'name', 'NULL in NOT NULL column'), issues)
+
+
+class TestBatchChecker(unittest.TestCase):
+    """Test checks of batches read for insertion"""
+
+    def test_duplicates_across_batches_and_warnings_once(self):
+        checker = BatchChecker('main@users', _users())
+        row = {'id': 1, 'name': 'alice', 'status': 'active', 'score': 1, 'joined': '2024-01-01', 'extra': 1}
+        first = checker.check('main@users#1.dat', ColumnBatch.from_rows([row]))
+        self.assertEqual([(i.level, i.column) for i in first], [(WARNING, 'extra')])
+
+        second = checker.check('main@users#2.dat', ColumnBatch.from_rows([{**row, 'id': '1'}, {**row, 'id': 2}]))
+        self.assertEqual([(i.level, i.column, i.message) for i in second], [
+            (ERROR, 'id', '1 primary keys also appear in an earlier batch'),
+        ])
+
+
+class TestValidateDatamodels(unittest.TestCase):
+    """Test validation across data sources of several datamodels"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, 'dev', 'base'))
+        self.schema = Schema(name='main')
+        self.schema.tables.append(_users())
+        self.schema.tables.append(_orders())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, filename: str, rows: list[dict]):
+        with open(os.path.join(self.temp_dir, 'dev', 'base', filename), 'w', encoding='utf-8') as f:
+            yaml.dump(rows, f)
+
+    def _datamodel(self, table_name: str, sync_mode: str = 'drop_create', segmented: bool = False) -> DataModel:
+        return DataModel(
+            folder=self.temp_dir, environ='dev', map_name='base', schema_name='main', table_name=table_name,
+            description='', sync_mode=sync_mode, data_type=DATATYPE_YAML,
+            data_params={'segment': 'id'} if segmented else {},
+        )
+
+    def _user(self, id: int) -> dict:
+        return {'id': id, 'name': f'u{id}', 'status': 'active', 'score': 1, 'joined': '2024-01-01'}
+
+    def test_primary_key_across_segments_and_foreign_keys(self):
+        self._write('main@users#a.dat', [self._user(1), self._user(2)])
+        self._write('main@users#b.dat', [self._user(2), self._user(3)])
+        self._write('main@orders.dat', [{'id': 1, 'user_id': 1}, {'id': 2, 'user_id': '9'}])
+        datamodels = [self._datamodel('users', segmented=True), self._datamodel('orders')]
+
+        for workers in (1, 2):
+            issues = validate_datamodels(datamodels, self.schema, max_workers=workers)
+            self.assertEqual([(i.level, i.filename) for i in issues], [
+                (ERROR, 'main@users#b.dat'),
+                (ERROR, 'main@orders.dat'),
+            ])
+            self.assertIn('1 primary keys also appear', issues[0].message)
+            self.assertIn('1 values not found in main@users (id): 9', issues[1].message)
+
+    def test_foreign_key_to_restored_table_is_warning(self):
+        self._write('main@users.dat', [self._user(1)])
+        self._write('main@orders.dat', [{'id': 1, 'user_id': 2}])
+        datamodels = [self._datamodel('users', sync_mode='update_diff'), self._datamodel('orders')]
+        issues = validate_datamodels(datamodels, self.schema, max_workers=1)
+        self.assertEqual([i.level for i in issues], [WARNING])
+
+    def test_unreadable_source(self):
+        issues = validate_datamodels([self._datamodel('users')], self.schema, max_workers=1)
+        self.assertEqual(len(issues), 1)
+        self.assertIn('failed to load', issues[0].message)
+
+
+if __name__ == '__main__':
+    unittest.main()
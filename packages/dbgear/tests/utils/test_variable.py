@@ -1,6 +1,7 @@
 import unittest
 
-from dbgear.utils.variable import expand_variables, expand_value, expand_dict
+from dbgear.utils.variable import expand_variables, expand_value, expand_dict, expand_column
+from dbgear.utils.variable import VariableExpander
 
 
 class TestExpandVariables(unittest.TestCase):
@@ -81,6 +82,23 @@ class TestExpandVariables(unittest.TestCase):
         result = expand_variables(items, self.settings)
         self.assertEqual(result[0]['expr'], '$unknown')
 
+    def test_unchanged_rows_passed_through(self):
+        """Rows without any expanded value are returned as-is, not copied."""
+        plain = {'name': 'plain text', 'id': 1}
+        escaped_unknown = {'name': '$undefined'}
+        changed = {'name': '$app_name'}
+        result = expand_variables([plain, escaped_unknown, changed], self.settings)
+        self.assertIs(result[0], plain)
+        self.assertIs(result[1], escaped_unknown)
+        self.assertIsNot(result[2], changed)
+        self.assertEqual(changed['name'], '$app_name')
+
+    def test_triple_dollar(self):
+        items = [{'expr': '$$$app_name', 'cost': '$ 100'}]
+        result = expand_variables(items, self.settings)
+        self.assertEqual(result[0]['expr'], '$$app_name')
+        self.assertEqual(result[0]['cost'], '$ 100')
+
 
 class TestExpandValue(unittest.TestCase):
     """Test expand_value edge cases."""
@@ -155,5 +173,22 @@ class TestExpandDict(unittest.TestCase):
         self.assertEqual(result['path'], '/opt/data')
 
 
+class TestVariableExpander(unittest.TestCase):
+    """Test column-wise expansion."""
+
+    def setUp(self):
+        self.settings = {'app_name': 'MyApplication'}
+
+    def test_column_expansion(self):
+        values = ['$app_name', None, 1, {'title': '$app_name'}, 'plain']
+        result = expand_column(values, self.settings)
+        self.assertEqual(result, ['MyApplication', None, 1, {'title': 'MyApplication'}, 'plain'])
+        self.assertEqual(values[0], '$app_name')
+
+    def test_unchanged_column_passed_through(self):
+        values = ['plain', '$undefined', None, {'title': 'x'}]
+        self.assertIs(VariableExpander(self.settings).column(values), values)
+
+
 if __name__ == '__main__':
     unittest.main()